@@ -0,0 +1,327 @@
+"""Load-test ``edge_inference.service:app`` and check latency against a stored baseline.
+
+Run from the service directory:
+
+    python benchmarks/load_test.py --output load_test.json
+    python benchmarks/load_test.py --baseline load_test.json --fail-on-regression
+
+A tiny ONNX model over the training feature contract's features (one ``[window]`` input per feature,
+as ``/predict`` sends them) is generated offline, so no trained artifact is needed. Every
+scenario in the sweep of mode x telemetry transport x concurrency x window length runs in a fresh
+child process, because the service's settings and singletons are process-wide. Telemetry goes to
+local stand-ins, either an HTTP receiver or a gRPC ingestion stub.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent import futures
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Training baseline feature contract (ml/pipelines/training/configs/baseline.yaml).
+DEFAULT_FEATURE_NAMES = ("map", "heart_rate", "spo2", "lactate", "creatinine", "age", "weight_kg")
+SCENARIO_KEYS = ("mode", "transport", "concurrency", "window")
+
+
+def build_contract_model(path: Path, feature_names: Tuple[str, ...]) -> Path:
+    """Write a tiny ``{feature}[window] -> map_forecast[1], confidence[1]`` ONNX model.
+
+    The feature windows are stacked into ``[window, n_features]`` inside the graph.
+    """
+    import onnx
+    from onnx import TensorProto, helper
+
+    weights = np.zeros((len(feature_names), 1), dtype=np.float32)
+    weights[feature_names.index("map") if "map" in feature_names else 0, 0] = 1.0
+    graph = helper.make_graph(
+        [
+            *(helper.make_node("Unsqueeze", [name, "column_axis"], [f"{name}_column"]) for name in feature_names),
+            helper.make_node("Concat", [f"{name}_column" for name in feature_names], ["input"], axis=1),
+            helper.make_node("MatMul", ["input", "weights"], ["row_forecast"]),
+            helper.make_node("ReduceMean", ["row_forecast"], ["window_mean"], axes=[0], keepdims=0),
+            helper.make_node("Add", ["window_mean", "bias"], ["map_forecast"]),
+            helper.make_node("Identity", ["confidence_value"], ["confidence"]),
+        ],
+        "edge_load_test_contract_model",
+        [helper.make_tensor_value_info(name, TensorProto.FLOAT, [None]) for name in feature_names],
+        [
+            helper.make_tensor_value_info("map_forecast", TensorProto.FLOAT, [1]),
+            helper.make_tensor_value_info("confidence", TensorProto.FLOAT, [1]),
+        ],
+        initializer=[
+            helper.make_tensor("column_axis", TensorProto.INT64, [1], [1]),
+            helper.make_tensor("weights", TensorProto.FLOAT, list(weights.shape), weights.reshape(-1).tolist()),
+            helper.make_tensor("bias", TensorProto.FLOAT, [1], [0.5]),
+            helper.make_tensor("confidence_value", TensorProto.FLOAT, [1], [0.9]),
+        ],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 15)])
+    model.ir_version = 8
+    onnx.checker.check_model(model)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    onnx.save(model, str(path))
+    return path
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_grpc_ingestion_stub() -> Tuple[Any, str]:
+    import grpc
+
+    from edge_inference.ingestion_proto import telemetry_pb2, telemetry_pb2_grpc
+
+    class AcceptAll(telemetry_pb2_grpc.TelemetryIngestionServicer):
+        def StreamTelemetry(self, request_iterator, context):  # noqa: N802 - generated servicer naming
+            for _ in request_iterator:
+                pass
+            return telemetry_pb2.TelemetryAck(accepted=True)
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    telemetry_pb2_grpc.add_TelemetryIngestionServicer_to_server(AcceptAll(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    return server, f"127.0.0.1:{port}"
+
+
+def _payloads(feature_names: Tuple[str, ...], window: int, count: int) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(window)
+    base = {"map": 70.0, "heart_rate": 85.0, "spo2": 97.0, "lactate": 1.5, "creatinine": 1.0, "age": 64.0, "weight_kg": 78.0}
+    return [
+        {
+            "features": {
+                name: (base.get(name, 0.0) + rng.normal(0.0, 1.0, size=window)).round(2).tolist()
+                for name in feature_names
+            }
+        }
+        for _ in range(count)
+    ]
+
+
+async def _drive(client: Any, payloads: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    latencies_ms: List[float] = []
+    outcomes = {"ok": 0, "timeout": 0, "rejected": 0, "error": 0}
+    cursor = iter(payloads)
+
+    async def worker() -> None:
+        for payload in cursor:
+            start = time.perf_counter()
+            response = await client.post("/predict", json=payload)
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+            if response.status_code == 200:
+                timed_out = response.json()["metadata"].get("fallback_active")
+                outcomes["timeout" if timed_out else "ok"] += 1
+            elif response.status_code == 504:
+                outcomes["timeout"] += 1
+            elif response.status_code == 503:
+                outcomes["rejected"] += 1
+            else:
+                outcomes["error"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed_s = time.perf_counter() - start
+    total = len(latencies_ms)
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99]).tolist()
+    return {
+        "requests": total,
+        "throughput_rps": round(total / elapsed_s, 1),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "timeout_rate": round(outcomes["timeout"] / total, 4),
+        "rejected_rate": round(outcomes["rejected"] / total, 4),
+        "error_rate": round(outcomes["error"] / total, 4),
+    }
+
+
+def run_scenario(scenario: Dict[str, Any], *, model_path: Path, feature_names: Tuple[str, ...], requests: int, warmup: int) -> Dict[str, Any]:
+    """Configure the service through the environment, then drive it; runs inside a child process."""
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from telemetry_http import start_stand_in_receiver
+
+    if scenario["transport"] == "grpc":
+        telemetry_server, target = _start_grpc_ingestion_stub()
+        os.environ["EDGE_INFER_TELEMETRY_GRPC_TARGET"] = target
+    else:
+        telemetry_server, endpoint = start_stand_in_receiver()
+        os.environ["EDGE_INFER_TELEMETRY_ENDPOINT"] = endpoint
+    os.environ.update(
+        {
+            "EDGE_INFER_MODEL_PATH": str(model_path),
+            "EDGE_INFER_REQUIRED_FEATURE_NAMES": json.dumps(list(feature_names)),
+            "EDGE_INFER_TELEMETRY_TRANSPORT": scenario["transport"],
+            "EDGE_INFER_MIN_CONFIDENCE": "0.0",
+        }
+    )
+
+    import httpx
+
+    from edge_inference.service import app
+
+    payloads = _payloads(feature_names, scenario["window"], requests + warmup)
+
+    async def measure(client: httpx.AsyncClient) -> Dict[str, Any]:
+        await _drive(client, payloads[:warmup], scenario["concurrency"])
+        return await _drive(client, payloads[warmup:], scenario["concurrency"])
+
+    limits = httpx.Limits(max_connections=scenario["concurrency"], max_keepalive_connections=scenario["concurrency"])
+    if scenario["mode"] == "uvicorn":
+        import uvicorn
+
+        port = _free_port()
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=10.0)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://edge", timeout=10.0)
+
+    async def main() -> Dict[str, Any]:
+        async with client:
+            return await measure(client)
+
+    try:
+        return {**scenario, **asyncio.run(main())}
+    finally:
+        if scenario["mode"] == "uvicorn":
+            server.should_exit = True
+            thread.join(timeout=5.0)
+        telemetry_server.stop(0) if scenario["transport"] == "grpc" else telemetry_server.shutdown()
+
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Scenarios whose p95 grew, or throughput shrank, by more than ``tolerance`` versus the baseline."""
+    previous = {tuple(entry[key] for key in SCENARIO_KEYS): entry for entry in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        base = previous.get(tuple(result[key] for key in SCENARIO_KEYS))
+        if base is None:
+            continue
+        checks = {
+            "p95_ms": result["p95_ms"] > base["p95_ms"] * (1 + tolerance),
+            "throughput_rps": result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance),
+            "timeout_rate": result["timeout_rate"] > base["timeout_rate"] + tolerance / 10,
+        }
+        for metric, regressed in checks.items():
+            if regressed:
+                regressions.append(
+                    {
+                        **{key: result[key] for key in SCENARIO_KEYS},
+                        "metric": metric,
+                        "baseline": base[metric],
+                        "current": result[metric],
+                    }
+                )
+    return regressions
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", default="inprocess,uvicorn")
+    parser.add_argument("--transports", default="http,grpc")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32])
+    parser.add_argument("--windows", type=_int_list, default=[1, 30, 120])
+    parser.add_argument("--requests", type=int, default=400, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=40)
+    parser.add_argument("--feature-contract", type=Path, default=None, help="feature_contract.json from a deploy bundle")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--scenario", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--model", type=Path, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    feature_names = DEFAULT_FEATURE_NAMES
+    if args.feature_contract is not None:
+        contract = json.loads(args.feature_contract.read_text(encoding="utf-8"))
+        feature_names = tuple(contract["required_feature_names"])
+
+    if args.scenario is not None:
+        result = run_scenario(
+            json.loads(args.scenario),
+            model_path=args.model,
+            feature_names=feature_names,
+            requests=args.requests,
+            warmup=args.warmup,
+        )
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        model_path = build_contract_model(Path(workdir) / "contract_model.onnx", feature_names)
+        results = []
+        for mode, transport, concurrency, window in itertools.product(
+            args.modes.split(","), args.transports.split(","), args.concurrency, args.windows
+        ):
+            scenario = {"mode": mode, "transport": transport, "concurrency": concurrency, "window": window}
+            command = [
+                sys.executable,
+                __file__,
+                "--scenario",
+                json.dumps(scenario),
+                "--model",
+                str(model_path),
+                "--requests",
+                str(args.requests),
+                "--warmup",
+                str(args.warmup),
+            ]
+            if args.feature_contract is not None:
+                command += ["--feature-contract", str(args.feature_contract)]
+            completed = subprocess.run(command, capture_output=True, text=True, check=True, cwd=workdir)
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(
+                f"{mode:<9} {transport:<4} c={concurrency:<3} w={window:<4} "
+                f"{result['throughput_rps']:>8.1f} rps  p50={result['p50_ms']:.2f} p95={result['p95_ms']:.2f} "
+                f"p99={result['p99_ms']:.2f} ms  timeouts={result['timeout_rate']:.2%}"
+            )
+
+    report: Dict[str, Any] = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "host": {"cpu_count": os.cpu_count(), "platform": platform.platform(), "python": platform.python_version()},
+        "feature_names": list(feature_names),
+        "requests_per_scenario": args.requests,
+        "results": results,
+    }
+    if args.baseline is not None:
+        report["baseline"] = str(args.baseline)
+        report["regressions"] = compare_to_baseline(
+            results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance
+        )
+        for regression in report["regressions"]:
+            print(f"REGRESSION {regression}")
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.fail_on_regression and report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
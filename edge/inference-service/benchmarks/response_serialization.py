@@ -0,0 +1,104 @@
+"""Compare /predict response serialization: pydantic model + stdlib JSON versus orjson over NumPy.
+
+Run from the service directory:
+
+    python benchmarks/response_serialization.py --iterations 20000
+
+The pydantic path reproduces what FastAPI did per request before the orjson response class:
+flatten the forecast to a Python float list, build ``InferenceResponse``, validate and dump it
+through the route's response field, and render with ``JSONResponse``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from edge_inference.service import (
+    InferenceResponse,
+    ORJSONNumpyResponse,
+    _forecast_vector,
+    _response_payload,
+    app,
+)
+
+METADATA = {"inference_ms": 4.2, "model_sha256": "0" * 64}
+
+
+def _response_field() -> Any:
+    route = next(route for route in app.routes if isinstance(route, APIRoute) and route.path == "/predict")
+    return route.response_field
+
+
+async def _pydantic_path(field: Any, prediction: np.ndarray) -> bytes:
+    model = InferenceResponse(
+        map_forecast=prediction[0].astype(float).tolist(), confidence=0.9, metadata=dict(METADATA)
+    )
+    content = await serialize_response(field=field, response_content=model, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+def _orjson_path(prediction: np.ndarray) -> bytes:
+    return ORJSONNumpyResponse(_response_payload(_forecast_vector(prediction), 0.9, dict(METADATA))).body
+
+
+def _summary(samples_us: List[float]) -> Dict[str, float]:
+    samples_us.sort()
+    return {
+        "p50_us": round(statistics.median(samples_us), 2),
+        "p99_us": round(samples_us[int(0.99 * (len(samples_us) - 1))], 2),
+    }
+
+
+async def _time_pydantic(field: Any, prediction: np.ndarray, iterations: int) -> Dict[str, float]:
+    samples_us: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await _pydantic_path(field, prediction)
+        samples_us.append((time.perf_counter() - start) * 1e6)
+    return _summary(samples_us)
+
+
+def _time_orjson(prediction: np.ndarray, iterations: int) -> Dict[str, float]:
+    samples_us: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        _orjson_path(prediction)
+        samples_us.append((time.perf_counter() - start) * 1e6)
+    return _summary(samples_us)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1, 12, 60, 300])
+    args = parser.parse_args()
+
+    field = _response_field()
+    rng = np.random.default_rng(0)
+    for length in args.lengths:
+        prediction = (65.0 + rng.standard_normal((1, length))).astype(np.float32)
+        pydantic = asyncio.run(_time_pydantic(field, prediction, args.iterations))
+        fast = _time_orjson(prediction, args.iterations)
+        print(
+            json.dumps(
+                {
+                    "forecast_length": length,
+                    "pydantic": pydantic,
+                    "orjson_numpy": fast,
+                    "speedup_p50": round(pydantic["p50_us"] / fast["p50_us"], 2),
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Compare HTTP telemetry publishing strategies against a local stand-in receiver.
+
+Run from the service directory:
+
+    python benchmarks/telemetry_http.py --records 2000 --batch-size 32
+
+The receiver accepts single-record POSTs on ``/telemetry`` and JSON-array or NDJSON bodies
+on ``/telemetry/bulk``, so every strategy is measured end to end over real sockets.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+
+from edge_inference.telemetry_client import TelemetryClient
+
+
+class StandInReceiver(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    received = 0
+    lock = threading.Lock()
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        if self.path.endswith("/bulk"):
+            if self.headers.get("Content-Type") == "application/x-ndjson":
+                count = sum(1 for line in body.splitlines() if line)
+            else:
+                count = len(json.loads(body))
+        else:
+            json.loads(body)
+            count = 1
+        with StandInReceiver.lock:
+            StandInReceiver.received += count
+        self.send_response(202)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        return
+
+
+def start_stand_in_receiver() -> Tuple[ThreadingHTTPServer, str]:
+    """Serve the stand-in receiver on a free loopback port; returns the server and its telemetry endpoint."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInReceiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/telemetry"
+
+
+def _records(total: int) -> List[Dict[str, Any]]:
+    return [
+        {"prediction": [65.0 + (index % 10) * 0.1], "metadata": {"confidence": 0.9, "sequence": index}}
+        for index in range(total)
+    ]
+
+
+def _legacy_per_record(endpoint: str) -> Callable[[List[Dict[str, Any]]], None]:
+    # The pre-pooling behaviour: a fresh connection for every record.
+    def publish(batch: List[Dict[str, Any]]) -> None:
+        for record in batch:
+            httpx.post(endpoint, json=record, headers={"Authorization": "Bearer bench"}, timeout=1.0).raise_for_status()
+
+    return publish
+
+
+def _run(name: str, publish: Callable[[List[Dict[str, Any]]], None], records: List[Dict[str, Any]], batch_size: int) -> Dict[str, Any]:
+    StandInReceiver.received = 0
+    latencies_ms = []
+    start = time.perf_counter()
+    for offset in range(0, len(records), batch_size):
+        batch = records[offset : offset + batch_size]
+        batch_start = time.perf_counter()
+        publish(batch)
+        latencies_ms.append((time.perf_counter() - batch_start) * 1000)
+    elapsed_s = time.perf_counter() - start
+    latencies_ms.sort()
+    return {
+        "strategy": name,
+        "records": StandInReceiver.received,
+        "records_per_s": round(StandInReceiver.received / elapsed_s, 1),
+        "batch_p50_ms": round(statistics.median(latencies_ms), 3),
+        "batch_p95_ms": round(latencies_ms[int(0.95 * (len(latencies_ms) - 1))], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    server, endpoint = start_stand_in_receiver()
+    records = _records(args.records)
+
+    def client(batch_format: str) -> TelemetryClient:
+        return TelemetryClient(
+            transport="http",
+            endpoint=endpoint,
+            grpc_target="unused:0",
+            api_key="bench",
+            default_session_id="bench-session",
+            default_device_id="bench-pump",
+            http_batch_format=batch_format,
+        )
+
+    strategies = {"legacy_per_record": _legacy_per_record(endpoint)}
+    clients = {batch_format: client(batch_format) for batch_format in ("single", "json", "ndjson")}
+    strategies.update({f"pooled_{name}": c.publish_predictions for name, c in clients.items()})
+
+    try:
+        for name, publish in strategies.items():
+            print(json.dumps(_run(name, publish, records, args.batch_size)))
+    finally:
+        for c in clients.values():
+            c.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
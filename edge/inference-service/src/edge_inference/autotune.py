@@ -0,0 +1,116 @@
+"""Benchmark ORT threading profiles for the configured model on this host."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import onnxruntime as ort
+
+from .config import OrtProfile, get_settings
+from .model_runner import session_options_for
+
+# Profiles whose p95 is within this fraction of the fastest are considered equivalent;
+# the one using the fewest threads wins so co-located services keep their cores.
+P95_TOLERANCE = 0.05
+
+
+def candidate_profiles(cpu_count: int) -> List[OrtProfile]:
+    intra_options = sorted({n for n in (1, 2, 4, 8, 16) if n <= cpu_count} | {cpu_count})
+    candidates = []
+    for intra in intra_options:
+        for spinning in (True, False):
+            candidates.append(OrtProfile(intra_op_num_threads=intra, allow_spinning=spinning))
+            if intra * 2 <= cpu_count:
+                candidates.append(
+                    OrtProfile(
+                        intra_op_num_threads=intra,
+                        inter_op_num_threads=2,
+                        execution_mode="parallel",
+                        allow_spinning=spinning,
+                    )
+                )
+    return candidates
+
+
+def _synthetic_inputs(session: ort.InferenceSession, rows: int) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(0)
+    inputs = {}
+    for spec in session.get_inputs():
+        shape = [dim if isinstance(dim, int) and dim > 0 else rows for dim in spec.shape]
+        inputs[spec.name] = rng.normal(size=shape).astype(np.float32)
+    return inputs
+
+
+def benchmark_profile(model_path: Path, profile: OrtProfile, *, rows: int, runs: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    session = ort.InferenceSession(str(model_path), session_options_for(profile), providers=["CPUExecutionProvider"])
+    load_ms = (time.perf_counter() - start) * 1000
+    inputs = _synthetic_inputs(session, rows)
+    for _ in range(min(5, runs)):
+        session.run(None, inputs)
+
+    latencies_ms = np.empty(runs)
+    for index in range(runs):
+        start = time.perf_counter()
+        session.run(None, inputs)
+        latencies_ms[index] = (time.perf_counter() - start) * 1000
+    return {
+        "profile": profile.model_dump(),
+        "load_ms": load_ms,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+
+def autotune(model_path: Path, *, rows: int, runs: int, cpu_count: int) -> Tuple[OrtProfile, List[Dict[str, Any]]]:
+    results = [benchmark_profile(model_path, profile, rows=rows, runs=runs) for profile in candidate_profiles(cpu_count)]
+    fastest_p95 = min(result["p95_ms"] for result in results)
+    eligible = [result for result in results if result["p95_ms"] <= fastest_p95 * (1 + P95_TOLERANCE)]
+    best = min(
+        eligible,
+        key=lambda result: (
+            result["profile"]["intra_op_num_threads"] * result["profile"]["inter_op_num_threads"],
+            result["p95_ms"],
+        ),
+    )
+    return OrtProfile.model_validate(best["profile"]), results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", type=Path, default=None, help="defaults to EDGE_INFER_MODEL_PATH")
+    parser.add_argument("--output", type=Path, default=Path("ort_profile.json"))
+    parser.add_argument("--report", type=Path, default=None)
+    parser.add_argument("--rows", type=int, default=1, help="batch/window rows fed to dynamic dimensions")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--cpu-count", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    model_path = args.model or get_settings().model_path
+    best, results = autotune(model_path, rows=args.rows, runs=args.runs, cpu_count=args.cpu_count)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(best.model_dump_json(indent=2), encoding="utf-8")
+    if args.report is not None:
+        report = {"model_path": str(model_path), "rows": args.rows, "runs": args.runs, "results": results}
+        args.report.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    for result in sorted(results, key=lambda item: item["p95_ms"]):
+        profile = result["profile"]
+        print(
+            f"intra={profile['intra_op_num_threads']:<2} inter={profile['inter_op_num_threads']} "
+            f"mode={profile['execution_mode']:<10} spinning={str(profile['allow_spinning']):<5} "
+            f"p50={result['p50_ms']:.3f}ms p95={result['p95_ms']:.3f}ms"
+        )
+    print(f"best profile written to {args.output}; set EDGE_INFER_ORT_PROFILE_PATH={args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Length-delimited protobuf fixture files: varint-prefixed serialized ``TelemetryEnvelope`` records.
+
+The layout matches protobuf's ``writeDelimitedTo`` streams, so any protobuf runtime can read it back.
+"""
+
+from __future__ import annotations
+
+import mmap
+from pathlib import Path
+from typing import BinaryIO, Iterator, Tuple
+
+BINARY_FIXTURE_SUFFIX = ".binpb"
+
+
+def is_binary_fixture(path: Path) -> bool:
+    return path.suffix == BINARY_FIXTURE_SUFFIX
+
+
+def encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return bytes(out)
+
+
+def _decode_varint(buffer, position: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        if position >= len(buffer):
+            raise ValueError("Truncated length prefix in binary fixture")
+        byte = buffer[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+        if shift > 63:
+            raise ValueError("Malformed length prefix in binary fixture")
+
+
+class BinaryFixtureWriter:
+    """Appends serialized envelopes with length prefixes."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._handle: BinaryIO = path.open("wb")
+        self.records = 0
+
+    def write(self, record: bytes) -> None:
+        self._handle.write(encode_varint(len(record)))
+        self._handle.write(record)
+        self.records += 1
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def __enter__(self) -> "BinaryFixtureWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def iter_records(fixture_path: Path) -> Iterator[bytes]:
+    """Yield serialized envelopes from a memory-mapped binary fixture, in file order."""
+    size = fixture_path.stat().st_size
+    if size == 0:
+        return
+    with fixture_path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        position = 0
+        while position < size:
+            length, start = _decode_varint(mapped, position)
+            end = start + length
+            if end > size:
+                raise ValueError(f"Truncated record at byte {position} in binary fixture")
+            yield mapped[start:end]
+            position = end
@@ -2,18 +2,80 @@
 
 from __future__ import annotations
 
+import os
 from functools import lru_cache
 from pathlib import Path
-from pydantic import Field, PositiveInt
+from typing import Literal
+from pydantic import BaseModel, ConfigDict, Field, PositiveInt, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class OrtProfile(BaseModel):
+    """ONNX Runtime threading, execution-mode and allocator settings for one host class."""
+
+    intra_op_num_threads: PositiveInt = 1
+    inter_op_num_threads: PositiveInt = 1
+    execution_mode: Literal["sequential", "parallel"] = "sequential"
+    enable_cpu_mem_arena: bool = True
+    enable_mem_pattern: bool = True
+    allow_spinning: bool = True
+
+    model_config = ConfigDict(frozen=True)
+
+
+BUILTIN_ORT_PROFILES: dict[str, OrtProfile] = {
+    "single": OrtProfile(),
+    "gateway": OrtProfile(intra_op_num_threads=2, allow_spinning=False),
+    "aggregator": OrtProfile(intra_op_num_threads=4, inter_op_num_threads=2, execution_mode="parallel"),
+}
+
+
+@lru_cache(maxsize=8)
+def load_ort_profile(path: Path) -> OrtProfile:
+    """Load a profile file written by ``python -m edge_inference.autotune``."""
+    return OrtProfile.model_validate_json(path.read_text(encoding="utf-8"))
+
+
 class Settings(BaseSettings):
     model_path: Path = Field(default=Path("/opt/edge/models/map_predictor.onnx"))
+    model_manifest_path: Path | None = Field(default=None)
+    model_variant: Literal["base", "optimized", "int8", "fp16"] = Field(default="base")
+    model_optimization_cache_dir: Path | None = Field(default=None)
+    model_reload_poll_s: float = Field(default=5.0, ge=0.0)
+    model_ensemble_enabled: bool = Field(default=False)
+    ensemble_aggregator: Literal["mean", "median", "confidence_weighted"] | None = Field(default=None)
+    ensemble_spread_scale_mmhg: float = Field(default=5.0, gt=0.0)
+    model_warmup_runs: PositiveInt = Field(default=5)
+    model_warmup_max_ms: float | None = Field(default=None, gt=0.0)
     inference_timeout_ms: PositiveInt = Field(default=150)
+    ort_profile: str = Field(default="single")
+    ort_profiles: dict[str, OrtProfile] = Field(default_factory=lambda: dict(BUILTIN_ORT_PROFILES))
+    ort_profile_path: Path | None = Field(default=None)
+    inference_workers: PositiveInt | None = Field(default=None)
+    inference_queue_max: int = Field(default=16, ge=0)
+    inference_retry_after_s: PositiveInt = Field(default=1)
+    fallback_feature_name: str = Field(default="map")
+    fallback_confidence: float = Field(default=0.5, ge=0.0, le=1.0)
+    fallback_min_value: float = Field(default=20.0)
+    fallback_max_value: float = Field(default=200.0)
     min_confidence: float = Field(default=0.5)
     required_feature_names: list[str] = Field(default_factory=list)
+    feature_input_layout: Literal["named", "single_tensor_row_major"] = Field(default="named")
+    feature_input_name: str = Field(default="input")
     allow_legacy_confidence_index: bool = Field(default=True)
+    stream_vitals: list[str] = Field(default_factory=lambda: ["map"])
+    stream_window_size: PositiveInt = Field(default=60)
+    stream_feature_mode: Literal["window", "rolling"] = Field(default="window")
+    stream_inference_hz: float = Field(default=1.0, gt=0.0)
+    stream_min_samples: PositiveInt = Field(default=2)
+    stream_max_sessions: PositiveInt = Field(default=512)
+    shadow_model_path: Path | None = Field(default=None)
+    shadow_ort_profile: str = Field(default="single")
+    shadow_queue_size: PositiveInt = Field(default=64)
+    shadow_agreement_tolerance_mmhg: float = Field(default=5.0, gt=0.0)
+    prediction_cache_enabled: bool = Field(default=False)
+    prediction_cache_max_entries: PositiveInt = Field(default=256)
+    prediction_cache_ttl_s: float = Field(default=5.0, gt=0.0)
     telemetry_transport: str = Field(default="http")
     telemetry_endpoint: str = Field(default="http://localhost:8081/telemetry")
     telemetry_grpc_target: str = Field(default="localhost:50051")
@@ -24,10 +86,57 @@ class Settings(BaseSettings):
     telemetry_session_id: str = Field(default="demo-session-000")
     telemetry_device_id: str = Field(default="pump-00")
     telemetry_api_key: str = Field(default="change-me")
+    telemetry_http2: bool = Field(default=True)
+    telemetry_http_batch_format: Literal["single", "json", "ndjson"] = Field(default="single")
+    telemetry_queue_max: PositiveInt = Field(default=1024)
+    telemetry_batch_size: PositiveInt = Field(default=32)
+    telemetry_flush_interval_s: float = Field(default=0.5, gt=0.0)
+    telemetry_spool_path: Path | None = Field(default=None)
+    telemetry_spool_max_bytes: PositiveInt = Field(default=64 * 1024 * 1024)
+    telemetry_forward_rate_per_s: float = Field(default=200.0, gt=0.0)
+    profiling_enabled: bool = Field(default=False)
+    profiling_window: PositiveInt = Field(default=1024)
+    debug_endpoints_enabled: bool = Field(default=False)
+    ort_trace_dir: Path = Field(default=Path("/tmp/edge-inference-ort-traces"))
+    ort_trace_max_requests: PositiveInt = Field(default=1000)
     host: str = Field(default="0.0.0.0")
     port: PositiveInt = Field(default=8080)
 
-    model_config = SettingsConfigDict(env_prefix="EDGE_INFER_", env_file=".env")
+    model_config = SettingsConfigDict(env_prefix="EDGE_INFER_", env_file=".env", protected_namespaces=("settings_",))
+
+    @model_validator(mode="after")
+    def _check_ort_profile(self) -> "Settings":
+        if self.ort_profile_path is None and self.ort_profile not in self.ort_profiles:
+            raise ValueError(f"Unknown ORT profile '{self.ort_profile}'; expected one of {sorted(self.ort_profiles)}")
+        if self.shadow_ort_profile not in self.ort_profiles:
+            raise ValueError(
+                f"Unknown shadow ORT profile '{self.shadow_ort_profile}'; expected one of {sorted(self.ort_profiles)}"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def _check_feature_layout(self) -> "Settings":
+        if self.feature_input_layout == "single_tensor_row_major" and not self.required_feature_names:
+            raise ValueError("feature_input_layout=single_tensor_row_major requires required_feature_names")
+        return self
+
+    @model_validator(mode="after")
+    def _check_fallback_range(self) -> "Settings":
+        if self.fallback_min_value >= self.fallback_max_value:
+            raise ValueError("fallback_min_value must be below fallback_max_value")
+        return self
+
+    def resolve_ort_profile(self) -> OrtProfile:
+        if self.ort_profile_path is not None:
+            return load_ort_profile(self.ort_profile_path)
+        return self.ort_profiles[self.ort_profile]
+
+    def resolve_inference_workers(self) -> int:
+        """Concurrent session runs that fit the host without oversubscribing ORT's own threads."""
+        if self.inference_workers is not None:
+            return self.inference_workers
+        profile = self.resolve_ort_profile()
+        return max(1, (os.cpu_count() or 1) // (profile.intra_op_num_threads * profile.inter_op_num_threads))
 
 
 @lru_cache(maxsize=1)
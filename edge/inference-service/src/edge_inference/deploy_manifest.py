@@ -0,0 +1,74 @@
+"""Helpers for reading deploy manifests produced by the training export bundle."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while True:
+            chunk = handle.read(1024 * 1024)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_deploy_manifest(manifest_path: Path) -> Dict[str, Any]:
+    """Load a ``deploy_manifest.json`` written by ``build_deploy_artifact_bundle``."""
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if not isinstance(manifest.get("model_binary"), dict):
+        raise ValueError(f"Deploy manifest {manifest_path} has no model_binary section")
+    return manifest
+
+
+def resolve_model_binary(manifest: Dict[str, Any], variant: str) -> Dict[str, Any]:
+    """Return ``path``, ``sha256`` and ``pre_optimized`` for the requested model variant."""
+    if variant == "base":
+        entry = manifest["model_binary"]
+    else:
+        entry = manifest.get("model_variants", {}).get(variant)
+        if entry is None or entry.get("status", "ok") != "ok":
+            raise ValueError(f"Deploy manifest has no usable '{variant}' model variant")
+    sha256 = str(entry.get("sha256", "")).lower()
+    if len(sha256) != 64:
+        raise ValueError(f"Deploy manifest sha256 for '{variant}' variant is missing or malformed")
+    return {
+        "path": str(entry["path"]),
+        "sha256": sha256,
+        "pre_optimized": bool(entry.get("pre_optimized", False)),
+    }
+
+
+def resolve_ensemble(manifest: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return ``aggregator`` and validated ``members`` from the optional ``ensemble`` section."""
+    section = manifest.get("ensemble")
+    if section is None:
+        return None
+    members: List[Dict[str, Any]] = []
+    for entry in section.get("members", []):
+        sha256 = str(entry.get("sha256", "")).lower()
+        if len(sha256) != 64:
+            raise ValueError(f"Deploy manifest sha256 for ensemble member '{entry.get('name')}' is missing or malformed")
+        weight = float(entry.get("weight", 1.0))
+        if weight < 0.0:
+            raise ValueError(f"Ensemble member '{entry.get('name')}' has a negative weight")
+        members.append(
+            {
+                "name": str(entry["name"]),
+                "path": str(entry["path"]),
+                "sha256": sha256,
+                "weight": weight,
+                "pre_optimized": bool(entry.get("pre_optimized", False)),
+            }
+        )
+    if not members:
+        raise ValueError("Deploy manifest ensemble section has no members")
+    if len({member["name"] for member in members}) != len(members):
+        raise ValueError("Deploy manifest ensemble member names must be unique")
+    return {"aggregator": section.get("aggregator", "mean"), "members": members}
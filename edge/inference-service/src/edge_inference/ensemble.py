@@ -0,0 +1,296 @@
+"""Concurrent multi-model ensemble execution on a shared thread budget."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import onnxruntime as ort
+
+from .config import OrtProfile
+from .latency_profiler import stage
+from .model_runner import (
+    ModelRunner,
+    _create_session,
+    _record_queue_wait,
+    _smoke_check,
+    _submit_timed,
+    _wait_async,
+    session_options_for,
+)
+
+AGGREGATORS = ("mean", "median", "confidence_weighted")
+
+
+@dataclass(frozen=True)
+class EnsembleMember:
+    name: str
+    path: str
+    sha256: str
+    weight: float = 1.0
+    pre_optimized: bool = False
+
+
+def ensemble_sha256(members: Sequence[EnsembleMember], aggregator: str) -> str:
+    """Identity of the whole ensemble; changes when any member, weight or the aggregator changes."""
+    digest = hashlib.sha256(aggregator.encode("utf-8"))
+    for member in members:
+        digest.update(f"{member.name}:{member.sha256}:{member.weight!r}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def aggregate(
+    predictions: List[np.ndarray],
+    confidences: List[Optional[float]],
+    weights: List[float],
+    method: str,
+    legacy_confidence_column: bool = False,
+) -> Tuple[np.ndarray, float]:
+    """Combine member predictions and return ``(prediction, spread)``.
+
+    Spread is the mean across forecast elements of the member standard deviation, in output units. With
+    ``legacy_confidence_column``, a ``[1, n>=2]`` output carries its confidence at ``[0, 1]`` (the legacy
+    index layout) and that element is left out of the spread.
+    """
+    stacked = np.stack([np.asarray(prediction, dtype=np.float64) for prediction in predictions])
+    if method == "median":
+        combined = np.median(stacked, axis=0)
+    else:
+        member_weights = np.asarray(weights, dtype=np.float64)
+        if method == "confidence_weighted":
+            member_weights = member_weights * np.asarray(
+                [1.0 if confidence is None else confidence for confidence in confidences]
+            )
+        if member_weights.sum() <= 0.0:
+            member_weights = np.ones(len(predictions))
+        combined = np.tensordot(member_weights / member_weights.sum(), stacked, axes=1)
+    forecasts = stacked.reshape(len(predictions), -1)
+    if legacy_confidence_column and stacked.ndim == 3 and stacked.shape[1] == 1 and stacked.shape[2] >= 2:
+        forecasts = np.delete(forecasts, 1, axis=1)
+    spread = float(forecasts.std(axis=0).mean()) if len(predictions) > 1 else 0.0
+    return combined.astype(np.float32), spread
+
+
+class _MemberStats:
+    def __init__(self, window: int = 512) -> None:
+        self.latencies_ms: Deque[float] = deque(maxlen=window)
+        self.runs = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = np.asarray(self.latencies_ms)
+        return {
+            "runs": self.runs,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "p50_ms": float(np.percentile(latencies, 50)) if latencies.size else None,
+            "p95_ms": float(np.percentile(latencies, 95)) if latencies.size else None,
+        }
+
+
+class EnsembleRunner(ModelRunner):
+    """Runs every member concurrently within the inference deadline and aggregates the survivors.
+
+    The ORT profile's intra-op threads are split across members so the ensemble uses the same thread
+    budget as a single model. Members still running at the deadline are terminated and left out of the
+    aggregate; the deterministic fallback is used only when no member finished.
+    """
+
+    def __init__(
+        self,
+        *,
+        members: Sequence[EnsembleMember],
+        aggregator: str = "mean",
+        spread_scale: float = 5.0,
+        inference_timeout_ms: int,
+        ort_profile: OrtProfile | None = None,
+        max_concurrent_runs: int = 1,
+        pre_optimized: bool = False,
+        optimization_cache_dir: Path | None = None,
+        model_path: str | None = None,  # accepted for factory compatibility; members are authoritative
+        model_sha256: str | None = None,
+        **options: Any,
+    ) -> None:
+        if not members:
+            raise ValueError("An ensemble needs at least one member")
+        if aggregator not in AGGREGATORS:
+            raise ValueError(f"Unknown ensemble aggregator '{aggregator}'; expected one of {AGGREGATORS}")
+        profile = ort_profile or OrtProfile()
+        member_profile = profile.model_copy(
+            update={"intra_op_num_threads": max(1, profile.intra_op_num_threads // len(members))}
+        )
+        first = members[0]
+        super().__init__(
+            model_path=first.path,
+            inference_timeout_ms=inference_timeout_ms,
+            model_sha256=first.sha256,
+            pre_optimized=first.pre_optimized,
+            optimization_cache_dir=optimization_cache_dir,
+            ort_profile=member_profile,
+            max_concurrent_runs=max_concurrent_runs,
+            **options,
+        )
+        self.model_sha256 = ensemble_sha256(members, aggregator)
+        self._members: List[Tuple[EnsembleMember, ort.InferenceSession]] = [(first, self._session)]
+        for member in members[1:]:
+            session = _create_session(
+                member.path,
+                session_options_for(member_profile),
+                member.sha256,
+                member.pre_optimized,
+                optimization_cache_dir,
+            )
+            self._members.append((member, session))
+        self._aggregator = aggregator
+        self._spread_scale = spread_scale
+        self._member_stats = {member.name: _MemberStats() for member in members}
+        self._stats_lock = threading.Lock()
+        # One worker per member per concurrent request, plus one spare per member for abandoned runs.
+        self._executor.shutdown(wait=False)
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(members) * (max_concurrent_runs + 1), thread_name_prefix="ort-ensemble"
+        )
+
+    @staticmethod
+    def _timed_run(session: ort.InferenceSession, inputs: Dict[str, np.ndarray], run_options: ort.RunOptions):
+        start = time.monotonic()
+        outputs = session.run(None, inputs, run_options)
+        return outputs, (time.monotonic() - start) * 1000
+
+    def run(self, features: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, Any]]:
+        start, arrays, pending = self._start_members(features)
+        with stage("session_run"):
+            done, late = wait(pending, timeout=self._remaining_s(start))
+        return self._collect(pending, done, late, arrays, start)
+
+    async def run_async(self, features: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, Any]]:
+        start, arrays, pending = self._start_members(features)
+        try:
+            with stage("session_run"):
+                done, late = await _wait_async(list(pending), self._remaining_s(start))
+        except asyncio.CancelledError:
+            for future, (_, run_options, _) in pending.items():
+                self._abandon(future, run_options)
+            raise
+        _record_queue_wait([timing for _, _, timing in pending.values()])
+        return self._collect(pending, done, late, arrays, start)
+
+    def _start_members(self, features: Dict[str, Any]) -> Tuple[float, Dict[str, np.ndarray], Dict[Future, Any]]:
+        start = time.monotonic()
+        with stage("tensor_convert"):
+            arrays = {k: np.asarray(v, dtype=np.float32) for k, v in features.items()}
+            inputs = self._model_inputs(arrays)
+        pending = {}
+        for member, session in self._members:
+            run_options = ort.RunOptions()
+            future, timing = _submit_timed(self._executor, self._timed_run, session, inputs, run_options)
+            pending[future] = (member, run_options, timing)
+        return start, arrays, pending
+
+    def _collect(
+        self,
+        pending: Dict[Future, Any],
+        done: Iterable[Future],
+        late: Iterable[Future],
+        arrays: Dict[str, np.ndarray],
+        start: float,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        finished: List[Tuple[EnsembleMember, List[Any]]] = []
+        with self._stats_lock:
+            for future in late:
+                member, run_options, _ = pending[future]
+                self._abandon(future, run_options)
+                self._member_stats[member.name].dropped += 1
+            for future in done:
+                member = pending[future][0]
+                stats = self._member_stats[member.name]
+                try:
+                    outputs, elapsed_ms = future.result()
+                except Exception:  # noqa: BLE001 - a failing member is left out like a late one
+                    stats.failed += 1
+                    continue
+                stats.runs += 1
+                stats.latencies_ms.append(elapsed_ms)
+                finished.append((member, outputs))
+        if not finished:
+            return self._fallback(arrays, start)
+        order = {member.name: index for index, (member, _) in enumerate(self._members)}
+        finished.sort(key=lambda item: order[item[0].name])
+
+        confidences: List[Optional[float]] = []
+        for _, outputs in finished:
+            confidence_output = np.asarray(outputs[1]) if len(outputs) > 1 else None
+            confidences.append(
+                float(confidence_output.reshape(-1)[0])
+                if confidence_output is not None and confidence_output.size == 1
+                else None
+            )
+        reported = [confidence for confidence in confidences if confidence is not None]
+        prediction, spread = aggregate(
+            [outputs[0] for _, outputs in finished],
+            confidences,
+            [member.weight for member, _ in finished],
+            self._aggregator,
+            legacy_confidence_column=not reported,
+        )
+        metadata: Dict[str, Any] = {
+            "inference_ms": (time.monotonic() - start) * 1000,
+            "ensemble_spread": spread,
+            "ensemble_members": float(len(finished)),
+            "ensemble_dropped": float(len(self._members) - len(finished)),
+        }
+        # Without a confidence output, confidence stays unset so the service applies the legacy index
+        # rules to the aggregated output, exactly as for a single model; nothing is assumed.
+        if reported:
+            # Member disagreement lowers confidence: a spread of ``spread_scale`` halves it.
+            metadata["confidence"] = float(np.mean(reported)) / (1.0 + spread / self._spread_scale)
+        self._remember(prediction, metadata.get("confidence"))
+        return prediction, metadata
+
+    def warmup(self, runs: int) -> List[float]:
+        inputs = self._synthetic_inputs()
+        latencies_ms = []
+        for _ in range(runs):
+            start = time.monotonic()
+            futures = [self._executor.submit(session.run, None, inputs) for _, session in self._members]
+            outputs = [future.result() for future in futures]
+            for member_outputs in outputs:
+                _smoke_check(member_outputs)
+            # ``aggregate`` stacks member outputs, so a shape mismatch would fail every request.
+            shapes = {
+                member.name: tuple(np.shape(member_outputs[0]))
+                for (member, _), member_outputs in zip(self._members, outputs)
+            }
+            if len(set(shapes.values())) > 1:
+                raise RuntimeError(f"Ensemble members produce different output shapes: {shapes}")
+            latencies_ms.append((time.monotonic() - start) * 1000)
+            with self._last_good_lock:
+                self._output_shape = tuple(np.shape(outputs[0][0]))
+        return latencies_ms
+
+    def start_trace(self, requests: int, output_dir: Path) -> None:
+        raise RuntimeError("ORT tracing is not supported for ensembles; trace a single member instead")
+
+    def member_status(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "aggregator": self._aggregator,
+                "members": {
+                    member.name: {
+                        "sha256": member.sha256,
+                        "weight": member.weight,
+                        **self._member_stats[member.name].snapshot(),
+                    }
+                    for member, _ in self._members
+                },
+            }
+
@@ -0,0 +1,111 @@
+"""Admission control for inference on the async request path."""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Slot:
+    """One admitted call; released once the call and every hold taken during it have finished."""
+
+    def __init__(self, release: Callable[[], None]) -> None:
+        self._release = release
+        self._lock = threading.Lock()
+        self._holds = 1
+
+    def hold(self) -> Callable[[], None]:
+        with self._lock:
+            self._holds += 1
+        return self.done
+
+    def done(self) -> None:
+        with self._lock:
+            self._holds -= 1
+            finished = self._holds == 0
+        if finished:
+            self._release()
+
+
+_CURRENT_SLOT: contextvars.ContextVar[Optional[_Slot]] = contextvars.ContextVar("inference_slot", default=None)
+
+
+def hold_slot() -> Callable[[], None]:
+    """Keep the calling pool slot admitted until the returned callback runs; a no-op outside the pool.
+
+    For work a call leaves running after it returns, such as an ORT run abandoned at the deadline.
+    """
+    slot = _CURRENT_SLOT.get()
+    return slot.hold() if slot is not None else (lambda: None)
+
+
+class InferencePoolSaturated(RuntimeError):
+    """Raised when every worker is busy and the admission queue is full."""
+
+    def __init__(self, retry_after_s: int) -> None:
+        super().__init__("Inference pool saturated")
+        self.retry_after_s = retry_after_s
+
+
+class InferencePool:
+    """Admits at most ``workers`` running plus ``max_queue`` waiting inference calls; rejects the rest.
+
+    The calls run on the model runner's own ORT executor. Admitted calls beyond the runner's concurrency
+    wait in that executor, and the wait counts against their inference deadline, so ``max_queue`` bounds
+    how many requests can end up answered by the fallback. A slot is held until the underlying run
+    finishes, not until the awaiting request goes away, so a disconnected client cannot let more work in
+    than the runner can execute. Work the call leaves running after it returns keeps the slot too, via
+    :func:`hold_slot`.
+    """
+
+    def __init__(self, *, workers: int, max_queue: int, retry_after_s: int = 1) -> None:
+        self.workers = workers
+        self._capacity = workers + max_queue
+        self._retry_after_s = retry_after_s
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self.max_admitted = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _release(self) -> None:
+        with self._lock:
+            self._admitted -= 1
+            self.completed += 1
+
+    def _admit(self) -> _Slot:
+        with self._lock:
+            if self._admitted >= self._capacity:
+                self.rejected += 1
+                raise InferencePoolSaturated(self._retry_after_s)
+            self._admitted += 1
+            self.max_admitted = max(self.max_admitted, self._admitted)
+        return _Slot(self._release)
+
+    async def run_async(self, fn: Callable[..., Awaitable[T]], *args: Any) -> T:
+        """Admit a coroutine that awaits its own executor, such as :meth:`ModelRunner.run_async`.
+
+        The slot is released when the coroutine returns, unless work it left running holds it through
+        :func:`hold_slot`.
+        """
+        slot = self._admit()
+        token = _CURRENT_SLOT.set(slot)
+        try:
+            return await fn(*args)
+        finally:
+            _CURRENT_SLOT.reset(token)
+            slot.done()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self._capacity,
+                "in_flight": self._admitted,
+                "max_in_flight": self.max_admitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,137 @@
+"""Per-stage request latency instrumentation with rolling percentiles and histograms."""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import numpy as np
+
+# Bucket upper bounds in milliseconds; one extra bucket collects everything slower.
+HISTOGRAM_BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 150.0, 250.0, 500.0, 1000.0)
+
+_CURRENT: ContextVar[Optional[Dict[str, float]]] = ContextVar("edge_inference_stage_timings", default=None)
+
+
+def record_stage(name: str, elapsed_ms: float) -> None:
+    """Add ``elapsed_ms`` to ``name`` for the request being profiled, if any."""
+    timings = _CURRENT.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + elapsed_ms
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block into the current request's breakdown; a no-op when profiling is off."""
+    if _CURRENT.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, (time.perf_counter() - start) * 1000)
+
+
+class StageStats:
+    """Rolling window of recent durations for percentiles plus a cumulative fixed-bucket histogram."""
+
+    def __init__(self, window: int) -> None:
+        self._window = np.zeros(window, dtype=np.float64)
+        self._next = 0
+        self.count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._buckets = np.zeros(len(HISTOGRAM_BOUNDS_MS) + 1, dtype=np.int64)
+
+    def observe(self, elapsed_ms: float) -> None:
+        self._window[self._next % self._window.size] = elapsed_ms
+        self._next += 1
+        self.count += 1
+        self._sum += elapsed_ms
+        self._max = max(self._max, elapsed_ms)
+        self._buckets[np.searchsorted(HISTOGRAM_BOUNDS_MS, elapsed_ms, side="left")] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        recent = self._window[: min(self._next, self._window.size)]
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99]).tolist() if recent.size else (None, None, None)
+        return {
+            "count": self.count,
+            "window": int(recent.size),
+            "mean_ms": self._sum / self.count if self.count else None,
+            "max_ms": self._max if self.count else None,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "histogram": {
+                "bounds_ms": list(HISTOGRAM_BOUNDS_MS),
+                "counts": self._buckets[:-1].tolist(),
+                "overflow": int(self._buckets[-1]),
+            },
+        }
+
+
+class LatencyProfiler:
+    """Aggregates per-request stage breakdowns collected through :func:`stage`.
+
+    ``total`` is measured around the whole ASGI call and ``handler`` around the endpoint body, so
+    ``framework`` (routing, body parsing, pydantic validation, response serialization) is their difference.
+    """
+
+    def __init__(self, *, window: int, enabled: bool = False) -> None:
+        self._window = window
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stages: Dict[str, StageStats] = {}
+
+    def begin(self) -> Optional[Dict[str, float]]:
+        return {} if self.enabled else None
+
+    def observe(self, timings: Dict[str, float], total_ms: float) -> None:
+        timings = dict(timings, total=total_ms)
+        if "handler" in timings:
+            timings["framework"] = max(0.0, total_ms - timings["handler"])
+        with self._lock:
+            for name, elapsed_ms in timings.items():
+                stats = self._stages.get(name)
+                if stats is None:
+                    stats = self._stages[name] = StageStats(self._window)
+                stats.observe(elapsed_ms)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: stats.snapshot() for name, stats in sorted(self._stages.items())}
+        return {"enabled": self.enabled, "stages": stages}
+
+
+class StageTimingMiddleware:
+    """ASGI middleware that opens a stage-timing scope for profiled paths."""
+
+    def __init__(self, app: Any, *, profiler: Callable[[], LatencyProfiler], paths: tuple[str, ...]) -> None:
+        self.app = app
+        self._profiler = profiler
+        self._paths = paths
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope["path"] not in self._paths:
+            await self.app(scope, receive, send)
+            return
+        profiler = self._profiler()
+        timings = profiler.begin()
+        if timings is None:
+            await self.app(scope, receive, send)
+            return
+        token = _CURRENT.set(timings)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _CURRENT.reset(token)
+            profiler.observe(timings, (time.perf_counter() - start) * 1000)
@@ -0,0 +1,306 @@
+"""Hot model reload driven by the deploy manifest."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .config import OrtProfile, Settings
+from .deploy_manifest import load_deploy_manifest, resolve_ensemble, resolve_model_binary, sha256_file
+from .ensemble import EnsembleMember, EnsembleRunner, ensemble_sha256
+from .model_runner import ModelRunner
+
+# Members and aggregator of an ensemble resolved from the manifest.
+EnsembleSpec = Tuple[Tuple[EnsembleMember, ...], str]
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    """Hashable subset of settings needed to build and reload model runners."""
+
+    model_path: Path
+    manifest_path: Optional[Path]
+    model_variant: str
+    optimization_cache_dir: Optional[Path]
+    inference_timeout_ms: int
+    fallback_feature_name: str
+    fallback_confidence: float
+    fallback_value_range: Tuple[float, float]
+    reload_poll_interval_s: float
+    warmup_runs: int
+    warmup_max_ms: float
+    ort_profile: OrtProfile
+    max_concurrent_runs: int
+    input_layout: str
+    feature_names: Tuple[str, ...]
+    input_name: str
+    ensemble_enabled: bool
+    ensemble_aggregator: Optional[str]
+    ensemble_spread_scale: float
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ModelConfig":
+        return cls(
+            model_path=settings.model_path,
+            manifest_path=settings.model_manifest_path,
+            model_variant=settings.model_variant,
+            optimization_cache_dir=settings.model_optimization_cache_dir,
+            inference_timeout_ms=settings.inference_timeout_ms,
+            fallback_feature_name=settings.fallback_feature_name,
+            fallback_confidence=settings.fallback_confidence,
+            fallback_value_range=(settings.fallback_min_value, settings.fallback_max_value),
+            reload_poll_interval_s=settings.model_reload_poll_s,
+            warmup_runs=settings.model_warmup_runs,
+            warmup_max_ms=settings.model_warmup_max_ms or float(settings.inference_timeout_ms),
+            ort_profile=settings.resolve_ort_profile(),
+            max_concurrent_runs=settings.resolve_inference_workers(),
+            input_layout=settings.feature_input_layout,
+            feature_names=tuple(settings.required_feature_names),
+            input_name=settings.feature_input_name,
+            ensemble_enabled=settings.model_ensemble_enabled,
+            ensemble_aggregator=settings.ensemble_aggregator,
+            ensemble_spread_scale=settings.ensemble_spread_scale_mmhg,
+        )
+
+    def for_shadow(self, shadow_model_path: Path, ort_profile: OrtProfile = OrtProfile()) -> "ModelConfig":
+        """This configuration for a shadow candidate, run by a single worker without reloads.
+
+        The candidate keeps the primary's optimization cache and input contract but gets its own ORT
+        profile, single-threaded by default, so it does not compete with the primary for cores. A
+        ``.json`` path is read as a deploy manifest and resolved to this configuration's variant;
+        anything else is loaded as a model binary.
+        """
+        is_manifest = shadow_model_path.suffix == ".json"
+        return replace(
+            self,
+            model_path=shadow_model_path,
+            manifest_path=shadow_model_path if is_manifest else None,
+            ort_profile=ort_profile,
+            reload_poll_interval_s=0.0,
+            max_concurrent_runs=1,
+            ensemble_enabled=False,
+        )
+
+
+class ModelManager:
+    """Owns the active runner and swaps in manifest-verified, warmed-up replacements."""
+
+    def __init__(
+        self,
+        config: ModelConfig,
+        *,
+        runner_factory: Callable[..., ModelRunner] = ModelRunner,
+        ensemble_factory: Callable[..., ModelRunner] = EnsembleRunner,
+    ) -> None:
+        self._config = config
+        self._runner_factory = runner_factory
+        self._ensemble_factory = ensemble_factory
+        self._reload_lock = threading.Lock()
+        # Guards the swap and lease counts. Runners swapped out while leased are closed by their last lease.
+        self._lease_lock = threading.Lock()
+        self._leases: Dict[int, int] = {}
+        self._retiring: Dict[int, ModelRunner] = {}
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._manifest_stamp: Optional[Tuple[int, int]] = None
+        self.reload_count = 0
+        self.rejected_count = 0
+        self.last_error: Optional[str] = None
+        self.loaded_at: Optional[str] = None
+        self._runner = self._load_initial()
+
+    @property
+    def current(self) -> ModelRunner:
+        return self._runner
+
+    @contextmanager
+    def lease(self) -> Iterator[ModelRunner]:
+        """The active runner, kept open until the caller is done with it even if a reload swaps it out."""
+        with self._lease_lock:
+            runner = self._runner
+            self._leases[id(runner)] = self._leases.get(id(runner), 0) + 1
+        try:
+            yield runner
+        finally:
+            with self._lease_lock:
+                remaining = self._leases.pop(id(runner)) - 1
+                if remaining:
+                    self._leases[id(runner)] = remaining
+                drained = None if remaining else self._retiring.pop(id(runner), None)
+            if drained is not None:
+                drained.close()
+
+    def _resolve_from_manifest(self) -> Tuple[Path, str, bool, Optional[EnsembleSpec]]:
+        manifest_path = self._config.manifest_path
+        assert manifest_path is not None
+        manifest = load_deploy_manifest(manifest_path)
+        ensemble = resolve_ensemble(manifest) if self._config.ensemble_enabled else None
+        if ensemble is not None:
+            members = tuple(
+                EnsembleMember(
+                    **{**entry, "path": str(self._verified_path(manifest_path, entry["path"], entry["sha256"]))}
+                )
+                for entry in ensemble["members"]
+            )
+            aggregator = self._config.ensemble_aggregator or ensemble["aggregator"]
+            return Path(members[0].path), ensemble_sha256(members, aggregator), False, (members, aggregator)
+        binary = resolve_model_binary(manifest, self._config.model_variant)
+        model_path = self._verified_path(manifest_path, binary["path"], binary["sha256"])
+        return model_path, binary["sha256"], binary["pre_optimized"], None
+
+    @staticmethod
+    def _verified_path(manifest_path: Path, relative_path: str, expected_sha256: str) -> Path:
+        model_path = manifest_path.parent / relative_path
+        actual_sha256 = sha256_file(model_path)
+        if actual_sha256 != expected_sha256:
+            raise RuntimeError(
+                f"Model binary {model_path} sha256 {actual_sha256} does not match manifest {expected_sha256}"
+            )
+        return model_path
+
+    def _build_runner(
+        self,
+        model_path: Path,
+        model_sha256: Optional[str],
+        pre_optimized: bool,
+        ensemble: Optional[EnsembleSpec] = None,
+    ) -> ModelRunner:
+        options: Dict[str, Any] = {}
+        factory = self._runner_factory
+        if ensemble is not None:
+            factory = self._ensemble_factory
+            options = {
+                "members": ensemble[0],
+                "aggregator": ensemble[1],
+                "spread_scale": self._config.ensemble_spread_scale,
+            }
+        return factory(
+            model_path=str(model_path),
+            inference_timeout_ms=self._config.inference_timeout_ms,
+            model_sha256=model_sha256,
+            fallback_feature_name=self._config.fallback_feature_name,
+            fallback_confidence=self._config.fallback_confidence,
+            fallback_value_range=self._config.fallback_value_range,
+            pre_optimized=pre_optimized,
+            optimization_cache_dir=self._config.optimization_cache_dir,
+            ort_profile=self._config.ort_profile,
+            max_concurrent_runs=self._config.max_concurrent_runs,
+            input_layout=self._config.input_layout,
+            feature_names=self._config.feature_names,
+            input_name=self._config.input_name,
+            **options,
+        )
+
+    def _load_initial(self) -> ModelRunner:
+        manifest_path = self._config.manifest_path
+        stamp = _stat_stamp(manifest_path) if manifest_path is not None else None
+        if manifest_path is None:
+            runner = self._build_runner(self._config.model_path, None, False)
+        else:
+            runner = self._build_runner(*self._resolve_from_manifest())
+        runner.warmup(self._config.warmup_runs)
+        self._manifest_stamp = stamp
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+        return runner
+
+    def _warm_candidate(self, candidate: ModelRunner) -> None:
+        latencies_ms = candidate.warmup(self._config.warmup_runs)
+        # The first run pays one-off allocation costs and is excluded from the latency gate.
+        steady_ms = latencies_ms[1:] or latencies_ms
+        p95_ms = float(np.percentile(steady_ms, 95))
+        if p95_ms > self._config.warmup_max_ms:
+            raise RuntimeError(
+                f"Warm-up p95 latency {p95_ms:.2f} ms exceeds budget {self._config.warmup_max_ms:.2f} ms"
+            )
+
+    def check_for_update(self) -> bool:
+        """Reload when the manifest changed; returns True only when a new model was swapped in."""
+        manifest_path = self._config.manifest_path
+        if manifest_path is None:
+            return False
+        with self._reload_lock:
+            # Taken before reading, and recorded only once the manifest validated: a rejected reload, such
+            # as a binary still being copied, is retried on the next poll instead of waiting for a new edit.
+            stamp = _stat_stamp(manifest_path)
+            if stamp == self._manifest_stamp:
+                return False
+            candidate: Optional[ModelRunner] = None
+            try:
+                model_path, model_sha256, pre_optimized, ensemble = self._resolve_from_manifest()
+                if model_sha256 == self._runner.model_sha256:
+                    self._manifest_stamp = stamp
+                    return False
+                candidate = self._build_runner(model_path, model_sha256, pre_optimized, ensemble)
+                self._warm_candidate(candidate)
+            except Exception as exc:  # noqa: BLE001 - any failure keeps the active model serving
+                self.rejected_count += 1
+                self.last_error = str(exc)
+                LOGGER.warning("Rejected model reload from %s: %s", manifest_path, exc)
+                if candidate is not None:
+                    candidate.close()
+                return False
+
+            # Requests lease the runner once, so the swap lands between requests; runs already in flight
+            # finish on the previous runner, which is closed when its last lease ends.
+            with self._lease_lock:
+                previous, self._runner = self._runner, candidate
+                retired_now = id(previous) not in self._leases
+                if not retired_now:
+                    self._retiring[id(previous)] = previous
+            self._manifest_stamp = stamp
+            self.reload_count += 1
+            self.last_error = None
+            self.loaded_at = datetime.now(timezone.utc).isoformat()
+        LOGGER.info("Swapped model %s -> %s", previous.model_sha256, candidate.model_sha256)
+        if retired_now:
+            previous.close()
+        return True
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self._config.reload_poll_interval_s):
+            self.check_for_update()
+
+    def start(self) -> None:
+        if self._config.manifest_path is None or self._config.reload_poll_interval_s <= 0:
+            return
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name="model-reload", daemon=True)
+            self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self._config.reload_poll_interval_s + 1.0)
+            self._watcher = None
+
+    def status(self) -> Dict[str, Any]:
+        runner = self._runner
+        return {
+            "model_sha256": runner.model_sha256,
+            "model_path": runner.model_path,
+            "manifest_path": str(self._config.manifest_path) if self._config.manifest_path else None,
+            "model_variant": self._config.model_variant,
+            "ort_profile": self._config.ort_profile.model_dump(),
+            "loaded_at": self.loaded_at,
+            "reload_count": self.reload_count,
+            "rejected_count": self.rejected_count,
+            "last_error": self.last_error,
+            "ensemble": runner.member_status() if isinstance(runner, EnsembleRunner) else None,
+        }
+
+
+def _stat_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
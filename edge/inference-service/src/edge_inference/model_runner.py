@@ -2,34 +2,334 @@
 
 from __future__ import annotations
 
+import asyncio
+import os
+import threading
 import time
-from typing import Any, Dict, Iterable, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
 
 import numpy as np
 import onnxruntime as ort
 
+from .config import OrtProfile
+from .deploy_manifest import sha256_file
+from .inference_pool import hold_slot
+from .latency_profiler import record_stage, stage
+
 
 class ModelRunner:
     """Executes MAP prediction ONNX models with safety envelopes."""
 
-    def __init__(self, model_path: str, inference_timeout_ms: int) -> None:
-        so = ort.SessionOptions()
-        so.intra_op_num_threads = 1
-        so.inter_op_num_threads = 1
-        self._session = ort.InferenceSession(model_path, so, providers=["CPUExecutionProvider"])
+    def __init__(
+        self,
+        model_path: str,
+        inference_timeout_ms: int,
+        model_sha256: str | None = None,
+        *,
+        fallback_feature_name: str = "map",
+        fallback_confidence: float = 0.5,
+        fallback_value_range: Tuple[float, float] = (20.0, 200.0),
+        pre_optimized: bool = False,
+        optimization_cache_dir: Path | None = None,
+        ort_profile: OrtProfile | None = None,
+        max_concurrent_runs: int = 1,
+        input_layout: str = "named",
+        feature_names: Sequence[str] = (),
+        input_name: str = "input",
+    ) -> None:
+        if input_layout == "single_tensor_row_major" and not feature_names:
+            raise ValueError("single_tensor_row_major input layout requires feature_names for column order")
+        self.model_path = model_path
+        self.model_sha256 = model_sha256 or sha256_file(Path(model_path))
+        self._ort_profile = ort_profile or OrtProfile()
+        self._pre_optimized = pre_optimized
+        self._optimization_cache_dir = optimization_cache_dir
+        so = session_options_for(self._ort_profile)
+        self._session = _create_session(model_path, so, self.model_sha256, pre_optimized, optimization_cache_dir)
         self._timeout = inference_timeout_ms
+        self._fallback_feature_name = fallback_feature_name
+        self._fallback_confidence = fallback_confidence
+        self._fallback_value_range = fallback_value_range
+        self._input_layout = input_layout
+        self._feature_names = tuple(feature_names)
+        self._input_name = input_name
+        # One spare worker keeps the deadline enforceable while an abandoned run is still unwinding.
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_runs + 1, thread_name_prefix="ort-run")
+        self._last_good: Tuple[np.ndarray, float | None] | None = None
+        self._last_good_lock = threading.Lock()
+        # Fallbacks take the model's output shape: the declared one until a real output has been seen.
+        self._output_shape = _declared_output_shape(self._session)
+        self._trace_lock = threading.Lock()
+        self._trace_session: ort.InferenceSession | None = None
+        self._trace_remaining = 0
+        self._trace_in_flight = 0
+        self.last_trace_path: str | None = None
 
     def run(self, features: Dict[str, Iterable[float]]) -> Tuple[np.ndarray, Dict[str, Any]]:
-        """Run inference and return predictions plus metadata."""
+        """Run inference within the deadline, degrading to a deterministic fallback when it is missed."""
+        start, arrays, future, run_options, _ = self._start_run(features)
+        try:
+            with stage("session_run"):
+                outputs = future.result(timeout=self._remaining_s(start))
+        except FutureTimeoutError:
+            self._abandon(future, run_options)
+            return self._fallback(arrays, start)
+        return self._finish(outputs, start)
+
+    async def run_async(self, features: Dict[str, Iterable[float]]) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """:meth:`run` for the event loop: awaits the ORT run directly instead of blocking a thread on it."""
+        start, arrays, future, run_options, timing = self._start_run(features)
+        try:
+            with stage("session_run"):
+                done, _ = await _wait_async([future], self._remaining_s(start))
+        except asyncio.CancelledError:
+            self._abandon(future, run_options)
+            raise
+        _record_queue_wait([timing])
+        if not done:
+            self._abandon(future, run_options)
+            return self._fallback(arrays, start)
+        return self._finish(future.result(), start)
+
+    def _start_run(
+        self, features: Dict[str, Iterable[float]]
+    ) -> Tuple[float, Dict[str, np.ndarray], Future, ort.RunOptions, List[float]]:
         start = time.monotonic()
-        inputs = {k: np.asarray(v, dtype=np.float32) for k, v in features.items()}
-        outputs = self._session.run(None, inputs)
-        duration_ms = (time.monotonic() - start) * 1000
-        if duration_ms > self._timeout:
-            raise RuntimeError("Inference exceeded timeout budget")
-        metadata = {"inference_ms": duration_ms}
+        with stage("tensor_convert"):
+            arrays = {k: np.asarray(v, dtype=np.float32) for k, v in features.items()}
+            inputs = self._model_inputs(arrays)
+        run_options = ort.RunOptions()
+        session, traced = self._session_for_run()
+        future, timing = _submit_timed(self._executor, session.run, None, inputs, run_options)
+        if traced:
+            future.add_done_callback(lambda _: self._traced_run_done())
+        return start, arrays, future, run_options, timing
+
+    def _remaining_s(self, start: float) -> float:
+        return max(0.0, self._timeout / 1000 - (time.monotonic() - start))
+
+    def _finish(self, outputs: List[Any], start: float) -> Tuple[np.ndarray, Dict[str, Any]]:
+        metadata: Dict[str, Any] = {"inference_ms": (time.monotonic() - start) * 1000}
         if len(outputs) > 1:
             confidence_output = np.asarray(outputs[1])
             if confidence_output.size == 1:
                 metadata["confidence"] = float(confidence_output.reshape(-1)[0])
+        self._remember(outputs[0], metadata.get("confidence"))
         return outputs[0], metadata
+
+    @staticmethod
+    def _abandon(future: Any, run_options: ort.RunOptions) -> None:
+        """Terminate a run that missed the deadline; its inference-pool slot stays held until it returns."""
+        release = hold_slot()
+        future.add_done_callback(lambda _: release())
+        future.cancel()
+        run_options.terminate = True
+
+    def _remember(self, prediction: np.ndarray, confidence: float | None) -> None:
+        with self._last_good_lock:
+            self._last_good = (np.array(prediction, copy=True), confidence)
+            self._output_shape = tuple(np.shape(prediction))
+
+    def _model_inputs(self, arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Named layout feeds one tensor per feature; row-major stacks them as ``[window, n_features]``."""
+        if self._input_layout != "single_tensor_row_major":
+            return arrays
+        return {self._input_name: np.stack([arrays[name] for name in self._feature_names], axis=1)}
+
+    def _fallback(self, inputs: Dict[str, np.ndarray], start: float) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Deadline-miss result with the model's output shape; never raises.
+
+        Linear extrapolation of the fallback feature window across every forecast element, clamped to the
+        fallback value range so a steep last step cannot run off over a long horizon, else the last good
+        model output. With neither, the prediction is all-NaN and flagged ``degraded`` with zero
+        confidence, so callers can answer without a forecast instead of failing the request.
+        """
+        metadata: Dict[str, Any] = {"fallback_active": 1.0, "confidence": self._fallback_confidence}
+        window = inputs.get(self._fallback_feature_name)
+        with self._last_good_lock:
+            last_good = self._last_good
+            output_shape = self._output_shape
+        if window is not None and window.size > 0:
+            values = window.reshape(-1).astype(np.float64)
+            slope = values[-1] - values[-2] if values.size > 1 else 0.0
+            steps = np.arange(1, int(np.prod(output_shape)) + 1, dtype=np.float64)
+            extrapolated = np.clip(values[-1] + slope * steps, *self._fallback_value_range)
+            prediction = extrapolated.astype(np.float32).reshape(output_shape)
+        elif last_good is not None:
+            prediction = last_good[0]
+            if last_good[1] is not None:
+                metadata["confidence"] = min(last_good[1], self._fallback_confidence)
+        else:
+            prediction = np.full(output_shape, np.nan, dtype=np.float32)
+            metadata.update({"degraded": 1.0, "confidence": 0.0})
+        metadata["inference_ms"] = (time.monotonic() - start) * 1000
+        return prediction, metadata
+
+    def start_trace(self, requests: int, output_dir: Path) -> None:
+        """Route the next ``requests`` runs through an ORT profiling session and keep its trace file."""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        so = session_options_for(self._ort_profile)
+        so.enable_profiling = True
+        so.profile_file_prefix = str(output_dir / f"ort-trace-{self.model_sha256[:12]}")
+        session = _create_session(
+            self.model_path, so, self.model_sha256, self._pre_optimized, self._optimization_cache_dir
+        )
+        with self._trace_lock:
+            if self._trace_session is not None:
+                raise RuntimeError("An ORT trace is already in progress")
+            self._trace_session = session
+            self._trace_remaining = requests
+
+    def trace_status(self) -> Dict[str, Any]:
+        with self._trace_lock:
+            return {
+                "active": self._trace_session is not None,
+                "remaining_requests": self._trace_remaining,
+                "last_trace_path": self.last_trace_path,
+            }
+
+    def _session_for_run(self) -> Tuple[ort.InferenceSession, bool]:
+        with self._trace_lock:
+            if self._trace_session is None or self._trace_remaining == 0:
+                return self._session, False
+            self._trace_remaining -= 1
+            self._trace_in_flight += 1
+            return self._trace_session, True
+
+    def _traced_run_done(self) -> None:
+        with self._trace_lock:
+            self._trace_in_flight -= 1
+            if self._trace_remaining or self._trace_in_flight or self._trace_session is None:
+                return
+            self.last_trace_path = self._trace_session.end_profiling()
+            self._trace_session = None
+
+    def _synthetic_inputs(self) -> Dict[str, np.ndarray]:
+        inputs = {}
+        for spec in self._session.get_inputs():
+            shape = [dim if isinstance(dim, int) and dim > 0 else 1 for dim in spec.shape]
+            inputs[spec.name] = np.zeros(shape, dtype=np.float32)
+        return inputs
+
+    def warmup(self, runs: int) -> List[float]:
+        """Run synthetic inputs through the session, smoke-check outputs and return per-run latency in ms."""
+        inputs = self._synthetic_inputs()
+        latencies_ms = []
+        for _ in range(runs):
+            start = time.monotonic()
+            outputs = self._session.run(None, inputs)
+            latencies_ms.append((time.monotonic() - start) * 1000)
+            _smoke_check(outputs)
+            with self._last_good_lock:
+                self._output_shape = tuple(np.shape(outputs[0]))
+        return latencies_ms
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def session_options_for(profile: OrtProfile) -> ort.SessionOptions:
+    so = ort.SessionOptions()
+    so.intra_op_num_threads = profile.intra_op_num_threads
+    so.inter_op_num_threads = profile.inter_op_num_threads
+    so.execution_mode = (
+        ort.ExecutionMode.ORT_PARALLEL if profile.execution_mode == "parallel" else ort.ExecutionMode.ORT_SEQUENTIAL
+    )
+    so.enable_cpu_mem_arena = profile.enable_cpu_mem_arena
+    so.enable_mem_pattern = profile.enable_mem_pattern
+    spinning = "1" if profile.allow_spinning else "0"
+    so.add_session_config_entry("session.intra_op.allow_spinning", spinning)
+    so.add_session_config_entry("session.inter_op.allow_spinning", spinning)
+    return so
+
+
+def _create_session(
+    model_path: str,
+    so: ort.SessionOptions,
+    model_sha256: str,
+    pre_optimized: bool,
+    optimization_cache_dir: Path | None,
+) -> ort.InferenceSession:
+    """Create a session, reusing a previously optimized graph instead of re-optimizing on every start."""
+    providers = ["CPUExecutionProvider"]
+    if pre_optimized:
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        return ort.InferenceSession(model_path, so, providers=providers)
+    if optimization_cache_dir is None:
+        return ort.InferenceSession(model_path, so, providers=providers)
+
+    # Keyed by model hash and ORT version: optimized graphs are only valid for the runtime that wrote them.
+    cached_path = optimization_cache_dir / f"{model_sha256}.ort-{ort.__version__}.onnx"
+    if cached_path.exists():
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        return ort.InferenceSession(str(cached_path), so, providers=providers)
+
+    optimization_cache_dir.mkdir(parents=True, exist_ok=True)
+    partial_path = cached_path.with_suffix(".partial")
+    so.optimized_model_filepath = str(partial_path)
+    session = ort.InferenceSession(model_path, so, providers=providers)
+    os.replace(partial_path, cached_path)
+    return session
+
+
+def _submit_timed(executor: ThreadPoolExecutor, fn: Any, *args: Any) -> Tuple[Future, List[float]]:
+    """Submit ``fn``; the returned list holds the submit time, then the time a worker picked the call up."""
+    timing = [time.perf_counter()]
+
+    def call() -> Any:
+        timing.append(time.perf_counter())
+        return fn(*args)
+
+    return executor.submit(call), timing
+
+
+def _record_queue_wait(timings: Sequence[List[float]]) -> None:
+    """Charge the wait for the first ORT worker to ``pool_wait``, the stage the inference pool reports on the sync path."""
+    started = [timing[1] for timing in timings if len(timing) > 1]
+    if started:
+        record_stage("pool_wait", (min(started) - timings[0][0]) * 1000)
+
+
+async def _wait_async(futures: Sequence[Future], timeout_s: float) -> Tuple[List[Future], List[Future]]:
+    """Await executor futures on the event loop until ``timeout_s``; returns the finished and the late ones.
+
+    Results are read from the executor futures themselves. Late ones are left running for the caller to
+    abandon; their asyncio wrappers are cancelled so nothing is logged when they finish.
+    """
+    waiters = {asyncio.wrap_future(future): future for future in futures}
+    try:
+        done, late = await asyncio.wait(waiters, timeout=timeout_s)
+    except asyncio.CancelledError:
+        for waiter in waiters:
+            waiter.cancel()
+        raise
+    for waiter in done:
+        if not waiter.cancelled():
+            waiter.exception()
+    for waiter in late:
+        waiter.cancel()
+    return [waiters[waiter] for waiter in done], [waiters[waiter] for waiter in late]
+
+
+def _declared_output_shape(session: ort.InferenceSession) -> Tuple[int, ...]:
+    """First output's declared shape, with symbolic or unknown dimensions taken as 1."""
+    try:
+        shape = session.get_outputs()[0].shape
+    except (AttributeError, IndexError):
+        return (1,)
+    return tuple(dim if isinstance(dim, int) and dim > 0 else 1 for dim in shape) or (1,)
+
+
+def _smoke_check(outputs: List[Any]) -> None:
+    if not outputs:
+        raise RuntimeError("Model produced no outputs")
+    for output in outputs:
+        if isinstance(output, np.ndarray) and output.dtype.kind == "f" and not np.all(np.isfinite(output)):
+            raise RuntimeError("Model produced non-finite outputs")
+    if len(outputs) > 1 and isinstance(outputs[1], np.ndarray) and outputs[1].size == 1:
+        confidence = float(outputs[1].reshape(-1)[0])
+        if not 0.0 <= confidence <= 1.0:
+            raise RuntimeError("Model confidence output out of range")
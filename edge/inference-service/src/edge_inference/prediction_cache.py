@@ -0,0 +1,98 @@
+"""Bounded LRU/TTL memoization of model outputs for repeated feature windows."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+CacheKey = Tuple[str, str]
+CachedPrediction = Tuple[np.ndarray, Dict[str, Any]]
+
+
+def feature_tensor_digest(features: Dict[str, Iterable[float]]) -> str:
+    """Hash the contiguous float32 tensor built from features in sorted name order."""
+    names = sorted(features)
+    tensor = np.ascontiguousarray([np.asarray(features[name], dtype=np.float32) for name in names])
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\x1f".join(names).encode("utf-8"))
+    digest.update(np.asarray(tensor.shape, dtype=np.int64).tobytes())
+    digest.update(memoryview(tensor))
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with per-entry TTL, scoped to a single model sha256."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_s: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl_s = ttl_s
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, Tuple[float, CachedPrediction]] = OrderedDict()
+        self._model_sha256: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def key_for(self, features: Dict[str, Iterable[float]], model_sha256: str) -> CacheKey:
+        return (model_sha256, feature_tensor_digest(features))
+
+    def _sync_model(self, model_sha256: str) -> None:
+        if model_sha256 != self._model_sha256:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._model_sha256 = model_sha256
+
+    def get(self, key: CacheKey) -> Optional[CachedPrediction]:
+        with self._lock:
+            self._sync_model(key[0])
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            prediction, metadata = entry[1]
+            return prediction, dict(metadata)
+
+    def put(self, key: CacheKey, prediction: np.ndarray, metadata: Dict[str, Any]) -> None:
+        stored = np.array(prediction, copy=True)
+        stored.setflags(write=False)
+        with self._lock:
+            self._sync_model(key[0])
+            self._entries[key] = (self._clock() + self._ttl_s, (stored, dict(metadata)))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "model_sha256": self._model_sha256,
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl_s": self._ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -1,14 +1,27 @@
-"""Replay telemetry fixture JSONL streams into ingestion gRPC service."""
+"""Replay telemetry fixture streams (JSONL or length-delimited protobuf) into ingestion gRPC service."""
 
 from __future__ import annotations
 
 import argparse
 import json
+import queue
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 import grpc
 
+from .binary_fixture import BINARY_FIXTURE_SUFFIX, BinaryFixtureWriter, encode_varint, is_binary_fixture, iter_records
 from .ingestion_proto import telemetry_pb2, telemetry_pb2_grpc
+from .replay_pacing import JITTER_MODELS, PACE_MODES, ReplayPacer, envelope_timestamp_ms
+from .replay_report import KafkaArrivalTap, ReplayRecorder, envelope_key, write_report
+
+STREAM_TELEMETRY_METHOD = "/infusion.telemetry.TelemetryIngestion/StreamTelemetry"
 
 
 def _event_to_envelope(event: dict) -> telemetry_pb2.TelemetryEnvelope:
@@ -50,6 +63,166 @@ def _iter_fixture_events(fixture_path: Path):
             yield _event_to_envelope(event)
 
 
+# Matches the device_id of one JSONL event without decoding the rest of the line.
+_DEVICE_ID_PATTERN = re.compile(rb'"device_id"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_SESSION_ID_PATTERN = re.compile(rb'"session_id"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_TIMESTAMP_PATTERN = re.compile(rb'"timestamp_ms"\s*:\s*(\d+)')
+_END_OF_FIXTURE = object()
+PARTITION_MODES = ("none", "device", "session")
+
+
+def _line_field(line: bytes, pattern: re.Pattern, field: str) -> str:
+    match = pattern.search(line)
+    if match is not None:
+        return json.loads(b'"' + match.group(1) + b'"')
+    return str(json.loads(line)[field])
+
+
+def _iter_raw(fixture_path: Path) -> Iterator[bytes]:
+    """Undecoded records: newline-terminated JSONL lines or serialized envelopes from a binary fixture."""
+    if is_binary_fixture(fixture_path):
+        yield from iter_records(fixture_path)
+        return
+    with fixture_path.open("rb") as handle:
+        for line in handle:
+            if line.strip():
+                yield line if line.endswith(b"\n") else line + b"\n"
+
+
+def _record_device_id(record: bytes, binary: bool) -> str:
+    """device_id of a raw record without converting the rest of it."""
+    if binary:
+        return telemetry_pb2.TelemetryEnvelope.FromString(record).device_id
+    return _line_field(record, _DEVICE_ID_PATTERN, "device_id")
+
+
+def _record_identity(record: bytes, binary: bool) -> Tuple[str, str]:
+    """``(session_id, device_id)`` of a raw record without converting the rest of it."""
+    if binary:
+        envelope = telemetry_pb2.TelemetryEnvelope.FromString(record)
+        return envelope.session_id, envelope.device_id
+    return _line_field(record, _SESSION_ID_PATTERN, "session_id"), _line_field(record, _DEVICE_ID_PATTERN, "device_id")
+
+
+def _record_timestamp_ms(record: bytes, binary: bool) -> Optional[int]:
+    if binary:
+        return envelope_timestamp_ms(telemetry_pb2.TelemetryEnvelope.FromString(record))
+    timestamps = _TIMESTAMP_PATTERN.findall(record)
+    return min(int(ts) for ts in timestamps) if timestamps else None
+
+
+def _binary_timestamp_ms(record: bytes) -> Optional[int]:
+    return _record_timestamp_ms(record, True)
+
+
+def _binary_key(record: bytes):
+    return envelope_key(telemetry_pb2.TelemetryEnvelope.FromString(record))
+
+
+def _envelope_size(envelope: telemetry_pb2.TelemetryEnvelope) -> int:
+    return envelope.ByteSize()
+
+
+def index_path_for(fixture_path: Path) -> Path:
+    return fixture_path.with_name(fixture_path.name + ".index.json")
+
+
+def _fixture_stamp(fixture_path: Path) -> dict:
+    stat = fixture_path.stat()
+    return {"size_bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def scan_device_ids(fixture_path: Path, *, stop_after: Optional[int] = None) -> Set[str]:
+    """Distinct device ids in the fixture, read record by record; stops early once ``stop_after`` are seen."""
+    binary = is_binary_fixture(fixture_path)
+    device_ids: Set[str] = set()
+    for record in _iter_raw(fixture_path):
+        device_ids.add(_record_device_id(record, binary))
+        if stop_after is not None and len(device_ids) >= stop_after:
+            break
+    return device_ids
+
+
+def write_fixture_index(fixture_path: Path) -> Path:
+    """Write the ``<fixture>.index.json`` sidecar so later replays skip the device-id pre-scan."""
+    binary = is_binary_fixture(fixture_path)
+    device_ids: Set[str] = set()
+    events = 0
+    for record in _iter_raw(fixture_path):
+        device_ids.add(_record_device_id(record, binary))
+        events += 1
+    index_path = index_path_for(fixture_path)
+    index = {"events": events, "device_ids": sorted(device_ids), **_fixture_stamp(fixture_path)}
+    index_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+    return index_path
+
+
+def _single_device_id(fixture_path: Path) -> Optional[str]:
+    index_path = index_path_for(fixture_path)
+    if index_path.exists():
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+        # A sidecar from an older version of the fixture is ignored rather than trusted.
+        if all(index.get(key) == value for key, value in _fixture_stamp(fixture_path).items()):
+            device_ids: List[str] = index["device_ids"]
+            return device_ids[0] if len(device_ids) == 1 else None
+    found = scan_device_ids(fixture_path, stop_after=2)
+    return next(iter(found)) if len(found) == 1 else None
+
+
+def _iter_sendable(fixture_path: Path) -> Iterator[Any]:
+    # Binary fixtures are already serialized and go out as raw bytes; JSONL is converted to envelopes.
+    if is_binary_fixture(fixture_path):
+        return iter_records(fixture_path)
+    return _iter_fixture_events(fixture_path)
+
+
+class _BackgroundDecoder:
+    """Decodes envelopes on a worker thread into a bounded queue while earlier ones are being sent.
+
+    Memory stays bounded by ``prefetch`` records regardless of fixture size. A decode error is raised
+    from the iterator, which makes gRPC cancel the stream, and is kept in ``error`` for the caller.
+    """
+
+    def __init__(self, fixture_path: Path, *, prefetch: int) -> None:
+        self._fixture_path = fixture_path
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=prefetch)
+        self._stop = threading.Event()
+        self.error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._decode, name="fixture-decoder", daemon=True)
+        self._thread.start()
+
+    def _put(self, item: object) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode(self) -> None:
+        try:
+            for envelope in _iter_sendable(self._fixture_path):
+                if not self._put(envelope):
+                    return
+        except BaseException as exc:  # noqa: BLE001 - surfaced to the caller through ``error``
+            self.error = exc
+        self._put(_END_OF_FIXTURE)
+
+    def __iter__(self) -> Iterator[telemetry_pb2.TelemetryEnvelope]:
+        while True:
+            item = self._queue.get()
+            if item is _END_OF_FIXTURE:
+                if self.error is not None:
+                    raise self.error
+                return
+            yield item  # type: ignore[misc]
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+
 def _build_grpc_channel(
     *,
     target: str,
@@ -86,6 +259,10 @@ def stream_fixture(
     tls_ca_cert: Path | None = None,
     tls_client_cert: Path | None = None,
     tls_client_key: Path | None = None,
+    prefetch: int = 1024,
+    pacer: ReplayPacer | None = None,
+    stream_timeout_s: float | None = 5.0,
+    recorder: ReplayRecorder | None = None,
 ) -> bool:
     channel = _build_grpc_channel(
         target=target,
@@ -95,32 +272,270 @@ def stream_fixture(
         tls_client_key=tls_client_key,
     )
     try:
-        stub = telemetry_pb2_grpc.TelemetryIngestionStub(channel)
-        events = list(_iter_fixture_events(fixture_path))
-
-        unique_device_ids = {event.device_id for event in events}
-        single_device_id = next(iter(unique_device_ids)) if len(unique_device_ids) == 1 else None
+        send = _stream_callable(channel, binary=is_binary_fixture(fixture_path))
+        single_device_id = _single_device_id(fixture_path)
 
         metadata = (("x-api-key", api_key),)
         if single_device_id:
             metadata = (("x-api-key", api_key), ("x-device-id", single_device_id))
 
-        ack = stub.StreamTelemetry(iter(events), metadata=metadata, timeout=5.0)
-        return bool(ack.accepted)
+        if recorder is None:
+            return _send_stream(send, fixture_path, metadata, prefetch, pacer, stream_timeout_s)
+        start, sent_before = time.monotonic(), recorder.envelopes
+        accepted, error = False, None
+        try:
+            accepted = _send_stream(send, fixture_path, metadata, prefetch, pacer, stream_timeout_s, recorder)
+        except (grpc.RpcError, ValueError) as exc:
+            error = str(exc)
+            raise
+        finally:
+            recorder.record_stream(
+                PartitionResult(
+                    fixture_path.name,
+                    single_device_id or "",
+                    recorder.envelopes - sent_before,
+                    accepted,
+                    time.monotonic() - start,
+                    error,
+                )
+            )
+        return accepted
     finally:
         channel.close()
 
 
+def _stream_callable(channel, *, binary: bool) -> Callable[..., Any]:
+    if not binary:
+        return telemetry_pb2_grpc.TelemetryIngestionStub(channel).StreamTelemetry
+    # Pre-serialized records skip the per-envelope SerializeToString of the generated stub.
+    return channel.stream_unary(
+        STREAM_TELEMETRY_METHOD,
+        request_serializer=None,
+        response_deserializer=telemetry_pb2.TelemetryAck.FromString,
+    )
+
+
+def _send_stream(
+    send: Callable[..., Any],
+    fixture_path: Path,
+    metadata: Tuple[Tuple[str, str], ...],
+    prefetch: int,
+    pacer: ReplayPacer | None = None,
+    timeout_s: float | None = 5.0,
+    recorder: ReplayRecorder | None = None,
+) -> bool:
+    binary = is_binary_fixture(fixture_path)
+    decoder = _BackgroundDecoder(fixture_path, prefetch=prefetch)
+    envelopes: Iterator[Any] = iter(decoder)
+    if pacer is not None:
+        envelopes = pacer.pace(envelopes, _binary_timestamp_ms if binary else envelope_timestamp_ms)
+    if recorder is not None:
+        if binary:
+            envelopes = recorder.observe(envelopes, len, _binary_key)
+        else:
+            envelopes = recorder.observe(envelopes, _envelope_size, envelope_key)
+    try:
+        ack = send(envelopes, metadata=metadata, timeout=timeout_s)
+    except grpc.RpcError:
+        if decoder.error is not None:
+            raise decoder.error
+        raise
+    finally:
+        decoder.close()
+    return bool(ack.accepted)
+
+
+def convert_jsonl_to_binary(jsonl_path: Path, output_path: Path) -> int:
+    """Convert a JSONL fixture to the length-delimited protobuf format; returns the record count."""
+    with BinaryFixtureWriter(output_path) as writer:
+        for envelope in _iter_fixture_events(jsonl_path):
+            writer.write(envelope.SerializeToString())
+    return writer.records
+
+
+def load_api_key_file(path: Path) -> Dict[str, str]:
+    """Per-device API keys as a JSON object ``{device_id: api_key}``, the shape ingestion's key map uses."""
+    keys = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(keys, dict) or not all(isinstance(v, str) and v for v in keys.values()):
+        raise ValueError(f"API key file {path} must be a JSON object mapping device_id to a non-empty key")
+    return {str(device_id): key for device_id, key in keys.items()}
+
+
+@dataclass(frozen=True)
+class PartitionResult:
+    partition: str
+    device_id: str
+    events: int
+    accepted: bool
+    duration_s: float
+    error: Optional[str] = None
+
+
+@dataclass
+class _Partition:
+    key: str
+    device_id: str
+    path: Path
+    events: int = 0
+    first_timestamp_ms: Optional[int] = None
+
+
+def _split_fixture(
+    fixture_path: Path, partition_by: str, work_dir: Path, *, buffer_budget_bytes: int = 32 * 1024 * 1024
+) -> List[_Partition]:
+    """One raw pass over the fixture into per-partition files of the same format, keeping record order.
+
+    Records are buffered per partition and appended whenever the total buffer exceeds the budget, so memory
+    and open file handles stay bounded however many devices or sessions the fixture holds.
+    """
+    binary = is_binary_fixture(fixture_path)
+    suffix = BINARY_FIXTURE_SUFFIX if binary else ".jsonl"
+    partitions: Dict[str, _Partition] = {}
+    buffers: Dict[str, List[bytes]] = {}
+    buffered = 0
+
+    def flush() -> None:
+        for key, chunks in buffers.items():
+            with partitions[key].path.open("ab") as handle:
+                handle.writelines(chunks)
+        buffers.clear()
+
+    for record in _iter_raw(fixture_path):
+        session_id, device_id = _record_identity(record, binary)
+        key = device_id if partition_by == "device" else session_id
+        partition = partitions.get(key)
+        if partition is None:
+            partition = partitions[key] = _Partition(key, device_id, work_dir / f"p{len(partitions):06d}{suffix}")
+            partition.first_timestamp_ms = _record_timestamp_ms(record, binary)
+        elif partition.device_id != device_id:
+            raise ValueError(f"Session '{key}' spans devices '{partition.device_id}' and '{device_id}'")
+        partition.events += 1
+        chunk = encode_varint(len(record)) + record if binary else record
+        buffers.setdefault(key, []).append(chunk)
+        buffered += len(chunk)
+        if buffered >= buffer_budget_bytes:
+            flush()
+            buffered = 0
+    flush()
+    return list(partitions.values())
+
+
+def replay_partitioned(
+    *,
+    fixture_path: Path,
+    target: str,
+    partition_by: str = "device",
+    concurrency: int = 8,
+    api_keys: Optional[Dict[str, str]] = None,
+    default_api_key: Optional[str] = None,
+    tls_enabled: bool = False,
+    tls_ca_cert: Path | None = None,
+    tls_client_cert: Path | None = None,
+    tls_client_key: Path | None = None,
+    prefetch: int = 1024,
+    pacer: ReplayPacer | None = None,
+    stream_timeout_s: float | None = 5.0,
+    recorder: ReplayRecorder | None = None,
+) -> List[PartitionResult]:
+    """Replay each device or session on its own concurrent stream with that device's credentials.
+
+    Each stream carries one device, so ``x-device-id`` and the per-device ``x-api-key`` satisfy
+    ingestion's identity check. Events keep their fixture order within a partition. Up to ``concurrency``
+    streams share one channel. A shared ``pacer`` is anchored on the earliest partition start, so streams
+    keep their relative timing.
+    """
+    if partition_by not in ("device", "session"):
+        raise ValueError(f"partition_by must be 'device' or 'session', got '{partition_by}'")
+    api_keys = api_keys or {}
+    with tempfile.TemporaryDirectory(prefix="replay-partitions-") as work_dir:
+        partitions = _split_fixture(fixture_path, partition_by, Path(work_dir))
+        missing = sorted({p.device_id for p in partitions if p.device_id not in api_keys})
+        if missing and default_api_key is None:
+            raise ValueError(f"No API key for devices: {', '.join(missing)}")
+        starts = [p.first_timestamp_ms for p in partitions if p.first_timestamp_ms is not None]
+        if pacer is not None and starts:
+            pacer.set_origin(min(starts))
+
+        channel = _build_grpc_channel(
+            target=target,
+            use_tls=tls_enabled,
+            tls_ca_cert=tls_ca_cert,
+            tls_client_cert=tls_client_cert,
+            tls_client_key=tls_client_key,
+        )
+        try:
+            send = _stream_callable(channel, binary=is_binary_fixture(fixture_path))
+
+            def replay(partition: _Partition) -> PartitionResult:
+                api_key = api_keys.get(partition.device_id, default_api_key)
+                metadata = (("x-api-key", api_key), ("x-device-id", partition.device_id))
+                start = time.monotonic()
+                try:
+                    accepted = _send_stream(
+                        send, partition.path, metadata, prefetch, pacer, stream_timeout_s, recorder
+                    )
+                    error = None
+                except (grpc.RpcError, ValueError) as exc:
+                    accepted, error = False, str(exc)
+                result = PartitionResult(
+                    partition.key, partition.device_id, partition.events, accepted, time.monotonic() - start, error
+                )
+                if recorder is not None:
+                    recorder.record_stream(result)
+                return result
+
+            with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="replay-stream") as pool:
+                return list(pool.map(replay, partitions))
+        finally:
+            channel.close()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--fixture", type=Path, required=True)
     parser.add_argument("--target", type=str, default="localhost:50051")
-    parser.add_argument("--api-key", type=str, required=True)
+    parser.add_argument(
+        "--api-key", type=str, help="key for every stream, or the fallback for devices missing from --api-key-file"
+    )
+    parser.add_argument("--api-key-file", type=Path, help="JSON object mapping device_id to its API key")
+    parser.add_argument("--partition-by", choices=PARTITION_MODES, default="none")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent streams when partitioning")
     parser.add_argument("--tls-enabled", action="store_true")
     parser.add_argument("--tls-ca-cert", type=Path)
     parser.add_argument("--tls-client-cert", type=Path)
     parser.add_argument("--tls-client-key", type=Path)
+    parser.add_argument("--prefetch", type=int, default=1024, help="envelopes decoded ahead of the sender")
+    parser.add_argument(
+        "--convert-to", type=Path, help=f"write the fixture as a {BINARY_FIXTURE_SUFFIX} file and exit"
+    )
+    parser.add_argument("--pace", choices=PACE_MODES, default="max", help="schedule sends by vitals timestamp_ms")
+    parser.add_argument("--speed", type=float, default=10.0, help="time compression factor for --pace accelerated")
+    parser.add_argument("--jitter", choices=JITTER_MODELS, default="none")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, help="seed for the jitter model")
+    parser.add_argument(
+        "--stream-timeout-s", type=float, help="per-stream deadline (default 5 s at max speed, none when paced)"
+    )
+    parser.add_argument(
+        "--write-index", action="store_true", help="write the device-id index sidecar and exit without replaying"
+    )
+    parser.add_argument("--report", type=Path, help="write a JSON throughput and latency report here")
+    parser.add_argument("--kafka-bootstrap", type=str, help="tap the ingestion topic for end-to-end latency")
+    parser.add_argument("--kafka-topic", type=str, default="telemetry.events")
+    parser.add_argument("--tap-drain-s", type=float, default=10.0, help="wait this long for late topic arrivals")
+    parser.add_argument("--slo-ms", type=float, default=1000.0, help="end-to-end p99 threshold (SRS-DATA-004)")
     args = parser.parse_args()
+    if args.kafka_bootstrap is not None and args.report is None:
+        parser.error("--kafka-bootstrap needs --report")
+
+    if args.convert_to is not None:
+        records = convert_jsonl_to_binary(args.fixture, args.convert_to)
+        print(f"converted {records} records to {args.convert_to}")
+        return
+
+    if args.write_index:
+        print(f"wrote fixture index {write_fixture_index(args.fixture)}")
+        return
 
     tls_enabled = bool(
         args.tls_enabled
@@ -129,18 +544,77 @@ def main() -> None:
         or args.tls_client_key is not None
     )
 
-    accepted = stream_fixture(
-        fixture_path=args.fixture,
+    pacer = ReplayPacer(
+        mode=args.pace, speed=args.speed, jitter=args.jitter, jitter_ms=args.jitter_ms, seed=args.seed
+    )
+    stream_timeout_s = args.stream_timeout_s
+    if stream_timeout_s is None and not pacer.paced:
+        stream_timeout_s = 5.0
+
+    if args.partition_by != "none" and args.api_key is None and args.api_key_file is None:
+        parser.error("--api-key or --api-key-file is required")
+    if args.partition_by == "none" and args.api_key is None:
+        parser.error("--api-key is required without --partition-by")
+
+    recorder = ReplayRecorder(track_latency=args.kafka_bootstrap is not None) if args.report else None
+    tap = None
+    if recorder is not None and args.kafka_bootstrap is not None:
+        tap = KafkaArrivalTap(recorder, bootstrap_servers=args.kafka_bootstrap, topic=args.kafka_topic)
+        tap.start()
+
+    connection = dict(
         target=args.target,
-        api_key=args.api_key,
         tls_enabled=tls_enabled,
         tls_ca_cert=args.tls_ca_cert,
         tls_client_cert=args.tls_client_cert,
         tls_client_key=args.tls_client_key,
+        prefetch=args.prefetch,
+        pacer=pacer,
+        stream_timeout_s=stream_timeout_s,
+        recorder=recorder,
     )
-    if not accepted:
-        raise SystemExit("ingestion did not accept fixture stream")
-    print(f"streamed fixture to {args.target}: {args.fixture}")
+    results: List[PartitionResult] = []
+    accepted = False
+    try:
+        if args.partition_by != "none":
+            results = replay_partitioned(
+                fixture_path=args.fixture,
+                partition_by=args.partition_by,
+                concurrency=args.concurrency,
+                api_keys=load_api_key_file(args.api_key_file) if args.api_key_file else None,
+                default_api_key=args.api_key,
+                **connection,
+            )
+        else:
+            accepted = stream_fixture(fixture_path=args.fixture, api_key=args.api_key, **connection)
+    finally:
+        if tap is not None:
+            tap.drain(args.tap_drain_s)
+            tap.stop()
+        if recorder is not None:
+            report = recorder.report(
+                slo_ms=args.slo_ms,
+                fixture=str(args.fixture),
+                target=args.target,
+                partition_by=args.partition_by,
+                pacing=pacer.report() if pacer.paced else None,
+            )
+            write_report(report, args.report)
+            print(f"wrote replay report {args.report}")
+
+    if pacer.paced:
+        print(json.dumps({"pacing": pacer.report()}))
+    if args.partition_by == "none":
+        if not accepted:
+            raise SystemExit("ingestion did not accept fixture stream")
+        print(f"streamed fixture to {args.target}: {args.fixture}")
+        return
+    rejected = [result for result in results if not result.accepted]
+    for result in rejected:
+        print(f"stream {result.partition} ({result.device_id}) not accepted: {result.error or 'rejected'}")
+    if rejected:
+        raise SystemExit(f"ingestion did not accept {len(rejected)} of {len(results)} streams")
+    print(f"streamed fixture to {args.target} on {len(results)} streams: {args.fixture}")
 
 
 if __name__ == "__main__":
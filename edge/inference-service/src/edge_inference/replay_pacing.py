@@ -0,0 +1,157 @@
+"""Timestamp-driven pacing for fixture replay: real-time, accelerated or max-speed sends."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, TypeVar
+
+from .ingestion_proto import telemetry_pb2
+from .latency_profiler import StageStats
+
+PACE_MODES = ("max", "realtime", "accelerated")
+JITTER_MODELS = ("none", "uniform", "normal", "exponential")
+
+T = TypeVar("T")
+
+
+def envelope_timestamp_ms(envelope: telemetry_pb2.TelemetryEnvelope) -> Optional[int]:
+    """Capture time of an envelope: its earliest vital reading, or None when it carries no vitals."""
+    if not envelope.vitals:
+        return None
+    return min(vital.timestamp_ms for vital in envelope.vitals)
+
+
+class ReplayPacer:
+    """Schedules envelopes at ``origin + (timestamp - origin_ts) / speed`` on the wall clock.
+
+    One pacer is shared by every stream of a replay, so all streams use the same time origin. The origin
+    is ``origin_timestamp_ms`` when given. Otherwise it is the first timestamp seen. Jitter is added to
+    each scheduled send. Lag is how far the actual send fell behind that schedule, which shows whether
+    the sender kept up with the target rate.
+    """
+
+    def __init__(
+        self,
+        *,
+        mode: str = "max",
+        speed: float = 1.0,
+        jitter: str = "none",
+        jitter_ms: float = 0.0,
+        seed: Optional[int] = None,
+        origin_timestamp_ms: Optional[int] = None,
+        lag_window: int = 65536,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if mode not in PACE_MODES:
+            raise ValueError(f"Unknown pace mode '{mode}'; expected one of {PACE_MODES}")
+        if jitter not in JITTER_MODELS:
+            raise ValueError(f"Unknown jitter model '{jitter}'; expected one of {JITTER_MODELS}")
+        if speed <= 0.0:
+            raise ValueError("Replay speed factor must be positive")
+        self.mode = mode
+        self.speed = 1.0 if mode == "realtime" else speed
+        self._jitter = jitter
+        self._jitter_s = jitter_ms / 1000
+        self._random = random.Random(seed)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._origin_ts_ms = origin_timestamp_ms
+        self._origin_wall: Optional[float] = None
+        self._first_send: Optional[float] = None
+        self._last_send: Optional[float] = None
+        self._min_ts_ms: Optional[int] = None
+        self._max_ts_ms: Optional[int] = None
+        self.events = 0
+        self._lag = StageStats(lag_window)
+
+    def set_origin(self, timestamp_ms: int) -> None:
+        """Anchor the schedule on ``timestamp_ms`` unless sends have already started."""
+        with self._lock:
+            if self._origin_wall is None:
+                self._origin_ts_ms = timestamp_ms
+
+    @property
+    def paced(self) -> bool:
+        return self.mode != "max"
+
+    def _jitter_offset_s(self) -> float:
+        if self._jitter == "uniform":
+            return self._random.uniform(-self._jitter_s, self._jitter_s)
+        if self._jitter == "normal":
+            return self._random.gauss(0.0, self._jitter_s)
+        if self._jitter == "exponential":
+            return self._random.expovariate(1.0 / self._jitter_s) if self._jitter_s > 0 else 0.0
+        return 0.0
+
+    def _scheduled_at(self, timestamp_ms: int) -> float:
+        with self._lock:
+            if self._origin_wall is None:
+                self._origin_wall = self._clock()
+                if self._origin_ts_ms is None:
+                    self._origin_ts_ms = timestamp_ms
+            self._min_ts_ms = timestamp_ms if self._min_ts_ms is None else min(self._min_ts_ms, timestamp_ms)
+            self._max_ts_ms = timestamp_ms if self._max_ts_ms is None else max(self._max_ts_ms, timestamp_ms)
+            offset_s = (timestamp_ms - self._origin_ts_ms) / 1000 / self.speed
+            return self._origin_wall + offset_s + self._jitter_offset_s()
+
+    def _record_send(self, lag_s: float) -> None:
+        now = self._clock()
+        with self._lock:
+            self.events += 1
+            if self._first_send is None:
+                self._first_send = now
+            self._last_send = now
+            self._lag.observe(lag_s * 1000)
+
+    def pace(
+        self,
+        envelopes: Iterable[T],
+        timestamp_of: Callable[[T], Optional[int]] = envelope_timestamp_ms,
+    ) -> Iterator[T]:
+        """Yield envelopes no earlier than their scheduled send time; a no-op schedule at max speed."""
+        last_ts_ms: Optional[int] = None
+        for envelope in envelopes:
+            if not self.paced:
+                self._record_send(0.0)
+                yield envelope
+                continue
+            timestamp_ms = timestamp_of(envelope)
+            # Envelopes without vitals go out right behind the previous one.
+            timestamp_ms = timestamp_ms if timestamp_ms is not None else last_ts_ms
+            if timestamp_ms is None:
+                self._record_send(0.0)
+                yield envelope
+                continue
+            last_ts_ms = timestamp_ms
+            scheduled = self._scheduled_at(timestamp_ms)
+            delay_s = scheduled - self._clock()
+            if delay_s > 0:
+                self._sleep(delay_s)
+            self._record_send(max(0.0, self._clock() - scheduled))
+            yield envelope
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed_s = (self._last_send - self._first_send) if self.events > 1 else 0.0
+            span_s = (
+                (self._max_ts_ms - self._min_ts_ms) / 1000 / self.speed
+                if self.paced and self._min_ts_ms is not None
+                else None
+            )
+            lag = self._lag.snapshot()
+            return {
+                "mode": self.mode,
+                "speed": self.speed if self.paced else None,
+                "jitter": self._jitter,
+                "jitter_ms": self._jitter_s * 1000,
+                "events": self.events,
+                "elapsed_s": elapsed_s,
+                "target_span_s": span_s,
+                "achieved_rate_per_s": self.events / elapsed_s if elapsed_s > 0 else None,
+                "target_rate_per_s": self.events / span_s if span_s else None,
+                "lag_ms": {key: lag[key] for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms", "mean_ms", "histogram")},
+            }
@@ -0,0 +1,230 @@
+"""Throughput and end-to-end latency measurements for fixture replay runs."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from .ingestion_proto import telemetry_pb2
+
+T = TypeVar("T")
+EnvelopeKey = Tuple[str, str, int]
+
+# Ingestion latency requirement checked by default: telemetry must reach the topic within 1 s.
+DEFAULT_SLO_REQUIREMENT = "SRS-DATA-004"
+DEFAULT_SLO_MS = 1000.0
+
+
+def envelope_key(envelope: telemetry_pb2.TelemetryEnvelope) -> EnvelopeKey:
+    return (envelope.session_id, envelope.device_id, int(envelope.sequence))
+
+
+def _percentiles(values_ms: List[float]) -> Dict[str, Optional[float]]:
+    if not values_ms:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None, "mean_ms": None}
+    samples = np.asarray(values_ms)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]).tolist()
+    return {
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "max_ms": float(samples.max()),
+        "mean_ms": float(samples.mean()),
+    }
+
+
+class ReplayRecorder:
+    """Counts what a replay sent and, when a tap reports arrivals, matches them to send times.
+
+    Send times are taken when a record is handed to gRPC and kept per ``(session_id, device_id,
+    sequence)`` only while ``track_latency`` is set, so runs without a tap stay constant-memory.
+    Throughput is bucketed into ``interval_s`` windows from the first send.
+    """
+
+    def __init__(
+        self, *, track_latency: bool = False, interval_s: float = 1.0, clock: Callable[[], float] = time.time
+    ) -> None:
+        self.track_latency = track_latency
+        self._interval_s = interval_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        self._buckets: List[int] = []
+        self.envelopes = 0
+        self.bytes_sent = 0
+        self._sent_at: Dict[EnvelopeKey, float] = {}
+        self._latencies_ms: List[float] = []
+        self._unexpected_arrivals = 0
+        self._streams: List[Dict[str, Any]] = []
+
+    def _record_send(self, size: int, key: Optional[EnvelopeKey]) -> None:
+        now = self._clock()
+        with self._lock:
+            if self._started is None:
+                self._started = now
+            self._finished = now
+            bucket = int((now - self._started) / self._interval_s)
+            if bucket >= len(self._buckets):
+                self._buckets.extend([0] * (bucket + 1 - len(self._buckets)))
+            self._buckets[bucket] += 1
+            self.envelopes += 1
+            self.bytes_sent += size
+            if key is not None:
+                self._sent_at[key] = now
+
+    def observe(
+        self,
+        items: Iterable[T],
+        size_of: Callable[[T], int],
+        key_of: Callable[[T], EnvelopeKey],
+    ) -> Iterator[T]:
+        for item in items:
+            self._record_send(size_of(item), key_of(item) if self.track_latency else None)
+            yield item
+
+    def record_arrival(self, key: EnvelopeKey, arrived_at: float) -> None:
+        """Called by a tap when an envelope reaches the topic; ``arrived_at`` is epoch seconds."""
+        with self._lock:
+            sent_at = self._sent_at.pop(key, None)
+            if sent_at is None:
+                self._unexpected_arrivals += 1
+                return
+            self._latencies_ms.append((arrived_at - sent_at) * 1000)
+
+    def record_stream(self, result: Any) -> None:
+        with self._lock:
+            self._streams.append(asdict(result))
+
+    def pending_arrivals(self) -> int:
+        with self._lock:
+            return len(self._sent_at)
+
+    def report(
+        self,
+        *,
+        slo_requirement: str = DEFAULT_SLO_REQUIREMENT,
+        slo_ms: float = DEFAULT_SLO_MS,
+        **context: Any,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            duration_s = (self._finished - self._started) if self._started is not None else 0.0
+            streams = list(self._streams)
+            latency = None
+            if self.track_latency:
+                latency = {
+                    "matched": len(self._latencies_ms),
+                    "missing": len(self._sent_at),
+                    "unexpected": self._unexpected_arrivals,
+                    **_percentiles(self._latencies_ms),
+                }
+            report: Dict[str, Any] = {
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                **context,
+                "totals": {
+                    "envelopes": self.envelopes,
+                    "bytes_sent": self.bytes_sent,
+                    "duration_s": duration_s,
+                    "envelopes_per_s": self.envelopes / duration_s if duration_s > 0 else None,
+                    "bytes_per_s": self.bytes_sent / duration_s if duration_s > 0 else None,
+                },
+                "throughput": {"interval_s": self._interval_s, "envelopes": list(self._buckets)},
+                "streams": streams,
+                "failures": sum(1 for stream in streams if not stream.get("accepted")),
+                "end_to_end_latency_ms": latency,
+            }
+        report["slo"] = _slo_verdict(report, slo_requirement, slo_ms)
+        return report
+
+
+def _slo_verdict(report: Dict[str, Any], requirement: str, threshold_ms: float) -> Dict[str, Any]:
+    latency = report["end_to_end_latency_ms"]
+    if report["failures"]:
+        status = "FAIL"
+    elif latency is None or latency["p99_ms"] is None:
+        status = "NOT_MEASURED"
+    elif latency["missing"] or latency["p99_ms"] > threshold_ms:
+        status = "FAIL"
+    else:
+        status = "PASS"
+    return {
+        "requirement": requirement,
+        "threshold_ms": threshold_ms,
+        "p99_ms": latency["p99_ms"] if latency else None,
+        "status": status,
+    }
+
+
+def write_report(report: Dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+class KafkaArrivalTap:
+    """Consumes the ingestion topic and reports each envelope's arrival time to a recorder.
+
+    Arrival is the record timestamp Kafka assigns: the producer's create time, or broker append time on
+    topics configured for LogAppendTime. Needs ``aiokafka``, which ingestion already uses; it is imported
+    only when a tap is requested.
+    """
+
+    def __init__(self, recorder: ReplayRecorder, *, bootstrap_servers: str, topic: str) -> None:
+        self._recorder = recorder
+        self._bootstrap_servers = bootstrap_servers
+        self._topic = topic
+        self._ready = threading.Event()
+        self._stopping = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="replay-kafka-tap", daemon=True)
+
+    def start(self, timeout_s: float = 30.0) -> None:
+        self._thread.start()
+        if not self._ready.wait(timeout_s):
+            raise RuntimeError(f"Kafka tap did not attach to {self._topic} within {timeout_s:.0f} s")
+        if self._error is not None:
+            raise RuntimeError(f"Kafka tap failed: {self._error}") from self._error
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self._consume())
+        except BaseException as exc:  # noqa: BLE001 - reported through start()
+            self._error = exc
+            self._ready.set()
+
+    async def _consume(self) -> None:
+        from aiokafka import AIOKafkaConsumer  # optional dependency
+
+        consumer = AIOKafkaConsumer(
+            self._topic, bootstrap_servers=self._bootstrap_servers, auto_offset_reset="latest"
+        )
+        await consumer.start()
+        try:
+            # Only envelopes published after the tap attached are measured.
+            await consumer.seek_to_end()
+            self._ready.set()
+            while not self._stopping.is_set():
+                batches = await consumer.getmany(timeout_ms=200)
+                for messages in batches.values():
+                    for message in messages:
+                        envelope = telemetry_pb2.TelemetryEnvelope.FromString(message.value)
+                        self._recorder.record_arrival(envelope_key(envelope), message.timestamp / 1000)
+        finally:
+            await consumer.stop()
+
+    def drain(self, timeout_s: float) -> None:
+        """Wait until every sent envelope has arrived, or ``timeout_s`` elapses."""
+        deadline = time.monotonic() + timeout_s
+        while self._recorder.pending_arrivals() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._thread.join(timeout=5.0)
@@ -0,0 +1,30 @@
+"""orjson-backed JSON responses that serialize NumPy arrays without a Python list round trip."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import orjson
+from fastapi.responses import JSONResponse
+
+# dtypes orjson serializes natively; anything else (float16, object) is converted first.
+_NATIVE_DTYPES = (np.float64, np.float32, np.int64, np.int32)
+
+
+def as_serializable_array(array: np.ndarray) -> np.ndarray:
+    """C-contiguous array of an orjson-native dtype; a no-copy view whenever the input already is one."""
+    dtype = array.dtype if array.dtype.type in _NATIVE_DTYPES else np.float32
+    return np.ascontiguousarray(array, dtype=dtype)
+
+
+class ORJSONNumpyResponse(JSONResponse):
+    """JSON response rendered by orjson with NumPy arrays and scalars serialized directly.
+
+    Non-finite floats are rendered as ``null`` rather than the invalid ``NaN`` token.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
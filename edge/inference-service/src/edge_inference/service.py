@@ -2,17 +2,70 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import atexit
+import json
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List
 
 import numpy as np
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse
 from pydantic import BaseModel, conlist
 
 from .config import Settings, get_settings
+from .inference_pool import InferencePool, InferencePoolSaturated
+from .latency_profiler import LatencyProfiler, StageTimingMiddleware, stage
+from .model_manager import ModelConfig, ModelManager
 from .model_runner import ModelRunner
+from .prediction_cache import PredictionCache
+from .responses import ORJSONNumpyResponse, as_serializable_array
+from .shadow import ShadowEvaluator
+from .streaming import StreamRegistry, StreamSession, stream_feature_names
 from .telemetry_client import TelemetryClient
+from .telemetry_publisher import TelemetryConfig, TelemetryPublisher
+from .telemetry_spool import SpoolForwarder, TelemetrySpool
 
-app = FastAPI(title="Edge Inference Service", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    validate_response_schema()
+    app.state.settings = get_settings()
+    yield
+    # The shadow worker and its ORT session are released with the app rather than left to process exit.
+    _close_shadow_evaluator()
+
+
+app = FastAPI(title="Edge Inference Service", version="0.1.0", lifespan=lifespan)
+
+
+@lru_cache(maxsize=1)
+def _shared_latency_profiler(window: int, enabled: bool) -> LatencyProfiler:
+    return LatencyProfiler(window=window, enabled=enabled)
+
+
+def get_latency_profiler(settings: Settings = Depends(get_settings)) -> LatencyProfiler:
+    return _shared_latency_profiler(settings.profiling_window, settings.profiling_enabled)
+
+
+def _app_settings() -> Settings:
+    """Settings for code outside dependency injection, resolved as the endpoints resolve them.
+
+    A ``get_settings`` override wins, then the settings loaded into ``app.state`` at startup.
+    """
+    override = app.dependency_overrides.get(get_settings)
+    if override is not None:
+        return override()
+    settings = getattr(app.state, "settings", None)
+    return settings if settings is not None else get_settings()
+
+
+app.add_middleware(
+    StageTimingMiddleware,
+    profiler=lambda: get_latency_profiler(_app_settings()),
+    paths=("/predict",),
+)
 
 
 class InferenceRequest(BaseModel):
@@ -22,13 +75,13 @@ class InferenceRequest(BaseModel):
 class InferenceResponse(BaseModel):
     map_forecast: List[float]
     confidence: float
-    metadata: Dict[str, float]
+    metadata: Dict[str, float | str]
 
 
-def _validate_features(features: Dict[str, List[float]], settings: Settings) -> None:
+def _check_feature_names(names: Iterable[str], settings: Settings) -> None:
     if settings.required_feature_names:
         expected = set(settings.required_feature_names)
-        provided = set(features.keys())
+        provided = set(names)
         if provided != expected:
             missing = sorted(expected - provided)
             extra = sorted(provided - expected)
@@ -37,19 +90,45 @@ def _validate_features(features: Dict[str, List[float]], settings: Settings) ->
                 detail={"message": "Feature contract mismatch", "missing": missing, "extra": extra},
             )
 
+
+def _validate_features(features: Dict[str, List[float]], settings: Settings) -> None:
+    _check_feature_names(features.keys(), settings)
     lengths = {len(values) for values in features.values()}
     if len(lengths) > 1:
         raise HTTPException(status_code=422, detail="All feature vectors must have equal length")
 
 
-def _flatten_prediction(prediction: np.ndarray) -> List[float]:
+def _forecast_vector(prediction: np.ndarray) -> np.ndarray:
     if prediction.ndim == 1:
-        return prediction.astype(float).tolist()
+        return as_serializable_array(prediction)
     if prediction.ndim == 2 and prediction.shape[0] == 1:
-        return prediction[0].astype(float).tolist()
+        return as_serializable_array(prediction[0])
     raise HTTPException(status_code=502, detail="Unexpected prediction shape")
 
 
+def _flatten_prediction(prediction: np.ndarray) -> List[float]:
+    return _forecast_vector(prediction).tolist()
+
+
+def _response_payload(
+    forecast: np.ndarray, confidence: float, metadata: Dict[str, float | str]
+) -> Dict[str, Any]:
+    """``InferenceResponse``-shaped payload rendered by :class:`ORJSONNumpyResponse` without per-request validation."""
+    return {"map_forecast": forecast, "confidence": confidence, "metadata": metadata}
+
+
+def validate_response_schema() -> None:
+    """Check once, at startup, that the fast response path still satisfies the declared ``InferenceResponse``."""
+    for forecast in (np.zeros(1, dtype=np.float32), np.zeros((1, 12), dtype=np.float64), np.zeros(3, dtype=np.float16)):
+        payload = _response_payload(
+            _forecast_vector(forecast),
+            0.9,
+            {"inference_ms": 1.0, "model_sha256": "0" * 64, "cache_hit": 1.0, "fallback_active": 1.0},
+        )
+        body = ORJSONNumpyResponse(payload).body
+        InferenceResponse.model_validate_json(body, strict=True)
+
+
 def _extract_confidence(prediction: np.ndarray, metadata: Dict[str, Any], settings: Settings) -> float:
     raw_confidence = metadata.get("confidence")
     if raw_confidence is None and settings.allow_legacy_confidence_index:
@@ -73,51 +152,421 @@ def _extract_confidence(prediction: np.ndarray, metadata: Dict[str, Any], settin
     return confidence
 
 
-def get_model_runner(settings: Settings = Depends(get_settings)) -> ModelRunner:
-    return ModelRunner(
-        model_path=str(settings.model_path),
-        inference_timeout_ms=settings.inference_timeout_ms,
+@lru_cache(maxsize=1)
+def _shared_model_manager(config: ModelConfig) -> ModelManager:
+    manager = ModelManager(config)
+    manager.start()
+    return manager
+
+
+def get_model_manager(settings: Settings = Depends(get_settings)) -> ModelManager:
+    return _shared_model_manager(ModelConfig.from_settings(settings))
+
+
+def get_model_runner(manager: ModelManager = Depends(get_model_manager)) -> Iterator[ModelRunner]:
+    # Leased for the whole request, so a hot reload closes the previous runner only after this request.
+    with manager.lease() as runner:
+        yield runner
+
+
+@lru_cache(maxsize=1)
+def _shared_inference_pool(workers: int, max_queue: int, retry_after_s: int) -> InferencePool:
+    return InferencePool(workers=workers, max_queue=max_queue, retry_after_s=retry_after_s)
+
+
+def get_inference_pool(settings: Settings = Depends(get_settings)) -> InferencePool:
+    return _shared_inference_pool(
+        settings.resolve_inference_workers(),
+        settings.inference_queue_max,
+        settings.inference_retry_after_s,
     )
 
 
-def get_telemetry_client(settings: Settings = Depends(get_settings)) -> TelemetryClient:
-    return TelemetryClient(
-        transport=settings.telemetry_transport,
-        endpoint=settings.telemetry_endpoint,
-        grpc_target=settings.telemetry_grpc_target,
-        grpc_use_tls=settings.telemetry_grpc_use_tls,
-        grpc_tls_ca_cert=settings.telemetry_grpc_tls_ca_cert,
-        grpc_tls_client_cert=settings.telemetry_grpc_tls_client_cert,
-        grpc_tls_client_key=settings.telemetry_grpc_tls_client_key,
-        api_key=settings.telemetry_api_key,
-        default_session_id=settings.telemetry_session_id,
-        default_device_id=settings.telemetry_device_id,
+@lru_cache(maxsize=1)
+def _shared_prediction_cache(max_entries: int, ttl_s: float) -> PredictionCache:
+    return PredictionCache(max_entries=max_entries, ttl_s=ttl_s)
+
+
+def get_prediction_cache(settings: Settings = Depends(get_settings)) -> PredictionCache | None:
+    if not settings.prediction_cache_enabled:
+        return None
+    return _shared_prediction_cache(settings.prediction_cache_max_entries, settings.prediction_cache_ttl_s)
+
+
+@lru_cache(maxsize=1)
+def _shared_shadow_evaluator(
+    config: ModelConfig,
+    queue_size: int,
+    agreement_tolerance_mmhg: float,
+) -> ShadowEvaluator:
+    # Built like the primary, so the comparison is not skewed by a different input contract; only the ORT
+    # profile differs, keeping the shadow off the primary's cores.
+    runner = ModelManager(config).current
+    evaluator = ShadowEvaluator(runner, queue_size=queue_size, agreement_tolerance_mmhg=agreement_tolerance_mmhg)
+    app.state.shadow_evaluator = evaluator
+    return evaluator
+
+
+def get_shadow_evaluator(settings: Settings = Depends(get_settings)) -> ShadowEvaluator | None:
+    if settings.shadow_model_path is None:
+        return None
+    return _shared_shadow_evaluator(
+        ModelConfig.from_settings(settings).for_shadow(
+            settings.shadow_model_path, settings.ort_profiles[settings.shadow_ort_profile]
+        ),
+        settings.shadow_queue_size,
+        settings.shadow_agreement_tolerance_mmhg,
     )
 
 
-@app.post("/predict", response_model=InferenceResponse)
-def predict(
+def _close_shadow_evaluator() -> None:
+    evaluator = getattr(app.state, "shadow_evaluator", None)
+    if evaluator is not None:
+        evaluator.close()
+        app.state.shadow_evaluator = None
+    _shared_shadow_evaluator.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _shared_telemetry_client(config: TelemetryConfig) -> TelemetryClient:
+    client = config.build_client()
+    # Registered before the publisher/forwarder so atexit (LIFO) closes the pool after they drain.
+    atexit.register(client.close)
+    return client
+
+
+@lru_cache(maxsize=1)
+def _shared_spool_forwarder(config: TelemetryConfig) -> SpoolForwarder | None:
+    if config.spool_path is None:
+        return None
+    forwarder = SpoolForwarder(
+        TelemetrySpool(config.spool_path, max_bytes=config.spool_max_bytes),
+        _shared_telemetry_client(config).publish_predictions,
+        batch_size=config.batch_size,
+        rate_limit_per_s=config.forward_rate_per_s,
+    )
+    atexit.register(forwarder.close)
+    return forwarder
+
+
+@lru_cache(maxsize=1)
+def _shared_telemetry_publisher(config: TelemetryConfig) -> TelemetryPublisher:
+    # With a spool configured, predictions land on disk first and the forwarder owns the transport.
+    client = _shared_telemetry_client(config)
+    forwarder = _shared_spool_forwarder(config)
+    publisher = TelemetryPublisher(
+        forwarder.append_many if forwarder is not None else client.publish_predictions,
+        max_queue=config.queue_max,
+        batch_size=config.batch_size,
+        flush_interval_s=config.flush_interval_s,
+    )
+    atexit.register(publisher.close)
+    return publisher
+
+
+def get_telemetry_publisher(settings: Settings = Depends(get_settings)) -> TelemetryPublisher:
+    return _shared_telemetry_publisher(TelemetryConfig.from_settings(settings))
+
+
+@app.post("/predict", response_model=InferenceResponse, response_class=ORJSONNumpyResponse)
+async def predict(
     request: InferenceRequest,
     runner: ModelRunner = Depends(get_model_runner),
-    telem: TelemetryClient = Depends(get_telemetry_client),
+    pool: InferencePool = Depends(get_inference_pool),
+    telem: TelemetryPublisher = Depends(get_telemetry_publisher),
+    cache: PredictionCache | None = Depends(get_prediction_cache),
+    shadow: ShadowEvaluator | None = Depends(get_shadow_evaluator),
     settings: Settings = Depends(get_settings),
-) -> InferenceResponse:
-    _validate_features(request.features, settings)
+) -> ORJSONNumpyResponse:
+    with stage("handler"):
+        return await _predict(request, runner, pool, telem, cache, shadow, settings)
 
-    try:
-        prediction, metadata = runner.run(request.features)
-    except RuntimeError as exc:  # deterministic fallback
-        raise HTTPException(status_code=504, detail=str(exc)) from exc
 
-    confidence = _extract_confidence(prediction, metadata, settings)
-    if confidence < settings.min_confidence:
-        raise HTTPException(status_code=409, detail="Confidence below threshold")
+async def _predict(
+    request: InferenceRequest,
+    runner: ModelRunner,
+    pool: InferencePool,
+    telem: TelemetryPublisher,
+    cache: PredictionCache | None,
+    shadow: ShadowEvaluator | None,
+    settings: Settings,
+) -> ORJSONNumpyResponse:
+    with stage("validate_features"):
+        _validate_features(request.features, settings)
+
+    with stage("cache_lookup"):
+        cache_key = cache.key_for(request.features, runner.model_sha256) if cache is not None else None
+        cached = cache.get(cache_key) if cache is not None else None
+    if cached is not None:
+        prediction, metadata = cached
+        metadata.update({"inference_ms": 0.0, "cache_hit": 1.0})
+    else:
+        try:
+            prediction, metadata = await pool.run_async(runner.run_async, request.features)
+        except InferencePoolSaturated as exc:
+            raise HTTPException(
+                status_code=503,
+                detail=str(exc),
+                headers={"Retry-After": str(exc.retry_after_s)},
+            ) from exc
+        except RuntimeError as exc:  # the session failed outright rather than missing the deadline
+            raise HTTPException(status_code=504, detail=str(exc)) from exc
+        if cache is not None and not metadata.get("fallback_active"):
+            cache.put(cache_key, prediction, metadata)
+    if metadata.get("degraded"):
+        # Deadline missed with no history to fall back on: there is no forecast to give, so the caller gets
+        # a retryable error rather than a success, and telemetry still sees the miss.
+        metadata.update({"confidence": 0.0, "model_sha256": runner.model_sha256})
+        with stage("telemetry_submit"):
+            telem.submit(prediction=[], metadata=metadata)
+        raise HTTPException(
+            status_code=503,
+            detail="Inference deadline missed with no fallback available",
+            headers={"Retry-After": str(settings.inference_retry_after_s)},
+        )
 
-    map_forecast = _flatten_prediction(prediction)
+    with stage("postprocess"):
+        confidence = _extract_confidence(prediction, metadata, settings)
+        if confidence < settings.min_confidence:
+            raise HTTPException(status_code=409, detail="Confidence below threshold")
+        forecast = _forecast_vector(prediction)
+        map_forecast = forecast.tolist()
     metadata["confidence"] = confidence
-    telem.publish_prediction(prediction=map_forecast, metadata=metadata)
-    return InferenceResponse(
-        map_forecast=map_forecast,
-        confidence=confidence,
-        metadata={"inference_ms": metadata["inference_ms"]},
+    metadata["model_sha256"] = runner.model_sha256
+    with stage("telemetry_submit"):
+        telem.submit(prediction=map_forecast, metadata=metadata)
+    if shadow is not None and cached is None and not metadata.get("fallback_active"):
+        with stage("shadow_submit"):
+            shadow.submit(request.features, map_forecast, confidence)
+    response_metadata: Dict[str, float | str] = {
+        "inference_ms": metadata["inference_ms"],
+        "model_sha256": runner.model_sha256,
+    }
+    if cached is not None:
+        response_metadata["cache_hit"] = 1.0
+    if metadata.get("fallback_active"):
+        response_metadata["fallback_active"] = 1.0
+    if "ensemble_spread" in metadata:
+        response_metadata["ensemble_spread"] = metadata["ensemble_spread"]
+    # Returning a Response skips FastAPI's per-request model validation; the schema is checked at startup.
+    return ORJSONNumpyResponse(_response_payload(forecast, confidence, response_metadata))
+
+
+@lru_cache(maxsize=1)
+def _shared_stream_registry(
+    vitals: tuple[str, ...],
+    window_size: int,
+    inference_hz: float,
+    max_sessions: int,
+) -> StreamRegistry:
+    return StreamRegistry(
+        max_sessions=max_sessions,
+        session_factory=lambda session_id: StreamSession(
+            session_id,
+            list(vitals),
+            window_size=window_size,
+            inference_period_s=1.0 / inference_hz,
+        ),
     )
+
+
+def get_stream_registry(settings: Settings = Depends(get_settings)) -> StreamRegistry:
+    return _shared_stream_registry(
+        tuple(settings.stream_vitals),
+        settings.stream_window_size,
+        settings.stream_inference_hz,
+        settings.stream_max_sessions,
+    )
+
+
+async def _stream_inference(
+    session: StreamSession,
+    runner: ModelRunner,
+    pool: InferencePool,
+    telem: TelemetryPublisher,
+    settings: Settings,
+) -> Dict[str, Any]:
+    features = session.model_features(settings.stream_feature_mode)
+    try:
+        _validate_features(features, settings)
+    except HTTPException as exc:
+        session.skipped += 1
+        return {"type": "rejected", "reason": exc.detail}
+    try:
+        prediction, metadata = await pool.run_async(runner.run_async, features)
+    except InferencePoolSaturated:
+        session.skipped += 1
+        return {"type": "skipped", "reason": "inference pool saturated"}
+    except RuntimeError as exc:
+        session.skipped += 1
+        return {"type": "skipped", "reason": str(exc)}
+    if metadata.get("degraded"):
+        session.skipped += 1
+        metadata.update({"confidence": 0.0, "model_sha256": runner.model_sha256, "session_id": session.session_id})
+        telem.submit(prediction=[], metadata=metadata)
+        return {"type": "skipped", "reason": "inference deadline missed with no fallback history"}
+
+    try:
+        confidence = _extract_confidence(prediction, metadata, settings)
+        map_forecast = _flatten_prediction(prediction)
+    except HTTPException as exc:
+        return {"type": "rejected", "reason": exc.detail}
+    session.inferences += 1
+    if confidence < settings.min_confidence:
+        return {"type": "rejected", "reason": "Confidence below threshold", "confidence": confidence}
+
+    metadata.update({"confidence": confidence, "model_sha256": runner.model_sha256, "session_id": session.session_id})
+    telem.submit(prediction=map_forecast, metadata=metadata)
+    return {
+        "type": "prediction",
+        "map_forecast": map_forecast,
+        "confidence": confidence,
+        "features": session.rolling_features(),
+        "metadata": {
+            "inference_ms": metadata["inference_ms"],
+            "model_sha256": runner.model_sha256,
+            **({"fallback_active": 1.0} if metadata.get("fallback_active") else {}),
+        },
+    }
+
+
+@app.websocket("/stream/{session_id}")
+async def stream_vitals(
+    websocket: WebSocket,
+    session_id: str,
+    registry: StreamRegistry = Depends(get_stream_registry),
+    manager: ModelManager = Depends(get_model_manager),
+    pool: InferencePool = Depends(get_inference_pool),
+    telem: TelemetryPublisher = Depends(get_telemetry_publisher),
+    settings: Settings = Depends(get_settings),
+) -> None:
+    """Accept ``{"vital", "value", "timestamp_ms"}`` samples (or ``{"samples": [...]}``) and push predictions.
+
+    Inference runs on the latest windows at ``EDGE_INFER_STREAM_INFERENCE_HZ`` once every vital has
+    ``EDGE_INFER_STREAM_MIN_SAMPLES`` samples. The runner is looked up per inference so long-lived
+    sessions pick up hot-reloaded models. A configuration whose streamed features cannot satisfy the
+    model's feature contract is reported and the connection closed with code 1008.
+    """
+    try:
+        _check_feature_names(stream_feature_names(settings.stream_vitals, settings.stream_feature_mode), settings)
+    except HTTPException as exc:
+        await websocket.accept()
+        await websocket.send_json({"type": "error", "reason": exc.detail})
+        await websocket.close(code=1008, reason="stream features do not match the model feature contract")
+        return
+    session = registry.open(session_id)
+    if session is None:
+        await websocket.close(code=1013, reason="session already streaming or gateway at capacity")
+        return
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                payload = json.loads(message)
+                for sample in payload.get("samples", [payload]):
+                    timestamp_s = float(sample.get("timestamp_ms", time.time() * 1000)) / 1000
+                    session.add_sample(str(sample["vital"]), float(sample["value"]), timestamp_s)
+            except (ValueError, KeyError, TypeError, AttributeError) as exc:
+                await websocket.send_json({"type": "error", "reason": str(exc)})
+                continue
+            if session.ready(settings.stream_min_samples) and session.inference_due(time.monotonic()):
+                with manager.lease() as runner:
+                    result = await _stream_inference(session, runner, pool, telem, settings)
+                await websocket.send_json(result)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        registry.close(session_id)
+
+
+@app.get("/metrics/stream")
+def stream_stats(registry: StreamRegistry = Depends(get_stream_registry)) -> Dict[str, Any]:
+    return registry.stats()
+
+
+@app.get("/metrics/inference-pool")
+def inference_pool_stats(pool: InferencePool = Depends(get_inference_pool)) -> Dict[str, Any]:
+    return pool.stats()
+
+
+@app.get("/metrics/prediction-cache")
+def prediction_cache_stats(cache: PredictionCache | None = Depends(get_prediction_cache)) -> Dict[str, Any]:
+    if cache is None:
+        return {"enabled": False}
+    return cache.stats()
+
+
+@app.get("/metrics/shadow")
+def shadow_stats(shadow: ShadowEvaluator | None = Depends(get_shadow_evaluator)) -> Dict[str, Any]:
+    if shadow is None:
+        return {"enabled": False}
+    return shadow.stats()
+
+
+def get_spool_forwarder(settings: Settings = Depends(get_settings)) -> SpoolForwarder | None:
+    return _shared_spool_forwarder(TelemetryConfig.from_settings(settings))
+
+
+@app.get("/metrics/telemetry")
+def telemetry_stats(
+    telem: TelemetryPublisher = Depends(get_telemetry_publisher),
+    forwarder: SpoolForwarder | None = Depends(get_spool_forwarder),
+) -> Dict[str, Any]:
+    return {**telem.stats(), "spool": forwarder.stats() if forwarder is not None else None}
+
+
+@app.get("/model")
+def model_status(manager: ModelManager = Depends(get_model_manager)) -> Dict[str, Any]:
+    return manager.status()
+
+
+def require_debug_endpoints(settings: Settings = Depends(get_settings)) -> None:
+    if not settings.debug_endpoints_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+@app.get("/debug/latency", dependencies=[Depends(require_debug_endpoints)])
+def latency_breakdown(profiler: LatencyProfiler = Depends(get_latency_profiler)) -> Dict[str, Any]:
+    return profiler.snapshot()
+
+
+@app.post("/debug/latency", dependencies=[Depends(require_debug_endpoints)])
+def configure_latency_profiling(
+    enabled: bool = Query(...),
+    reset: bool = Query(default=False),
+    profiler: LatencyProfiler = Depends(get_latency_profiler),
+) -> Dict[str, Any]:
+    profiler.enabled = enabled
+    if reset:
+        profiler.reset()
+    return profiler.snapshot()
+
+
+@app.post("/debug/ort-trace", dependencies=[Depends(require_debug_endpoints)])
+def start_ort_trace(
+    requests: int = Query(default=100, ge=1),
+    manager: ModelManager = Depends(get_model_manager),
+    settings: Settings = Depends(get_settings),
+) -> Dict[str, Any]:
+    if requests > settings.ort_trace_max_requests:
+        raise HTTPException(status_code=422, detail=f"requests must be <= {settings.ort_trace_max_requests}")
+    runner = manager.current
+    try:
+        runner.start_trace(requests, settings.ort_trace_dir)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return runner.trace_status()
+
+
+@app.get("/debug/ort-trace", dependencies=[Depends(require_debug_endpoints)])
+def ort_trace_status(manager: ModelManager = Depends(get_model_manager)) -> Dict[str, Any]:
+    return manager.current.trace_status()
+
+
+@app.get("/debug/ort-trace/file", dependencies=[Depends(require_debug_endpoints)])
+def ort_trace_file(manager: ModelManager = Depends(get_model_manager)) -> FileResponse:
+    path = manager.current.trace_status()["last_trace_path"]
+    if path is None:
+        raise HTTPException(status_code=404, detail="No completed ORT trace")
+    return FileResponse(path, media_type="application/json")
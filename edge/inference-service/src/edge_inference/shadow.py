@@ -0,0 +1,177 @@
+"""Off-path shadow scoring of a candidate model against the serving model."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .model_runner import ModelRunner
+
+LOGGER = logging.getLogger(__name__)
+
+ShadowItem = Tuple[Dict[str, Iterable[float]], List[float], float]
+
+
+class StreamingDeltaStats:
+    """Fixed-memory running statistics: Welford moments plus a fixed-bin histogram."""
+
+    def __init__(self, *, low: float, high: float, bins: int) -> None:
+        self._edges = np.linspace(low, high, bins + 1)
+        # One extra bin on either side collects under- and overflow.
+        self._counts = np.zeros(bins + 2, dtype=np.int64)
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = float("inf")
+        self._max = float("-inf")
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        if values.size == 0:
+            return
+        batch_count = values.size
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        total = self.count + batch_count
+        delta = batch_mean - self._mean
+        self._mean += delta * batch_count / total
+        self._m2 += batch_m2 + delta * delta * self.count * batch_count / total
+        self.count = total
+        self._min = min(self._min, float(values.min()))
+        self._max = max(self._max, float(values.max()))
+        np.add.at(self._counts, np.searchsorted(self._edges, values, side="right"), 1)
+
+    def _quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        target = q * self.count
+        bin_index = int(np.searchsorted(np.cumsum(self._counts), target, side="left"))
+        if bin_index == 0:
+            return self._min
+        if bin_index > len(self._edges) - 1:
+            return self._max
+        return float((self._edges[bin_index - 1] + self._edges[bin_index]) / 2)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self._mean if self.count else None,
+            "std": float(np.sqrt(self._m2 / self.count)) if self.count else None,
+            "min": self._min if self.count else None,
+            "max": self._max if self.count else None,
+            "p50": self._quantile(0.50),
+            "p95": self._quantile(0.95),
+            "histogram": {
+                "edges": self._edges.tolist(),
+                "underflow": int(self._counts[0]),
+                "counts": self._counts[1:-1].tolist(),
+                "overflow": int(self._counts[-1]),
+            },
+        }
+
+
+class ShadowEvaluator:
+    """Scores primary inputs on a shadow runner from a bounded background queue."""
+
+    def __init__(
+        self,
+        runner: ModelRunner,
+        *,
+        queue_size: int,
+        agreement_tolerance_mmhg: float = 5.0,
+    ) -> None:
+        self._runner = runner
+        self._queue: queue.Queue[Optional[ShadowItem]] = queue.Queue(maxsize=queue_size)
+        self._tolerance = agreement_tolerance_mmhg
+        self._lock = threading.Lock()
+        self._map_delta = StreamingDeltaStats(low=-20.0, high=20.0, bins=40)
+        self._confidence_delta = StreamingDeltaStats(low=-1.0, high=1.0, bins=40)
+        self.submitted = 0
+        self.dropped = 0
+        self.scored = 0
+        self.agreements = 0
+        self.shape_mismatches = 0
+        self.shadow_fallbacks = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._drain, name="shadow-eval", daemon=True)
+        self._worker.start()
+
+    def submit(self, features: Dict[str, Iterable[float]], map_forecast: List[float], confidence: float) -> bool:
+        """Enqueue without blocking; the sample is dropped when the shadow worker is behind."""
+        try:
+            self._queue.put_nowait((features, map_forecast, confidence))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def _drain(self) -> None:
+        while not self._stop.is_set():
+            try:
+                item = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is None:
+                return
+            try:
+                self._score(*item)
+            except Exception as exc:  # noqa: BLE001 - shadow failures must never surface to serving
+                with self._lock:
+                    self.errors += 1
+                LOGGER.debug("Shadow scoring failed: %s", exc)
+
+    def _score(self, features: Dict[str, Iterable[float]], map_forecast: List[float], confidence: float) -> None:
+        prediction, metadata = self._runner.run(features)
+        with self._lock:
+            if metadata.get("fallback_active"):
+                self.shadow_fallbacks += 1
+                return
+            shadow_forecast = np.asarray(prediction, dtype=np.float64).reshape(-1)
+            primary_forecast = np.asarray(map_forecast, dtype=np.float64)
+            if shadow_forecast.shape != primary_forecast.shape:
+                self.shape_mismatches += 1
+                return
+            map_delta = shadow_forecast - primary_forecast
+            self._map_delta.update(map_delta)
+            shadow_confidence = metadata.get("confidence")
+            if shadow_confidence is not None:
+                self._confidence_delta.update(np.asarray([float(shadow_confidence) - confidence]))
+            self.scored += 1
+            if map_delta.size == 0 or float(np.abs(map_delta).max()) <= self._tolerance:
+                self.agreements += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": True,
+                "shadow_model_sha256": self._runner.model_sha256,
+                "queue_depth": self._queue.qsize(),
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "scored": self.scored,
+                "agreement_rate": (self.agreements / self.scored) if self.scored else None,
+                "agreement_tolerance_mmhg": self._tolerance,
+                "shape_mismatches": self.shape_mismatches,
+                "shadow_fallbacks": self.shadow_fallbacks,
+                "errors": self.errors,
+                "map_delta": self._map_delta.snapshot(),
+                "confidence_delta": self._confidence_delta.snapshot(),
+            }
+
+    def close(self) -> None:
+        """Stop after the sample being scored, discarding queued ones; never blocks on a full queue."""
+        self._stop.set()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self._worker.join(timeout=1.0)
+        self._runner.close()
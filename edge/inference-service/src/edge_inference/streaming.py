@@ -0,0 +1,182 @@
+"""Per-session vitals ring buffers with incrementally maintained rolling-window features."""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+import numpy as np
+
+ROLLING_FEATURES = ("last", "mean", "slope", "min")
+
+
+def stream_feature_names(vitals: List[str], mode: str) -> List[str]:
+    """Model input names a session streaming ``vitals`` produces in ``mode``, as :meth:`StreamSession.model_features` names them."""
+    if mode == "window":
+        return list(vitals)
+    return [f"{name}_{feature}" for name in vitals for feature in ROLLING_FEATURES]
+
+
+class RollingWindow:
+    """Fixed-size ring buffer of one vital with O(1) last/mean/slope/min per appended sample.
+
+    Mean and least-squares slope (units per second) come from running sums that are updated on
+    every append/evict; the sums are rebuilt from the buffer once per window length so float drift
+    stays bounded at amortised O(1). Min uses a monotonic deque.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._values = np.zeros(size, dtype=np.float64)
+        self._times = np.zeros(size, dtype=np.float64)
+        self._head = 0
+        self.count = 0
+        self._appends = 0
+        self._t0 = 0.0
+        self._sx = self._sy = self._sxx = self._sxy = 0.0
+        self._min: Deque[Tuple[int, float]] = deque()
+
+    def append(self, value: float, timestamp_s: float) -> None:
+        if self.count == 0:
+            self._t0 = timestamp_s
+        x = timestamp_s - self._t0
+        if self.count == self.size:
+            old_y = self._values[self._head]
+            old_x = self._times[self._head]
+            self._sx -= old_x
+            self._sy -= old_y
+            self._sxx -= old_x * old_x
+            self._sxy -= old_x * old_y
+        else:
+            self.count += 1
+        self._values[self._head] = value
+        self._times[self._head] = x
+        self._sx += x
+        self._sy += value
+        self._sxx += x * x
+        self._sxy += x * value
+
+        sample_index = self._appends
+        self._appends += 1
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((sample_index, value))
+        while self._min[0][0] <= sample_index - self.size:
+            self._min.popleft()
+
+        self._head = (self._head + 1) % self.size
+        if self._appends % self.size == 0:
+            self._rebase()
+
+    def _rebase(self) -> None:
+        times = self._times[: self.count]
+        values = self._values[: self.count]
+        shift = float(times.min())
+        times -= shift
+        self._t0 += shift
+        self._sx = float(times.sum())
+        self._sy = float(values.sum())
+        self._sxx = float(np.dot(times, times))
+        self._sxy = float(np.dot(times, values))
+
+    def values(self) -> np.ndarray:
+        """Window values oldest-first (a copy)."""
+        if self.count < self.size:
+            return self._values[: self.count].copy()
+        return np.roll(self._values, -self._head)
+
+    def features(self) -> Dict[str, float]:
+        n = self.count
+        if n == 0:
+            return {name: math.nan for name in ROLLING_FEATURES}
+        denominator = n * self._sxx - self._sx * self._sx
+        slope = (n * self._sxy - self._sx * self._sy) / denominator if n > 1 and denominator > 1e-12 else 0.0
+        return {
+            "last": float(self._values[(self._head - 1) % self.size]),
+            "mean": self._sy / n,
+            "slope": slope,
+            "min": self._min[0][1],
+        }
+
+
+class StreamSession:
+    """Rolling windows for every streamed vital of one monitor session plus its inference cadence."""
+
+    def __init__(self, session_id: str, vitals: List[str], *, window_size: int, inference_period_s: float) -> None:
+        self.session_id = session_id
+        self.windows = {name: RollingWindow(window_size) for name in vitals}
+        self._period_s = inference_period_s
+        self._next_due = 0.0
+        self.samples = 0
+        self.inferences = 0
+        self.skipped = 0
+
+    def add_sample(self, vital: str, value: float, timestamp_s: float) -> None:
+        window = self.windows.get(vital)
+        if window is None:
+            raise ValueError(f"Unknown vital '{vital}'; expected one of {sorted(self.windows)}")
+        if not math.isfinite(value):
+            raise ValueError(f"Non-finite value for vital '{vital}'")
+        window.append(value, timestamp_s)
+        self.samples += 1
+
+    def ready(self, min_samples: int) -> bool:
+        return all(window.count >= min_samples for window in self.windows.values())
+
+    def inference_due(self, now: float) -> bool:
+        """True at most once per period; the schedule advances by whole periods to avoid drift."""
+        if now < self._next_due:
+            return False
+        self._next_due = now + self._period_s if now - self._next_due > self._period_s else self._next_due + self._period_s
+        return True
+
+    def rolling_features(self) -> Dict[str, Dict[str, float]]:
+        return {name: window.features() for name, window in self.windows.items()}
+
+    def model_features(self, mode: str) -> Dict[str, List[float]]:
+        """Model inputs in the /predict feature contract: raw windows or one value per rolling feature."""
+        if mode == "window":
+            return {name: window.values().astype(np.float32).tolist() for name, window in self.windows.items()}
+        return {
+            f"{name}_{feature}": [value]
+            for name, window in self.windows.items()
+            for feature, value in window.features().items()
+        }
+
+
+class StreamRegistry:
+    """Bounded set of live streaming sessions on this gateway."""
+
+    def __init__(self, *, max_sessions: int, session_factory: Callable[[str], StreamSession]) -> None:
+        self._max_sessions = max_sessions
+        self._factory = session_factory
+        self._sessions: Dict[str, StreamSession] = {}
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def open(self, session_id: str) -> StreamSession | None:
+        with self._lock:
+            if session_id in self._sessions or len(self._sessions) >= self._max_sessions:
+                self.rejected += 1
+                return None
+            session = self._factory(session_id)
+            self._sessions[session_id] = session
+            return session
+
+    def close(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            "active_sessions": len(sessions),
+            "max_sessions": self._max_sessions,
+            "rejected_sessions": self.rejected,
+            "samples": sum(session.samples for session in sessions),
+            "inferences": sum(session.inferences for session in sessions),
+            "skipped_inferences": sum(session.skipped for session in sessions),
+        }
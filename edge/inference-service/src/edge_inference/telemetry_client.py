@@ -2,15 +2,35 @@
 
 from __future__ import annotations
 
+import json
+import threading
 from itertools import count
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Literal
 
 import grpc
 import httpx
 
 from .ingestion_proto import telemetry_pb2, telemetry_pb2_grpc
 
+HttpBatchFormat = Literal["single", "json", "ndjson"]
+
+# Statuses that reject the payload itself; resending the same records cannot succeed.
+REJECTED_HTTP_STATUSES = frozenset({400, 413, 415, 422})
+
+
+class TelemetryRejected(RuntimeError):
+    """The backend refused the records themselves, as opposed to being unreachable or unavailable."""
+
+
+def _raise_for_status(response: httpx.Response) -> None:
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        if response.status_code in REJECTED_HTTP_STATUSES:
+            raise TelemetryRejected(str(exc)) from exc
+        raise
+
 
 class TelemetryClient:
     """Telemetry client supporting HTTP and gRPC ingestion contracts."""
@@ -28,6 +48,9 @@ class TelemetryClient:
         api_key: str,
         default_session_id: str,
         default_device_id: str,
+        http2: bool = True,
+        http_batch_format: HttpBatchFormat = "single",
+        http_timeout_s: float = 1.0,
     ) -> None:
         self._transport = transport.lower()
         self._endpoint = endpoint.rstrip("/")
@@ -40,6 +63,45 @@ class TelemetryClient:
         self._default_session_id = default_session_id
         self._default_device_id = default_device_id
         self._sequence = count(start=1)
+        self._http2 = http2
+        self._http_batch_format = http_batch_format
+        self._http_timeout_s = http_timeout_s
+        self._http_client: httpx.Client | None = None
+        self._http_client_lock = threading.Lock()
+        self._grpc_stub: telemetry_pb2_grpc.TelemetryIngestionStub | None = None
+        self._grpc_shared_channel: grpc.Channel | None = None
+        self._grpc_lock = threading.Lock()
+
+    def _pooled_http_client(self) -> httpx.Client:
+        # One keep-alive pool for the life of the client; HTTP/2 is negotiated via ALPN on https endpoints.
+        with self._http_client_lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(
+                    http2=self._http2,
+                    timeout=self._http_timeout_s,
+                    limits=httpx.Limits(max_connections=4, max_keepalive_connections=4, keepalive_expiry=60.0),
+                    headers={"Authorization": f"Bearer {self._api_key}"},
+                )
+            return self._http_client
+
+    def _shared_grpc_stub(self) -> telemetry_pb2_grpc.TelemetryIngestionStub:
+        # One channel for the life of the client; gRPC reconnects it on its own after transport failures.
+        with self._grpc_lock:
+            if self._grpc_stub is None:
+                self._grpc_shared_channel = self._grpc_channel()
+                self._grpc_stub = telemetry_pb2_grpc.TelemetryIngestionStub(self._grpc_shared_channel)
+            return self._grpc_stub
+
+    def close(self) -> None:
+        with self._http_client_lock:
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+        with self._grpc_lock:
+            if self._grpc_shared_channel is not None:
+                self._grpc_shared_channel.close()
+                self._grpc_shared_channel = None
+                self._grpc_stub = None
 
     def _grpc_channel(self):
         if not self._grpc_use_tls:
@@ -66,24 +128,53 @@ class TelemetryClient:
         return grpc.secure_channel(self._grpc_target, credentials)
 
     def publish_prediction(self, prediction: List[float], metadata: Dict[str, Any]) -> None:
+        self.publish_predictions([{"prediction": prediction, "metadata": metadata}])
+
+    def publish_predictions(self, records: List[Dict[str, Any]]) -> None:
+        """Publish a batch of ``{"prediction": [...], "metadata": {...}}`` records."""
         if self._transport == "grpc":
-            self._publish_prediction_grpc(prediction=prediction, metadata=metadata)
+            self._publish_predictions_grpc(records)
+            return
+        if self._http_batch_format == "single":
+            for record in records:
+                self._publish_prediction_http(prediction=record["prediction"], metadata=record["metadata"])
             return
-        self._publish_prediction_http(prediction=prediction, metadata=metadata)
+        self._publish_predictions_http_bulk(records)
 
     def _publish_prediction_http(self, prediction: List[float], metadata: Dict[str, Any]) -> None:
         payload = {"prediction": prediction, "metadata": metadata}
-        headers = {"Authorization": f"Bearer {self._api_key}"}
-        response = httpx.post(f"{self._endpoint}", json=payload, headers=headers, timeout=1.0)
-        response.raise_for_status()
+        response = self._pooled_http_client().post(self._endpoint, json=payload)
+        _raise_for_status(response)
+
+    def _publish_predictions_http_bulk(self, records: List[Dict[str, Any]]) -> None:
+        """POST the whole batch to ``{endpoint}/bulk`` as one JSON array or NDJSON body.
+
+        Opt-in: the receiver must expose that route and answer 2xx only once every record in the body is
+        accepted. Any other status fails the whole batch.
+        """
+        if not records:
+            return
+        payloads = [{"prediction": record["prediction"], "metadata": record["metadata"]} for record in records]
+        if self._http_batch_format == "ndjson":
+            body = "".join(json.dumps(payload, separators=(",", ":")) + "\n" for payload in payloads)
+            content_type = "application/x-ndjson"
+        else:
+            body = json.dumps(payloads, separators=(",", ":"))
+            content_type = "application/json"
+        response = self._pooled_http_client().post(
+            f"{self._endpoint}/bulk",
+            content=body.encode("utf-8"),
+            headers={"Content-Type": content_type},
+        )
+        _raise_for_status(response)
 
-    def _publish_prediction_grpc(self, prediction: List[float], metadata: Dict[str, Any]) -> None:
+    def _envelope(self, prediction: List[float], metadata: Dict[str, Any]) -> telemetry_pb2.TelemetryEnvelope:
         session_id = str(metadata.get("session_id", self._default_session_id))
         device_id = str(metadata.get("device_id", self._default_device_id))
         map_value = float(metadata.get("map", prediction[0] if prediction else 0.0))
         confidence = float(metadata.get("confidence", 0.0))
 
-        envelope = telemetry_pb2.TelemetryEnvelope(
+        return telemetry_pb2.TelemetryEnvelope(
             session_id=session_id,
             device_id=device_id,
             sequence=int(metadata.get("sequence", next(self._sequence))),
@@ -101,15 +192,27 @@ class TelemetryClient:
             },
         )
 
-        channel = self._grpc_channel()
-        try:
-            stub = telemetry_pb2_grpc.TelemetryIngestionStub(channel)
-            ack = stub.StreamTelemetry(
-                iter([envelope]),
-                metadata=(("x-api-key", self._api_key), ("x-device-id", device_id)),
-                timeout=1.0,
-            )
+    def _publish_predictions_grpc(self, records: List[Dict[str, Any]]) -> None:
+        envelopes_by_device: Dict[str, List[telemetry_pb2.TelemetryEnvelope]] = {}
+        for record in records:
+            try:
+                envelope = self._envelope(record["prediction"], record["metadata"])
+            except (KeyError, TypeError, ValueError) as exc:
+                raise TelemetryRejected(f"malformed telemetry record: {exc}") from exc
+            envelopes_by_device.setdefault(envelope.device_id, []).append(envelope)
+
+        stub = self._shared_grpc_stub()
+        # Ingestion checks x-device-id against every envelope, so each device gets its own stream.
+        for device_id, envelopes in envelopes_by_device.items():
+            try:
+                ack = stub.StreamTelemetry(
+                    iter(envelopes),
+                    metadata=(("x-api-key", self._api_key), ("x-device-id", device_id)),
+                    timeout=1.0,
+                )
+            except grpc.RpcError as exc:
+                if exc.code() == grpc.StatusCode.INVALID_ARGUMENT:
+                    raise TelemetryRejected(str(exc)) from exc
+                raise
             if not ack.accepted:
-                raise RuntimeError("ingestion rejected telemetry envelope")
-        finally:
-            channel.close()
+                raise TelemetryRejected("ingestion rejected telemetry envelope")
@@ -0,0 +1,200 @@
+"""Background, batched telemetry publication kept off the /predict request path."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .config import Settings
+from .telemetry_client import TelemetryClient
+
+LOGGER = logging.getLogger(__name__)
+
+TelemetryRecord = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class TelemetryConfig:
+    """Hashable subset of settings needed to build the shared telemetry pipeline."""
+
+    transport: str
+    endpoint: str
+    grpc_target: str
+    grpc_use_tls: bool
+    grpc_tls_ca_cert: Optional[Path]
+    grpc_tls_client_cert: Optional[Path]
+    grpc_tls_client_key: Optional[Path]
+    api_key: str
+    default_session_id: str
+    default_device_id: str
+    http2: bool
+    http_batch_format: str
+    queue_max: int
+    batch_size: int
+    flush_interval_s: float
+    spool_path: Optional[Path]
+    spool_max_bytes: int
+    forward_rate_per_s: float
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "TelemetryConfig":
+        return cls(
+            transport=settings.telemetry_transport,
+            endpoint=settings.telemetry_endpoint,
+            grpc_target=settings.telemetry_grpc_target,
+            grpc_use_tls=settings.telemetry_grpc_use_tls,
+            grpc_tls_ca_cert=settings.telemetry_grpc_tls_ca_cert,
+            grpc_tls_client_cert=settings.telemetry_grpc_tls_client_cert,
+            grpc_tls_client_key=settings.telemetry_grpc_tls_client_key,
+            api_key=settings.telemetry_api_key,
+            default_session_id=settings.telemetry_session_id,
+            default_device_id=settings.telemetry_device_id,
+            http2=settings.telemetry_http2,
+            http_batch_format=settings.telemetry_http_batch_format,
+            queue_max=settings.telemetry_queue_max,
+            batch_size=settings.telemetry_batch_size,
+            flush_interval_s=settings.telemetry_flush_interval_s,
+            spool_path=settings.telemetry_spool_path,
+            spool_max_bytes=settings.telemetry_spool_max_bytes,
+            forward_rate_per_s=settings.telemetry_forward_rate_per_s,
+        )
+
+    def build_client(self) -> TelemetryClient:
+        return TelemetryClient(
+            transport=self.transport,
+            endpoint=self.endpoint,
+            grpc_target=self.grpc_target,
+            grpc_use_tls=self.grpc_use_tls,
+            grpc_tls_ca_cert=self.grpc_tls_ca_cert,
+            grpc_tls_client_cert=self.grpc_tls_client_cert,
+            grpc_tls_client_key=self.grpc_tls_client_key,
+            api_key=self.api_key,
+            default_session_id=self.default_session_id,
+            default_device_id=self.default_device_id,
+            http2=self.http2,
+            http_batch_format=self.http_batch_format,
+        )
+
+
+class TelemetryPublisher:
+    """Bounded in-process queue drained in batches by one background thread.
+
+    Overflow policy is drop-oldest: when the queue is full the oldest pending record is
+    discarded so the most recent clinical state always reaches the backend first.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[List[TelemetryRecord]], None],
+        *,
+        max_queue: int,
+        batch_size: int,
+        flush_interval_s: float,
+    ) -> None:
+        self._sink = sink
+        self._batch_size = batch_size
+        self._flush_interval_s = flush_interval_s
+        self._queue: Deque[TelemetryRecord] = deque(maxlen=max_queue)
+        self._condition = threading.Condition()
+        self._closed = False
+        self._flush_requested = False
+        self._in_flight = 0
+        self.submitted = 0
+        self.published = 0
+        self.dropped = 0
+        self.failed_batches = 0
+        self.max_depth = 0
+        self.last_error: Optional[str] = None
+        self._worker = threading.Thread(target=self._drain, name="telemetry-publisher", daemon=True)
+        self._worker.start()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def submit(self, prediction: List[float], metadata: Dict[str, Any]) -> None:
+        """Enqueue a prediction record; never blocks on the transport."""
+        record = {"prediction": list(prediction), "metadata": dict(metadata)}
+        with self._condition:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(record)
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, len(self._queue))
+            if len(self._queue) >= self._batch_size:
+                self._condition.notify()
+
+    def _next_batch(self) -> Optional[List[TelemetryRecord]]:
+        with self._condition:
+            deadline = time.monotonic() + self._flush_interval_s
+            while not (self._closed or self._flush_requested) and len(self._queue) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            if not self._queue:
+                self._flush_requested = False
+                return None if self._closed else []
+            batch = [self._queue.popleft() for _ in range(min(self._batch_size, len(self._queue)))]
+            self._in_flight = len(batch)
+            return batch
+
+    def _drain(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            if not batch:
+                continue
+            try:
+                self._sink(batch)
+            except Exception as exc:  # noqa: BLE001 - transport failures must not stop the publisher
+                with self._condition:
+                    self.failed_batches += 1
+                    self.last_error = str(exc)
+                LOGGER.warning("Telemetry batch of %d records failed: %s", len(batch), exc)
+            else:
+                with self._condition:
+                    self.published += len(batch)
+            finally:
+                with self._condition:
+                    self._in_flight = 0
+                    self._condition.notify_all()
+
+    def flush(self, timeout_s: float = 5.0) -> bool:
+        """Wait until queued records have been handed to the sink."""
+        deadline = time.monotonic() + timeout_s
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._queue or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout_s: float = 5.0) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join(timeout=timeout_s)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "queue_depth": len(self._queue),
+                "queue_max": self._queue.maxlen,
+                "max_depth": self.max_depth,
+                "overflow_policy": "drop_oldest",
+                "submitted": self.submitted,
+                "published": self.published,
+                "dropped": self.dropped,
+                "failed_batches": self.failed_batches,
+                "last_error": self.last_error,
+            }
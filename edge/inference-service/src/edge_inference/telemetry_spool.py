@@ -0,0 +1,220 @@
+"""Durable store-and-forward spool for telemetry while the backend is unreachable."""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .telemetry_client import TelemetryRejected
+
+LOGGER = logging.getLogger(__name__)
+
+TelemetryRecord = Dict[str, Any]
+
+
+class TelemetrySpool:
+    """SQLite (WAL) FIFO of telemetry records with bounded payload bytes and oldest-first eviction.
+
+    Row ids come from ``AUTOINCREMENT`` and are never reused, so they double as a sequence
+    number that keeps increasing across reboots.
+    """
+
+    def __init__(self, path: Path, *, max_bytes: int) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS spool ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "payload BLOB NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        depth, size_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM spool").fetchone()
+        self._depth = int(depth)
+        self._size_bytes = int(size_bytes)
+        self.evicted = 0
+
+    def append_many(self, records: List[TelemetryRecord]) -> None:
+        now = time.time()
+        rows = []
+        for record in records:
+            payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+            rows.append((payload, len(payload), now))
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany("INSERT INTO spool (payload, size, created_at) VALUES (?, ?, ?)", rows)
+                self._depth += len(rows)
+                self._size_bytes += sum(row[1] for row in rows)
+                self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        while self._size_bytes > self._max_bytes and self._depth > 0:
+            overflow = self._size_bytes - self._max_bytes
+            victims = self._conn.execute("SELECT seq, size FROM spool ORDER BY seq LIMIT 256").fetchall()
+            cutoff_seq, freed, count = victims[0][0], 0, 0
+            for seq, size in victims:
+                cutoff_seq, freed, count = seq, freed + size, count + 1
+                if freed >= overflow:
+                    break
+            self._conn.execute("DELETE FROM spool WHERE seq <= ?", (cutoff_seq,))
+            self._depth -= count
+            self._size_bytes -= freed
+            self.evicted += count
+
+    def peek(self, limit: int) -> List[Tuple[int, TelemetryRecord]]:
+        """Return the oldest records with ``metadata.sequence`` stamped from the spool sequence."""
+        with self._lock:
+            rows = self._conn.execute("SELECT seq, payload FROM spool ORDER BY seq LIMIT ?", (limit,)).fetchall()
+        batch = []
+        for seq, payload in rows:
+            record = json.loads(payload)
+            record.setdefault("metadata", {}).setdefault("sequence", seq)
+            batch.append((seq, record))
+        return batch
+
+    def ack(self, up_to_seq: int) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                count, size = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM spool WHERE seq <= ?", (up_to_seq,)
+                ).fetchone()
+                self._conn.execute("DELETE FROM spool WHERE seq <= ?", (up_to_seq,))
+                self._depth -= int(count)
+                self._size_bytes -= int(size)
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SpoolForwarder:
+    """Drains the spool to the backend in sequence order with rate limiting and backoff.
+
+    Transport failures retry the head batch with backoff. A batch the backend rejects outright
+    (:class:`TelemetryRejected`) is resent one record at a time, and records rejected on their own are
+    dropped and counted, so one malformed record cannot stall the spool.
+    """
+
+    def __init__(
+        self,
+        spool: TelemetrySpool,
+        sink: Callable[[List[TelemetryRecord]], None],
+        *,
+        batch_size: int,
+        rate_limit_per_s: float,
+        backoff_initial_s: float = 0.5,
+        backoff_max_s: float = 30.0,
+        idle_poll_s: float = 0.2,
+    ) -> None:
+        self.spool = spool
+        self._sink = sink
+        self._batch_size = batch_size
+        self._rate_limit_per_s = rate_limit_per_s
+        self._backoff_initial_s = backoff_initial_s
+        self._backoff_max_s = backoff_max_s
+        self._idle_poll_s = idle_poll_s
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._backoff_s = 0.0
+        # Spool sequence up to which records are sent one at a time, after a rejected batch.
+        self._isolate_through: Optional[int] = None
+        self.connected = True
+        self.forwarded = 0
+        self.failures = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self._worker = threading.Thread(target=self._run, name="telemetry-forwarder", daemon=True)
+        self._worker.start()
+
+    def append_many(self, records: List[TelemetryRecord]) -> None:
+        self.spool.append_many(records)
+        self._wake.set()
+
+    def _run(self) -> None:
+        # Token bucket: a drained backlog after reconnect is sent at no more than rate_limit_per_s.
+        tokens = float(self._batch_size)
+        last_refill = time.monotonic()
+        while not self._stop.is_set():
+            now = time.monotonic()
+            tokens = min(float(self._batch_size), tokens + (now - last_refill) * self._rate_limit_per_s)
+            last_refill = now
+
+            isolating = self._isolate_through is not None
+            batch = self.spool.peek(1 if isolating else min(self._batch_size, max(1, int(tokens))))
+            if isolating and (not batch or batch[0][0] > self._isolate_through):
+                self._isolate_through = None
+                continue
+            if not batch:
+                self._wake.wait(self._idle_poll_s)
+                self._wake.clear()
+                continue
+            if tokens < len(batch):
+                self._stop.wait((len(batch) - tokens) / self._rate_limit_per_s)
+                continue
+
+            try:
+                self._sink([record for _, record in batch])
+            except TelemetryRejected as exc:
+                self.last_error = str(exc)
+                self.connected = True
+                self._backoff_s = 0.0
+                tokens -= len(batch)
+                if len(batch) > 1:
+                    self._isolate_through = batch[-1][0]
+                    continue
+                self.spool.ack(batch[0][0])
+                self.rejected += 1
+                LOGGER.error("Telemetry record %d rejected by the backend, dropped: %s", batch[0][0], exc)
+                continue
+            except Exception as exc:  # noqa: BLE001 - keep spooling until the backend is reachable again
+                self.failures += 1
+                self.last_error = str(exc)
+                self.connected = False
+                self._backoff_s = min(self._backoff_max_s, max(self._backoff_initial_s, self._backoff_s * 2))
+                LOGGER.warning("Telemetry forward failed, retrying in %.1fs: %s", self._backoff_s, exc)
+                self._stop.wait(self._backoff_s)
+                continue
+
+            self.spool.ack(batch[-1][0])
+            tokens -= len(batch)
+            self.forwarded += len(batch)
+            self.connected = True
+            self._backoff_s = 0.0
+
+    def close(self, timeout_s: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._worker.join(timeout=timeout_s)
+        self.spool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "spool_depth": self.spool.depth,
+            "spool_bytes": self.spool.size_bytes,
+            "evicted": self.spool.evicted,
+            "forwarded": self.forwarded,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "connected": self.connected,
+            "backoff_s": self._backoff_s,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from edge_inference import autotune
+from edge_inference.config import OrtProfile, Settings
+
+
+def test_candidate_profiles_respect_cpu_count() -> None:
+    candidates = autotune.candidate_profiles(2)
+
+    assert {profile.intra_op_num_threads for profile in candidates} == {1, 2}
+    assert all(profile.intra_op_num_threads * profile.inter_op_num_threads <= 2 for profile in candidates)
+    assert any(profile.execution_mode == "parallel" for profile in candidates)
+
+
+def test_autotune_prefers_fewest_threads_within_tolerance(monkeypatch) -> None:
+    p95_by_threads = {1: 1.02, 2: 1.00, 4: 0.60, 8: 0.59}
+
+    def fake_benchmark(model_path, profile, *, rows, runs):
+        threads = profile.intra_op_num_threads * profile.inter_op_num_threads
+        return {"profile": profile.model_dump(), "load_ms": 1.0, "p50_ms": 0.5, "p95_ms": p95_by_threads[threads], "p99_ms": 2.0}
+
+    monkeypatch.setattr(autotune, "benchmark_profile", fake_benchmark)
+
+    best, results = autotune.autotune(Path("model.onnx"), rows=1, runs=10, cpu_count=8)
+
+    assert best.intra_op_num_threads * best.inter_op_num_threads == 4
+    assert len(results) == len(autotune.candidate_profiles(8))
+
+
+def test_settings_resolve_named_and_file_profiles(tmp_path: Path) -> None:
+    assert Settings(ort_profile="gateway").resolve_ort_profile().intra_op_num_threads == 2
+
+    profile_path = tmp_path / "ort_profile.json"
+    profile_path.write_text(OrtProfile(intra_op_num_threads=3).model_dump_json(), encoding="utf-8")
+    assert Settings(ort_profile_path=profile_path).resolve_ort_profile().intra_op_num_threads == 3
+
+    with pytest.raises(ValueError, match="Unknown ORT profile"):
+        Settings(ort_profile="missing")
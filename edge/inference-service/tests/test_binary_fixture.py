@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+from concurrent import futures
+from pathlib import Path
+
+import grpc
+import pytest
+
+from edge_inference.binary_fixture import BinaryFixtureWriter, iter_records
+from edge_inference.ingestion_proto import telemetry_pb2, telemetry_pb2_grpc
+from edge_inference.replay_fixture import _iter_fixture_events, convert_jsonl_to_binary, stream_fixture
+
+
+def _write_jsonl(path: Path, count: int, device_id: str = "pump-01") -> None:
+    path.write_text(
+        "\n".join(
+            json.dumps(
+                {
+                    "session_id": "s-1",
+                    "device_id": device_id,
+                    "sequence": index + 1,
+                    "vitals": [{"name": "map", "value": 60.0 + index, "timestamp_ms": 1000 * index}],
+                    "pump_status": {"rate_mcg_per_kg_min": 0.07},
+                    "predictions": {"confidence": 0.8},
+                }
+            )
+            for index in range(count)
+        ),
+        encoding="utf-8",
+    )
+
+
+def test_converter_round_trips_envelopes(tmp_path: Path) -> None:
+    jsonl_path = tmp_path / "telemetry.jsonl"
+    _write_jsonl(jsonl_path, 300)
+    binary_path = tmp_path / "telemetry.binpb"
+
+    assert convert_jsonl_to_binary(jsonl_path, binary_path) == 300
+
+    decoded = [telemetry_pb2.TelemetryEnvelope.FromString(record) for record in iter_records(binary_path)]
+    assert decoded == list(_iter_fixture_events(jsonl_path))
+
+
+def test_reader_rejects_truncated_fixture(tmp_path: Path) -> None:
+    path = tmp_path / "telemetry.binpb"
+    with BinaryFixtureWriter(path) as writer:
+        writer.write(b"x" * 200)
+    path.write_bytes(path.read_bytes()[:100])
+
+    with pytest.raises(ValueError, match="Truncated record"):
+        list(iter_records(path))
+
+
+class _Servicer(telemetry_pb2_grpc.TelemetryIngestionServicer):
+    def __init__(self) -> None:
+        self.received = []
+        self.metadata = {}
+
+    def StreamTelemetry(self, request_iterator, context):
+        self.metadata = dict(context.invocation_metadata())
+        self.received.extend(request_iterator)
+        return telemetry_pb2.TelemetryAck(accepted=True)
+
+
+def test_binary_fixture_streams_pre_serialized_bytes_over_grpc(tmp_path: Path) -> None:
+    jsonl_path = tmp_path / "telemetry.jsonl"
+    _write_jsonl(jsonl_path, 20)
+    binary_path = tmp_path / "telemetry.binpb"
+    convert_jsonl_to_binary(jsonl_path, binary_path)
+
+    servicer = _Servicer()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    telemetry_pb2_grpc.add_TelemetryIngestionServicer_to_server(servicer, server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    try:
+        accepted = stream_fixture(fixture_path=binary_path, target=f"127.0.0.1:{port}", api_key="demo-key")
+    finally:
+        server.stop(grace=None)
+
+    assert accepted is True
+    assert [envelope.sequence for envelope in servicer.received] == list(range(1, 21))
+    assert servicer.received[3].vitals[0].value == 63.0
+    assert servicer.metadata["x-device-id"] == "pump-01"
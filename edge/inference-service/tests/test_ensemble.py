@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from edge_inference.config import OrtProfile
+from edge_inference.deploy_manifest import resolve_ensemble
+from edge_inference.ensemble import EnsembleMember, EnsembleRunner, aggregate
+from edge_inference.model_manager import ModelConfig, ModelManager
+
+
+class RecordingRunner:
+    built: dict = {}
+
+    def __init__(self, **kwargs):
+        RecordingRunner.built = kwargs
+        self.model_sha256 = kwargs["model_sha256"]
+
+    def warmup(self, runs):
+        return [1.0] * runs
+
+
+class FakeSession:
+    # Per-path forecast and delay, so each member behaves differently.
+    behaviour: dict = {}
+
+    def __init__(self, model_path, sess_options, providers) -> None:
+        self.forecast, self.delay_s = FakeSession.behaviour[model_path]
+        self.intra_op_num_threads = sess_options.intra_op_num_threads
+        self.terminated = threading.Event()
+
+    def run(self, output_names, inputs, run_options=None):
+        self.last_inputs = inputs
+        threading.Event().wait(self.delay_s)
+        if run_options is not None and run_options.terminate:
+            self.terminated.set()
+            raise RuntimeError("run terminated")
+        return [np.array([[self.forecast]], dtype=np.float32), np.array([0.8], dtype=np.float32)]
+
+
+def _ensemble(monkeypatch, behaviour, aggregator="mean", timeout_ms=50) -> EnsembleRunner:
+    FakeSession.behaviour = behaviour
+    monkeypatch.setattr("edge_inference.model_runner.ort.InferenceSession", FakeSession)
+    members = [EnsembleMember(name=path, path=path, sha256=path[0] * 64) for path in behaviour]
+    return EnsembleRunner(
+        members=members,
+        aggregator=aggregator,
+        inference_timeout_ms=timeout_ms,
+        ort_profile=OrtProfile(intra_op_num_threads=4),
+    )
+
+
+def test_aggregate_methods() -> None:
+    predictions = [np.array([60.0]), np.array([64.0]), np.array([80.0])]
+    confidences = [0.9, 0.9, 0.1]
+
+    mean, spread = aggregate(predictions, confidences, [1.0, 1.0, 1.0], "mean")
+    median, _ = aggregate(predictions, confidences, [1.0, 1.0, 1.0], "median")
+    weighted, _ = aggregate(predictions, confidences, [1.0, 1.0, 1.0], "confidence_weighted")
+
+    assert mean.tolist() == pytest.approx([68.0])
+    assert median.tolist() == [64.0]
+    assert weighted.tolist() == pytest.approx([(60.0 * 0.9 + 64.0 * 0.9 + 80.0 * 0.1) / 1.9])
+    assert spread == pytest.approx(float(np.std([60.0, 64.0, 80.0])))
+
+
+def test_ensemble_splits_threads_and_aggregates_members(monkeypatch) -> None:
+    runner = _ensemble(monkeypatch, {"a.onnx": (60.0, 0.0), "b.onnx": (64.0, 0.0)})
+
+    prediction, metadata = runner.run({"map": [65.0, 64.0]})
+
+    assert [session.intra_op_num_threads for _, session in runner._members] == [2, 2]
+    assert prediction.tolist() == [[62.0]]
+    assert metadata["ensemble_spread"] == pytest.approx(2.0)
+    assert metadata["confidence"] == pytest.approx(0.8 / (1.0 + 2.0 / 5.0))
+    assert metadata["ensemble_dropped"] == 0.0
+
+
+def test_ensemble_without_confidence_output_keeps_the_legacy_confidence_path(monkeypatch) -> None:
+    class LegacySession(FakeSession):
+        def run(self, output_names, inputs, run_options=None):
+            # Legacy single-output layout: forecast at [0, 0], confidence at [0, 1].
+            return [np.array([[self.forecast, 0.4]], dtype=np.float32)]
+
+    FakeSession.behaviour = {"a.onnx": (60.0, 0.0), "b.onnx": (64.0, 0.0)}
+    monkeypatch.setattr("edge_inference.model_runner.ort.InferenceSession", LegacySession)
+    runner = EnsembleRunner(
+        members=[EnsembleMember(name=path, path=path, sha256=path[0] * 64) for path in FakeSession.behaviour],
+        inference_timeout_ms=50,
+    )
+
+    prediction, metadata = runner.run({"map": [65.0, 64.0]})
+
+    assert "confidence" not in metadata
+    np.testing.assert_allclose(prediction, [[62.0, 0.4]], rtol=1e-6)
+    assert metadata["ensemble_spread"] == pytest.approx(2.0)
+
+
+def test_ensemble_drops_member_that_misses_the_deadline(monkeypatch) -> None:
+    runner = _ensemble(monkeypatch, {"a.onnx": (60.0, 0.0), "b.onnx": (90.0, 0.3)})
+
+    prediction, metadata = runner.run({"map": [65.0, 64.0]})
+
+    assert prediction.tolist() == [[60.0]]
+    assert metadata["ensemble_members"] == 1.0
+    assert metadata["ensemble_dropped"] == 1.0
+    assert "fallback_active" not in metadata
+    assert runner._members[1][1].terminated.wait(1.0)
+    assert runner.member_status()["members"]["b.onnx"]["dropped"] == 1
+
+
+def test_ensemble_falls_back_when_every_member_is_late(monkeypatch) -> None:
+    runner = _ensemble(monkeypatch, {"a.onnx": (60.0, 0.3), "b.onnx": (90.0, 0.3)}, timeout_ms=20)
+
+    prediction, metadata = runner.run({"map": [66.0, 64.0]})
+
+    assert prediction.tolist() == [62.0]
+    assert metadata["fallback_active"] == 1.0
+
+
+def test_ensemble_members_share_the_row_major_tensor(monkeypatch) -> None:
+    FakeSession.behaviour = {"a.onnx": (60.0, 0.0), "b.onnx": (64.0, 0.0)}
+    monkeypatch.setattr("edge_inference.model_runner.ort.InferenceSession", FakeSession)
+    runner = EnsembleRunner(
+        members=[EnsembleMember(name=path, path=path, sha256=path[0] * 64) for path in FakeSession.behaviour],
+        inference_timeout_ms=50,
+        input_layout="single_tensor_row_major",
+        feature_names=("map", "heart_rate"),
+    )
+
+    runner.run({"heart_rate": [80.0, 82.0], "map": [65.0, 64.0]})
+
+    for _, session in runner._members:
+        assert list(session.last_inputs) == ["input"]
+        assert session.last_inputs["input"].tolist() == [[65.0, 80.0], [64.0, 82.0]]
+
+
+def test_ensemble_warmup_rejects_members_with_different_output_shapes(monkeypatch) -> None:
+    class ShapedSession(FakeSession):
+        def get_inputs(self):
+            return []
+
+        def run(self, output_names, inputs, run_options=None):
+            # Member "b" forecasts two horizons; "a" forecasts one.
+            horizons = 2 if self.forecast > 62.0 else 1
+            return [np.full((1, horizons), self.forecast, dtype=np.float32), np.array([0.8], dtype=np.float32)]
+
+    FakeSession.behaviour = {"a.onnx": (60.0, 0.0), "b.onnx": (64.0, 0.0)}
+    monkeypatch.setattr("edge_inference.model_runner.ort.InferenceSession", ShapedSession)
+    runner = EnsembleRunner(
+        members=[EnsembleMember(name=path, path=path, sha256=path[0] * 64) for path in FakeSession.behaviour],
+        inference_timeout_ms=50,
+    )
+
+    with pytest.raises(RuntimeError, match="different output shapes"):
+        runner.warmup(1)
+
+
+def test_manager_builds_ensemble_from_manifest(tmp_path: Path) -> None:
+    payloads = {"a.onnx": b"member-a", "b.onnx": b"member-b"}
+    for name, payload in payloads.items():
+        (tmp_path / name).write_bytes(payload)
+    manifest = {
+        "model_binary": {"path": "a.onnx", "sha256": hashlib.sha256(b"member-a").hexdigest()},
+        "ensemble": {
+            "aggregator": "median",
+            "members": [
+                {"name": name, "path": name, "sha256": hashlib.sha256(payload).hexdigest(), "weight": 1.0}
+                for name, payload in payloads.items()
+            ],
+        },
+    }
+    manifest_path = tmp_path / "deploy_manifest.json"
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    config = ModelConfig(
+        model_path=Path("unused.onnx"),
+        manifest_path=manifest_path,
+        model_variant="base",
+        optimization_cache_dir=None,
+        inference_timeout_ms=150,
+        fallback_feature_name="map",
+        fallback_confidence=0.5,
+        fallback_value_range=(20.0, 200.0),
+        reload_poll_interval_s=0.0,
+        warmup_runs=1,
+        warmup_max_ms=10.0,
+        ort_profile=OrtProfile(),
+        max_concurrent_runs=1,
+        input_layout="named",
+        feature_names=(),
+        input_name="input",
+        ensemble_enabled=True,
+        ensemble_aggregator=None,
+        ensemble_spread_scale=5.0,
+    )
+
+    ModelManager(config, ensemble_factory=RecordingRunner)
+
+    built = RecordingRunner.built
+    assert [member.name for member in built["members"]] == ["a.onnx", "b.onnx"]
+    assert built["aggregator"] == "median"
+    assert built["model_path"] == str(tmp_path / "a.onnx")
+
+
+def test_resolve_ensemble_rejects_duplicate_member_names() -> None:
+    member = {"name": "a", "path": "a.onnx", "sha256": "a" * 64}
+
+    assert resolve_ensemble({}) is None
+    with pytest.raises(ValueError, match="unique"):
+        resolve_ensemble({"ensemble": {"members": [member, member]}})
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from edge_inference.inference_pool import InferencePool, InferencePoolSaturated, hold_slot
+
+
+async def _noop() -> None:
+    return None
+
+
+def test_pool_rejects_when_workers_and_queue_are_full() -> None:
+    pool = InferencePool(workers=1, max_queue=1, retry_after_s=2)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def wait() -> bool:
+            await release.wait()
+            return True
+
+        first = asyncio.ensure_future(pool.run_async(wait))
+        second = asyncio.ensure_future(pool.run_async(wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(InferencePoolSaturated) as excinfo:
+            await pool.run_async(_noop)
+        assert excinfo.value.retry_after_s == 2
+        release.set()
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(scenario()) == [True, True]
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["in_flight"] == 0
+    assert stats["max_in_flight"] == 2
+
+
+def test_pool_holds_slot_until_abandoned_call_finishes() -> None:
+    release = threading.Event()
+    pool = InferencePool(workers=1, max_queue=0)
+
+    async def abandon() -> str:
+        # Stands in for a run left executing past the deadline: the call returns, the work does not.
+        done = hold_slot()
+        threading.Thread(target=lambda: (release.wait(5.0), done())).start()
+        return "fallback"
+
+    async def ok() -> str:
+        return "ok"
+
+    async def scenario():
+        assert await pool.run_async(abandon) == "fallback"
+        with pytest.raises(InferencePoolSaturated):
+            await pool.run_async(_noop)
+        release.set()
+        await asyncio.sleep(0.05)
+        return await pool.run_async(ok)
+
+    assert asyncio.run(scenario()) == "ok"
+
+
+def test_cancelled_call_releases_its_slot() -> None:
+    pool = InferencePool(workers=1, max_queue=0)
+
+    async def scenario():
+        task = asyncio.ensure_future(pool.run_async(asyncio.sleep, 5.0))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return pool.stats()["in_flight"]
+
+    assert asyncio.run(scenario()) == 0
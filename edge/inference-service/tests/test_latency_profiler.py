@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import pytest
+
+from edge_inference.latency_profiler import _CURRENT, LatencyProfiler, StageStats, stage
+
+
+def test_stage_stats_rolling_percentiles_and_histogram() -> None:
+    stats = StageStats(window=100)
+    for value in range(1, 201):
+        stats.observe(value / 10)
+
+    snapshot = stats.snapshot()
+
+    assert snapshot["count"] == 200
+    assert snapshot["window"] == 100
+    # Percentiles only cover the most recent window (10.1 .. 20.0 ms).
+    assert snapshot["p50_ms"] == pytest.approx(15.05)
+    assert snapshot["p99_ms"] == pytest.approx(19.901)
+    assert snapshot["max_ms"] == pytest.approx(20.0)
+    assert sum(snapshot["histogram"]["counts"]) + snapshot["histogram"]["overflow"] == 200
+
+
+def test_profiler_collects_stages_and_derives_framework_time() -> None:
+    profiler = LatencyProfiler(window=16, enabled=True)
+    timings = profiler.begin()
+    token = _CURRENT.set(timings)
+    try:
+        with stage("handler"):
+            with stage("session_run"):
+                pass
+    finally:
+        _CURRENT.reset(token)
+    profiler.observe(timings, total_ms=timings["handler"] + 2.0)
+
+    stages = profiler.snapshot()["stages"]
+    assert set(stages) == {"framework", "handler", "session_run", "total"}
+    assert stages["framework"]["p50_ms"] == pytest.approx(2.0)
+
+
+def test_stage_is_noop_without_profiled_request() -> None:
+    with stage("session_run"):
+        pass
+    assert _CURRENT.get() is None
+    assert LatencyProfiler(window=4).begin() is None
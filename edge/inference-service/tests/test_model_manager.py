@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from edge_inference.config import OrtProfile, Settings
+from edge_inference.model_manager import ModelConfig, ModelManager
+from edge_inference.model_runner import ModelRunner
+
+
+class FakeRunner:
+    warmup_latency_ms = 1.0
+
+    def __init__(self, *, model_path, inference_timeout_ms, model_sha256, **options):
+        self.model_path = model_path
+        self.model_sha256 = model_sha256
+        self.options = options
+        self.closed = False
+
+    def warmup(self, runs):
+        return [self.warmup_latency_ms] * runs
+
+    def close(self):
+        self.closed = True
+
+
+def _write_bundle(deploy_dir: Path, payload: bytes, *, sha256: str | None = None, mtime_ns: int = 0) -> Path:
+    model_path = deploy_dir / "map_predictor.onnx"
+    model_path.write_bytes(payload)
+    manifest_path = deploy_dir / "deploy_manifest.json"
+    manifest = {
+        "model_binary": {
+            "path": model_path.name,
+            "sha256": sha256 or hashlib.sha256(payload).hexdigest(),
+            "size_bytes": len(payload),
+        }
+    }
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    if mtime_ns:
+        os.utime(manifest_path, ns=(mtime_ns, mtime_ns))
+    return manifest_path
+
+
+def _manager(manifest_path: Path, model_variant: str = "base", runner_factory=FakeRunner, **overrides) -> ModelManager:
+    config = ModelConfig(
+        model_path=Path("unused.onnx"),
+        manifest_path=manifest_path,
+        model_variant=model_variant,
+        optimization_cache_dir=None,
+        inference_timeout_ms=150,
+        fallback_feature_name="map",
+        fallback_confidence=0.5,
+        fallback_value_range=(20.0, 200.0),
+        reload_poll_interval_s=0.0,
+        warmup_runs=3,
+        warmup_max_ms=10.0,
+        ort_profile=OrtProfile(),
+        max_concurrent_runs=1,
+        input_layout="named",
+        feature_names=(),
+        input_name="input",
+        ensemble_enabled=True,
+        ensemble_aggregator=None,
+        ensemble_spread_scale=5.0,
+    )
+    return ModelManager(replace(config, **overrides), runner_factory=runner_factory)
+
+
+def test_initial_load_rejects_sha_mismatch(tmp_path: Path) -> None:
+    manifest_path = _write_bundle(tmp_path, b"model-v1", sha256="f" * 64)
+
+    with pytest.raises(RuntimeError, match="does not match manifest"):
+        _manager(manifest_path)
+
+
+def test_reload_swaps_verified_model(tmp_path: Path) -> None:
+    manifest_path = _write_bundle(tmp_path, b"model-v1", mtime_ns=1_000_000_000)
+    manager = _manager(manifest_path)
+    first = manager.current
+
+    _write_bundle(tmp_path, b"model-v2", mtime_ns=2_000_000_000)
+
+    assert manager.check_for_update() is True
+    assert manager.current.model_sha256 == hashlib.sha256(b"model-v2").hexdigest()
+    assert first.closed is True
+    assert manager.status()["reload_count"] == 1
+
+
+def test_reload_closes_a_leased_runner_when_its_last_lease_ends(tmp_path: Path) -> None:
+    manifest_path = _write_bundle(tmp_path, b"model-v1", mtime_ns=1_000_000_000)
+    manager = _manager(manifest_path)
+
+    with manager.lease() as first, manager.lease():
+        _write_bundle(tmp_path, b"model-v2", mtime_ns=2_000_000_000)
+        assert manager.check_for_update() is True
+        assert first.closed is False
+    assert first.closed is True
+    with manager.lease() as second:
+        assert second is manager.current
+    assert second.closed is False
+
+
+class DelayedSession:
+    delay_s = 0.05
+
+    def __init__(self, model_path, sess_options, providers) -> None:
+        pass
+
+    def get_inputs(self):
+        return [type("Input", (), {"name": "map", "shape": [2]})()]
+
+    def run(self, output_names, inputs, run_options=None):
+        threading.Event().wait(self.delay_s)
+        return [np.array([[66.0]], dtype=np.float32), np.array([0.9], dtype=np.float32)]
+
+
+def test_reload_lets_in_flight_runs_finish_on_the_previous_model(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr("edge_inference.model_runner.ort.InferenceSession", DelayedSession)
+    manifest_path = _write_bundle(tmp_path, b"model-v1", mtime_ns=1_000_000_000)
+    manager = _manager(
+        manifest_path, runner_factory=ModelRunner, inference_timeout_ms=5000, warmup_runs=1, warmup_max_ms=1000.0
+    )
+    first = manager.current
+    leased = threading.Barrier(6)
+    swapped = threading.Event()
+    results, errors = [], []
+
+    def request(wait_for_swap: bool) -> None:
+        with manager.lease() as runner:
+            leased.wait()
+            if wait_for_swap:
+                swapped.wait()
+            try:
+                results.append(runner.run({"map": [65.0, 64.0]}))
+            except Exception as exc:  # noqa: BLE001 - collected for the assertion below
+                errors.append(exc)
+
+    # Four runs queue behind max_concurrent_runs=1; the fifth reaches the runner only after the swap.
+    threads = [threading.Thread(target=request, args=(index == 4,)) for index in range(5)]
+    for thread in threads:
+        thread.start()
+    leased.wait()
+    _write_bundle(tmp_path, b"model-v2", mtime_ns=2_000_000_000)
+    assert manager.check_for_update() is True
+    assert first._executor._shutdown is False
+    swapped.set()
+    for thread in threads:
+        thread.join(timeout=5.0)
+
+    assert errors == []
+    assert [prediction.tolist() for prediction, _ in results] == [[[66.0]]] * 5
+    assert not any(metadata.get("fallback_active") for _, metadata in results)
+    assert first._executor._shutdown is True
+    assert manager.current is not first
+
+
+def test_reload_keeps_active_model_when_warmup_is_too_slow(tmp_path: Path, monkeypatch) -> None:
+    manifest_path = _write_bundle(tmp_path, b"model-v1", mtime_ns=1_000_000_000)
+    manager = _manager(manifest_path)
+    first = manager.current
+
+    monkeypatch.setattr(FakeRunner, "warmup_latency_ms", 50.0)
+    _write_bundle(tmp_path, b"model-v2", mtime_ns=2_000_000_000)
+
+    assert manager.check_for_update() is False
+    assert manager.current is first
+    assert manager.status()["rejected_count"] == 1
+    assert "exceeds budget" in manager.status()["last_error"]
+
+
+def test_reload_rejects_tampered_binary(tmp_path: Path) -> None:
+    manifest_path = _write_bundle(tmp_path, b"model-v1", mtime_ns=1_000_000_000)
+    manager = _manager(manifest_path)
+
+    _write_bundle(tmp_path, b"model-v2", sha256="e" * 64, mtime_ns=2_000_000_000)
+
+    assert manager.check_for_update() is False
+    assert manager.current.model_sha256 == hashlib.sha256(b"model-v1").hexdigest()
+
+
+def test_rejected_reload_is_retried_once_the_binary_matches(tmp_path: Path) -> None:
+    manifest_path = _write_bundle(tmp_path, b"model-v1", mtime_ns=1_000_000_000)
+    manager = _manager(manifest_path)
+
+    # The manifest lands before the binary has finished copying.
+    _write_bundle(tmp_path, b"model-v2", mtime_ns=2_000_000_000)
+    (tmp_path / "map_predictor.onnx").write_bytes(b"model-")
+    assert manager.check_for_update() is False
+
+    (tmp_path / "map_predictor.onnx").write_bytes(b"model-v2")
+    assert manager.check_for_update() is True
+    assert manager.current.model_sha256 == hashlib.sha256(b"model-v2").hexdigest()
+    assert manager.check_for_update() is False
+
+
+def test_manager_loads_configured_variant(tmp_path: Path) -> None:
+    manifest_path = _write_bundle(tmp_path, b"model-v1")
+    variant_payload = b"model-v1-optimized"
+    (tmp_path / "map_predictor.optimized.onnx").write_bytes(variant_payload)
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    manifest["model_variants"] = {
+        "optimized": {
+            "status": "ok",
+            "path": "map_predictor.optimized.onnx",
+            "sha256": hashlib.sha256(variant_payload).hexdigest(),
+            "pre_optimized": True,
+        },
+        "int8": {"status": "unavailable", "error": "unsupported operators"},
+    }
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+
+    manager = _manager(manifest_path, model_variant="optimized")
+
+    assert manager.current.model_path.endswith("map_predictor.optimized.onnx")
+    assert manager.current.options["pre_optimized"] is True
+    with pytest.raises(ValueError, match="'int8' model variant"):
+        _manager(manifest_path, model_variant="int8")
+
+
+def test_input_layout_reaches_primary_and_shadow_runners(tmp_path: Path) -> None:
+    shadow_path = tmp_path / "shadow.onnx"
+    shadow_path.write_bytes(b"shadow")
+    settings = Settings(
+        model_path=tmp_path / "unused.onnx",
+        feature_input_layout="single_tensor_row_major",
+        required_feature_names=["map", "heart_rate"],
+        feature_input_name="features",
+    )
+
+    shadow = ModelManager(ModelConfig.from_settings(settings).for_shadow(shadow_path), runner_factory=FakeRunner)
+
+    assert shadow.current.options["input_layout"] == "single_tensor_row_major"
+    assert shadow.current.options["feature_names"] == ("map", "heart_rate")
+    assert shadow.current.options["input_name"] == "features"
+    with pytest.raises(ValueError, match="requires required_feature_names"):
+        Settings(feature_input_layout="single_tensor_row_major")
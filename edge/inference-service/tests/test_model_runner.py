@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+
+import numpy as np
+import onnxruntime as ort
+import pytest
+
+from edge_inference import latency_profiler
+from edge_inference.inference_pool import InferencePool, InferencePoolSaturated
+from edge_inference.model_runner import ModelRunner
+
+SHA = "c" * 64
+
+
+class FakeSession:
+    delay_s = 0.0
+    loaded_paths: list = []
+
+    def __init__(self, model_path, sess_options, providers) -> None:
+        self.terminated = threading.Event()
+        self.optimization_level = sess_options.graph_optimization_level
+        self.profiling = sess_options.enable_profiling
+        self.runs = 0
+        FakeSession.loaded_paths.append(model_path)
+        if sess_options.optimized_model_filepath:
+            Path(sess_options.optimized_model_filepath).write_bytes(b"optimized")
+
+    def run(self, output_names, inputs, run_options):
+        self.last_inputs = inputs
+        deadline = threading.Event()
+        deadline.wait(self.delay_s)
+        if run_options.terminate:
+            self.terminated.set()
+            raise RuntimeError("run terminated")
+        self.runs += 1
+        return [np.array([[66.0]], dtype=np.float32), np.array([0.9], dtype=np.float32)]
+
+    def end_profiling(self):
+        return "trace.json"
+
+
+def _runner(monkeypatch, delay_s: float) -> ModelRunner:
+    FakeSession.delay_s = delay_s
+    monkeypatch.setattr("edge_inference.model_runner.ort.InferenceSession", FakeSession)
+    return ModelRunner(model_path="dummy.onnx", inference_timeout_ms=20, model_sha256=SHA)
+
+
+def test_run_returns_model_output_within_deadline(monkeypatch) -> None:
+    runner = _runner(monkeypatch, delay_s=0.0)
+
+    prediction, metadata = runner.run({"map": [65.0, 64.0]})
+
+    assert prediction.tolist() == [[66.0]]
+    assert metadata["confidence"] == pytest.approx(0.9)
+    assert "fallback_active" not in metadata
+
+
+def test_run_extrapolates_map_window_when_deadline_missed(monkeypatch) -> None:
+    runner = _runner(monkeypatch, delay_s=0.2)
+
+    prediction, metadata = runner.run({"map": [66.0, 64.0], "heart_rate": [80.0, 82.0]})
+
+    assert prediction.tolist() == [62.0]
+    assert metadata["fallback_active"] == 1.0
+    assert metadata["confidence"] == 0.5
+    assert metadata["inference_ms"] < 200.0
+    assert runner._session.terminated.wait(1.0)
+
+
+def test_run_uses_last_good_output_without_map_window(monkeypatch) -> None:
+    runner = _runner(monkeypatch, delay_s=0.0)
+    runner.run({"heart_rate": [80.0]})
+
+    FakeSession.delay_s = 0.2
+    prediction, metadata = runner.run({"heart_rate": [81.0]})
+
+    assert prediction.tolist() == [[66.0]]
+    assert metadata["fallback_active"] == 1.0
+
+
+def test_run_degrades_without_raising_when_no_fallback_is_available(monkeypatch) -> None:
+    runner = _runner(monkeypatch, delay_s=0.2)
+
+    prediction, metadata = runner.run({"heart_rate": [80.0]})
+
+    assert prediction.shape == (1,)
+    assert np.isnan(prediction).all()
+    assert metadata["degraded"] == 1.0
+    assert metadata["fallback_active"] == 1.0
+    assert metadata["confidence"] == 0.0
+
+
+class HorizonSession(FakeSession):
+    def get_outputs(self):
+        return [type("Output", (), {"shape": ["batch", 3]})()]
+
+
+def test_fallback_extrapolates_across_the_declared_horizon(monkeypatch) -> None:
+    HorizonSession.delay_s = 0.2
+    monkeypatch.setattr("edge_inference.model_runner.ort.InferenceSession", HorizonSession)
+    runner = ModelRunner(model_path="dummy.onnx", inference_timeout_ms=20, model_sha256=SHA)
+
+    prediction, metadata = runner.run({"map": [66.0, 64.0]})
+
+    assert prediction.tolist() == [[62.0, 60.0, 58.0]]
+    assert metadata["fallback_active"] == 1.0
+
+
+def test_fallback_extrapolation_is_clamped_to_the_value_range(monkeypatch) -> None:
+    HorizonSession.delay_s = 0.2
+    monkeypatch.setattr("edge_inference.model_runner.ort.InferenceSession", HorizonSession)
+    runner = ModelRunner(
+        model_path="dummy.onnx", inference_timeout_ms=20, model_sha256=SHA, fallback_value_range=(40.0, 80.0)
+    )
+
+    falling, _ = runner.run({"map": [70.0, 45.0]})
+    rising, _ = runner.run({"map": [60.0, 75.0]})
+
+    assert falling.tolist() == [[40.0, 40.0, 40.0]]
+    assert rising.tolist() == [[80.0, 80.0, 80.0]]
+
+
+def test_fallback_takes_the_shape_of_the_last_real_output(monkeypatch) -> None:
+    runner = _runner(monkeypatch, delay_s=0.0)
+    runner.run({"map": [65.0]})
+
+    FakeSession.delay_s = 0.2
+    prediction, _ = runner.run({"map": [66.0, 64.0]})
+
+    assert prediction.tolist() == [[62.0]]
+
+
+def test_abandoned_run_keeps_its_pool_slot_until_it_returns(monkeypatch) -> None:
+    runner = _runner(monkeypatch, delay_s=0.3)
+    pool = InferencePool(workers=1, max_queue=0)
+
+    async def scenario():
+        _, metadata = await pool.run_async(runner.run_async, {"map": [66.0, 64.0]})
+        in_flight_after_fallback = pool.stats()["in_flight"]
+        with pytest.raises(InferencePoolSaturated):
+            await pool.run_async(runner.run_async, {"map": [66.0, 64.0]})
+        assert runner._session.terminated.wait(1.0)
+        await asyncio.sleep(0.05)
+        return metadata, in_flight_after_fallback, pool.stats()["in_flight"]
+
+    metadata, held, released = asyncio.run(scenario())
+    assert metadata["fallback_active"] == 1.0
+    assert (held, released) == (1, 0)
+
+
+def test_optimization_cache_is_written_once_and_reused(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr("edge_inference.model_runner.ort.InferenceSession", FakeSession)
+    FakeSession.loaded_paths = []
+    cache_dir = tmp_path / "ort-cache"
+
+    first = ModelRunner("model.onnx", 20, SHA, optimization_cache_dir=cache_dir)
+    second = ModelRunner("model.onnx", 20, SHA, optimization_cache_dir=cache_dir)
+
+    cached_files = list(cache_dir.iterdir())
+    assert [path.name for path in cached_files] == [f"{SHA}.ort-{ort.__version__}.onnx"]
+    assert FakeSession.loaded_paths == ["model.onnx", str(cached_files[0])]
+    assert second._session.optimization_level == ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+    assert first._session.optimization_level != ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+
+
+def test_trace_routes_requested_runs_through_profiling_session(monkeypatch, tmp_path: Path) -> None:
+    runner = _runner(monkeypatch, delay_s=0.0)
+
+    runner.start_trace(2, tmp_path)
+    trace_session = runner._trace_session
+    for _ in range(3):
+        runner.run({"map": [65.0]})
+
+    assert trace_session.profiling is True
+    assert trace_session.runs == 2
+    assert runner._session.runs == 1
+    assert runner.trace_status() == {"active": False, "remaining_requests": 0, "last_trace_path": "trace.json"}
+
+
+def test_row_major_layout_stacks_features_in_contract_order(monkeypatch) -> None:
+    FakeSession.delay_s = 0.0
+    monkeypatch.setattr("edge_inference.model_runner.ort.InferenceSession", FakeSession)
+    runner = ModelRunner(
+        model_path="dummy.onnx",
+        inference_timeout_ms=20,
+        model_sha256=SHA,
+        input_layout="single_tensor_row_major",
+        feature_names=("map", "heart_rate"),
+    )
+
+    runner.run({"heart_rate": [80.0, 82.0], "map": [65.0, 64.0]})
+
+    (name, tensor), = runner._session.last_inputs.items()
+    assert name == "input"
+    assert tensor.dtype == np.float32
+    assert tensor.tolist() == [[65.0, 80.0], [64.0, 82.0]]
+    with pytest.raises(ValueError, match="requires feature_names"):
+        ModelRunner(model_path="dummy.onnx", inference_timeout_ms=20, model_sha256=SHA, input_layout="single_tensor_row_major")
+
+
+def test_row_major_fallback_extrapolates_the_named_map_window(monkeypatch) -> None:
+    FakeSession.delay_s = 0.2
+    monkeypatch.setattr("edge_inference.model_runner.ort.InferenceSession", FakeSession)
+    runner = ModelRunner(
+        model_path="dummy.onnx",
+        inference_timeout_ms=20,
+        model_sha256=SHA,
+        input_layout="single_tensor_row_major",
+        feature_names=("map", "heart_rate"),
+    )
+
+    prediction, metadata = runner.run({"heart_rate": [80.0, 82.0], "map": [66.0, 64.0]})
+
+    assert prediction.tolist() == [62.0]
+    assert metadata["fallback_active"] == 1.0
+
+
+def test_run_async_awaits_the_session_without_a_pool_worker(monkeypatch) -> None:
+    runner = _runner(monkeypatch, delay_s=0.0)
+    pool = InferencePool(workers=1, max_queue=0)
+
+    async def scenario():
+        timings: dict = {}
+        token = latency_profiler._CURRENT.set(timings)
+        try:
+            return await pool.run_async(runner.run_async, {"map": [65.0]}), timings
+        finally:
+            latency_profiler._CURRENT.reset(token)
+
+    (prediction, metadata), timings = asyncio.run(scenario())
+
+    assert prediction.tolist() == [[66.0]]
+    assert metadata["confidence"] == pytest.approx(0.9)
+    assert {"tensor_convert", "pool_wait", "session_run"} <= set(timings)
+    assert pool.stats()["completed"] == 1
+    assert pool.stats()["in_flight"] == 0
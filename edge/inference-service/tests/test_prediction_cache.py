@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import numpy as np
+
+from edge_inference.prediction_cache import PredictionCache, feature_tensor_digest
+
+SHA_A = "a" * 64
+SHA_B = "b" * 64
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_feature_tensor_digest_is_order_independent_and_value_sensitive() -> None:
+    left = feature_tensor_digest({"map": [65.0, 64.0], "hr": [80.0, 81.0]})
+    right = feature_tensor_digest({"hr": [80.0, 81.0], "map": [65.0, 64.0]})
+    changed = feature_tensor_digest({"hr": [80.0, 81.0], "map": [65.0, 63.0]})
+
+    assert left == right
+    assert left != changed
+
+
+def test_cache_hit_miss_and_ttl_expiry() -> None:
+    clock = FakeClock()
+    cache = PredictionCache(max_entries=4, ttl_s=5.0, clock=clock)
+    key = cache.key_for({"map": [65.0]}, SHA_A)
+
+    assert cache.get(key) is None
+    cache.put(key, np.array([[64.0, 0.8]]), {"inference_ms": 3.0, "confidence": 0.8})
+
+    prediction, metadata = cache.get(key)
+    assert prediction.tolist() == [[64.0, 0.8]]
+    assert metadata["confidence"] == 0.8
+
+    clock.now = 6.0
+    assert cache.get(key) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache = PredictionCache(max_entries=2, ttl_s=60.0)
+    keys = [cache.key_for({"map": [float(value)]}, SHA_A) for value in range(3)]
+
+    cache.put(keys[0], np.array([1.0]), {})
+    cache.put(keys[1], np.array([2.0]), {})
+    cache.get(keys[0])
+    cache.put(keys[2], np.array([3.0]), {})
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_invalidates_when_model_changes() -> None:
+    cache = PredictionCache(max_entries=4, ttl_s=60.0)
+    features = {"map": [65.0]}
+    cache.put(cache.key_for(features, SHA_A), np.array([1.0]), {})
+
+    assert cache.get(cache.key_for(features, SHA_B)) is None
+    assert cache.get(cache.key_for(features, SHA_A)) is None
+    assert cache.stats()["invalidations"] == 1
@@ -5,7 +5,13 @@ from pathlib import Path
 
 import pytest
 
-from edge_inference.replay_fixture import stream_fixture
+from edge_inference.replay_fixture import (
+    index_path_for,
+    load_api_key_file,
+    replay_partitioned,
+    stream_fixture,
+    write_fixture_index,
+)
 
 
 def test_stream_fixture_sends_events(monkeypatch, tmp_path: Path) -> None:
@@ -227,3 +233,144 @@ def test_stream_fixture_tls_requires_ca(tmp_path: Path) -> None:
             api_key="demo-key",
             tls_enabled=True,
         )
+
+
+def _write_events(fixture_path: Path, device_ids: list[str]) -> None:
+    fixture_path.write_text(
+        "\n".join(
+            json.dumps(
+                {
+                    "session_id": f"s-{device_id}",
+                    "device_id": device_id,
+                    "sequence": index + 1,
+                    "vitals": [{"name": "map", "value": 64.0, "timestamp_ms": 1000 * index}],
+                }
+            )
+            for index, device_id in enumerate(device_ids)
+        ),
+        encoding="utf-8",
+    )
+
+
+def _capture_stream(monkeypatch) -> dict:
+    captured = {}
+
+    class FakeAck:
+        accepted = True
+
+    class FakeChannel:
+        def close(self) -> None:
+            captured["closed"] = True
+
+    class FakeStub:
+        def StreamTelemetry(self, iterator, metadata, timeout):
+            captured["metadata"] = metadata
+            captured["events"] = list(iterator)
+            return FakeAck()
+
+    monkeypatch.setattr("edge_inference.replay_fixture.grpc.insecure_channel", lambda _: FakeChannel())
+    monkeypatch.setattr("edge_inference.replay_fixture.telemetry_pb2_grpc.TelemetryIngestionStub", lambda _: FakeStub())
+    return captured
+
+
+def test_stream_fixture_streams_more_events_than_prefetch_in_order(monkeypatch, tmp_path: Path) -> None:
+    fixture_path = tmp_path / "telemetry.jsonl"
+    _write_events(fixture_path, ["pump-01"] * 50)
+    captured = _capture_stream(monkeypatch)
+
+    accepted = stream_fixture(fixture_path=fixture_path, target="localhost:50051", api_key="demo-key", prefetch=4)
+
+    assert accepted is True
+    assert [event.sequence for event in captured["events"]] == list(range(1, 51))
+    assert captured["metadata"] == (("x-api-key", "demo-key"), ("x-device-id", "pump-01"))
+
+
+def test_stream_fixture_uses_index_sidecar_until_fixture_changes(monkeypatch, tmp_path: Path) -> None:
+    fixture_path = tmp_path / "telemetry.jsonl"
+    _write_events(fixture_path, ["pump-01", "pump-02"])
+    index = json.loads(write_fixture_index(fixture_path).read_text(encoding="utf-8"))
+    assert index["device_ids"] == ["pump-01", "pump-02"]
+    assert index["events"] == 2
+
+    captured = _capture_stream(monkeypatch)
+    stream_fixture(fixture_path=fixture_path, target="localhost:50051", api_key="demo-key")
+    assert captured["metadata"] == (("x-api-key", "demo-key"),)
+
+    # A stale sidecar is ignored and the fixture is pre-scanned instead.
+    _write_events(fixture_path, ["pump-03", "pump-03", "pump-03"])
+    assert index_path_for(fixture_path).exists()
+    stream_fixture(fixture_path=fixture_path, target="localhost:50051", api_key="demo-key")
+    assert captured["metadata"] == (("x-api-key", "demo-key"), ("x-device-id", "pump-03"))
+
+
+def test_stream_fixture_surfaces_decode_errors(monkeypatch, tmp_path: Path) -> None:
+    fixture_path = tmp_path / "telemetry.jsonl"
+    _write_events(fixture_path, ["pump-01"])
+    with fixture_path.open("a", encoding="utf-8") as handle:
+        handle.write('\n{"device_id": "pump-01", "session_id": \n')
+    _capture_stream(monkeypatch)
+
+    with pytest.raises(ValueError, match="Invalid JSON on line 2"):
+        stream_fixture(fixture_path=fixture_path, target="localhost:50051", api_key="demo-key")
+
+
+def test_replay_partitioned_uses_per_device_keys_and_keeps_session_order(monkeypatch, tmp_path: Path) -> None:
+    fixture_path = tmp_path / "telemetry.jsonl"
+    fixture_path.write_text(
+        "\n".join(
+            json.dumps({"session_id": session_id, "device_id": device_id, "sequence": sequence})
+            for session_id, device_id, sequence in [
+                ("s-1", "pump-01", 1),
+                ("s-2", "pump-02", 1),
+                ("s-1", "pump-01", 2),
+                ("s-3", "pump-01", 1),
+                ("s-2", "pump-02", 2),
+                ("s-1", "pump-01", 3),
+            ]
+        ),
+        encoding="utf-8",
+    )
+    key_file = tmp_path / "keys.json"
+    key_file.write_text(json.dumps({"pump-01": "key-01", "pump-02": "key-02"}), encoding="utf-8")
+    streams = []
+
+    class FakeAck:
+        accepted = True
+
+    class FakeChannel:
+        def close(self) -> None:
+            pass
+
+    class FakeStub:
+        def StreamTelemetry(self, iterator, metadata, timeout):
+            streams.append((dict(metadata), [(event.session_id, event.sequence) for event in iterator]))
+            return FakeAck()
+
+    monkeypatch.setattr("edge_inference.replay_fixture.grpc.insecure_channel", lambda _: FakeChannel())
+    monkeypatch.setattr("edge_inference.replay_fixture.telemetry_pb2_grpc.TelemetryIngestionStub", lambda _: FakeStub())
+
+    results = replay_partitioned(
+        fixture_path=fixture_path,
+        target="localhost:50051",
+        partition_by="session",
+        concurrency=3,
+        api_keys=load_api_key_file(key_file),
+    )
+
+    assert [(result.partition, result.events, result.accepted) for result in results] == [
+        ("s-1", 3, True),
+        ("s-2", 2, True),
+        ("s-3", 1, True),
+    ]
+    by_session = {events[0][0]: (metadata, events) for metadata, events in streams}
+    assert by_session["s-1"][1] == [("s-1", 1), ("s-1", 2), ("s-1", 3)]
+    assert by_session["s-1"][0] == {"x-api-key": "key-01", "x-device-id": "pump-01"}
+    assert by_session["s-2"][0] == {"x-api-key": "key-02", "x-device-id": "pump-02"}
+
+
+def test_replay_partitioned_requires_a_key_for_every_device(tmp_path: Path) -> None:
+    fixture_path = tmp_path / "telemetry.jsonl"
+    _write_events(fixture_path, ["pump-01", "pump-02"])
+
+    with pytest.raises(ValueError, match="No API key for devices: pump-02"):
+        replay_partitioned(fixture_path=fixture_path, target="localhost:50051", api_keys={"pump-01": "key-01"})
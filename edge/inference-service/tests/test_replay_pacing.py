@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import pytest
+
+from edge_inference.ingestion_proto import telemetry_pb2
+from edge_inference.replay_pacing import ReplayPacer
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _envelopes(*timestamps_ms):
+    return [
+        telemetry_pb2.TelemetryEnvelope(
+            session_id="s-1",
+            device_id="pump-01",
+            sequence=index + 1,
+            vitals=[telemetry_pb2.VitalReading(name="map", value=64.0, timestamp_ms=ts)] if ts is not None else [],
+        )
+        for index, ts in enumerate(timestamps_ms)
+    ]
+
+
+def _pacer(clock: FakeClock, **options) -> ReplayPacer:
+    return ReplayPacer(clock=clock, sleep=clock.sleep, **options)
+
+
+def test_accelerated_pacing_compresses_vitals_time() -> None:
+    clock = FakeClock()
+    pacer = _pacer(clock, mode="accelerated", speed=10.0)
+
+    sent = [envelope.sequence for envelope in pacer.pace(_envelopes(0, 60_000, 120_000, None))]
+
+    assert sent == [1, 2, 3, 4]
+    assert clock.sleeps == pytest.approx([6.0, 6.0])
+    report = pacer.report()
+    assert report["target_span_s"] == pytest.approx(12.0)
+    assert report["achieved_rate_per_s"] == pytest.approx(4 / 12.0)
+    assert report["lag_ms"]["max_ms"] == 0.0
+
+
+def test_max_speed_never_sleeps() -> None:
+    clock = FakeClock()
+    pacer = _pacer(clock, mode="max")
+
+    assert len(list(pacer.pace(_envelopes(0, 60_000)))) == 2
+    assert clock.sleeps == []
+    assert pacer.report()["speed"] is None
+
+
+def test_lag_is_measured_when_sender_falls_behind() -> None:
+    clock = FakeClock()
+    pacer = _pacer(clock, mode="realtime")
+
+    for envelope in pacer.pace(_envelopes(0, 1_000, 2_000)):
+        clock.now += 1.5  # each send takes longer than the 1 s cadence
+
+    assert pacer.report()["lag_ms"]["max_ms"] == pytest.approx(1000.0)
+
+
+def test_shared_origin_and_seeded_jitter_are_reproducible() -> None:
+    def sleeps(seed: int):
+        clock = FakeClock()
+        pacer = _pacer(clock, mode="realtime", jitter="uniform", jitter_ms=200.0, seed=seed)
+        pacer.set_origin(0)
+        list(pacer.pace(_envelopes(5_000, 6_000)))
+        return clock.sleeps
+
+    first = sleeps(7)
+    assert first == sleeps(7)
+    assert 4.8 <= first[0] <= 5.2
+
+
+def test_rejects_unknown_mode_and_non_positive_speed() -> None:
+    with pytest.raises(ValueError, match="pace mode"):
+        ReplayPacer(mode="warp")
+    with pytest.raises(ValueError, match="positive"):
+        ReplayPacer(mode="accelerated", speed=0.0)
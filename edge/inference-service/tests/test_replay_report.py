@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import time
+from concurrent import futures
+from pathlib import Path
+
+import grpc
+import pytest
+
+from edge_inference.ingestion_proto import telemetry_pb2, telemetry_pb2_grpc
+from edge_inference.replay_fixture import replay_partitioned, stream_fixture
+from edge_inference.replay_report import ReplayRecorder, envelope_key, write_report
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _envelope(sequence: int) -> telemetry_pb2.TelemetryEnvelope:
+    return telemetry_pb2.TelemetryEnvelope(session_id="s-1", device_id="pump-01", sequence=sequence)
+
+
+def test_recorder_buckets_throughput_and_matches_arrivals() -> None:
+    clock = FakeClock()
+    recorder = ReplayRecorder(track_latency=True, clock=clock)
+    envelopes = [_envelope(sequence) for sequence in range(1, 5)]
+
+    for index, envelope in enumerate(recorder.observe(envelopes, lambda e: e.ByteSize(), envelope_key)):
+        recorder.record_arrival(envelope_key(envelope), clock.now + 0.002 * (index + 1))
+        clock.now += 0.6
+
+    report = recorder.report()
+    assert report["totals"]["envelopes"] == 4
+    assert report["totals"]["bytes_sent"] == sum(envelope.ByteSize() for envelope in envelopes)
+    assert report["throughput"]["envelopes"] == [2, 2]
+    assert report["end_to_end_latency_ms"]["matched"] == 4
+    assert report["end_to_end_latency_ms"]["max_ms"] == pytest.approx(8.0, abs=1e-3)
+    assert report["slo"]["status"] == "PASS"
+
+
+def test_missing_arrivals_fail_the_slo() -> None:
+    recorder = ReplayRecorder(track_latency=True, clock=FakeClock())
+    sent = list(recorder.observe([_envelope(1), _envelope(2)], lambda e: e.ByteSize(), envelope_key))
+    recorder.record_arrival(envelope_key(sent[0]), 1_700_000_000.1)
+
+    report = recorder.report(slo_ms=500.0)
+
+    assert report["end_to_end_latency_ms"]["missing"] == 1
+    assert report["slo"]["p99_ms"] == pytest.approx(100.0, abs=1e-3)
+    assert report["slo"]["status"] == "FAIL"
+
+
+def test_recorder_without_tap_reports_latency_as_not_measured() -> None:
+    recorder = ReplayRecorder()
+    list(recorder.observe([_envelope(1)], lambda e: e.ByteSize(), envelope_key))
+
+    report = recorder.report()
+
+    assert report["end_to_end_latency_ms"] is None
+    assert report["slo"]["status"] == "NOT_MEASURED"
+
+
+class _TopicStandIn(telemetry_pb2_grpc.TelemetryIngestionServicer):
+    """Ingestion stand-in that 'publishes' each envelope straight to the tap."""
+
+    def __init__(self, recorder: ReplayRecorder) -> None:
+        self._recorder = recorder
+
+    def StreamTelemetry(self, request_iterator, context):
+        for envelope in request_iterator:
+            self._recorder.record_arrival(envelope_key(envelope), time.time())
+        return telemetry_pb2.TelemetryAck(accepted=True)
+
+
+def test_partitioned_replay_report_against_stand_in(tmp_path: Path) -> None:
+    fixture_path = tmp_path / "telemetry.jsonl"
+    fixture_path.write_text(
+        "\n".join(
+            json.dumps({"session_id": f"s-{index % 3}", "device_id": f"pump-{index % 3}", "sequence": index})
+            for index in range(1, 31)
+        ),
+        encoding="utf-8",
+    )
+    recorder = ReplayRecorder(track_latency=True)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    telemetry_pb2_grpc.add_TelemetryIngestionServicer_to_server(_TopicStandIn(recorder), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    try:
+        replay_partitioned(
+            fixture_path=fixture_path,
+            target=f"127.0.0.1:{port}",
+            default_api_key="demo-key",
+            concurrency=3,
+            recorder=recorder,
+        )
+    finally:
+        server.stop(grace=None)
+
+    report_path = tmp_path / "reports" / "replay.json"
+    write_report(recorder.report(fixture=str(fixture_path)), report_path)
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+
+    assert report["fixture"] == str(fixture_path)
+    assert report["totals"]["envelopes"] == 30
+    assert sorted(stream["device_id"] for stream in report["streams"]) == ["pump-0", "pump-1", "pump-2"]
+    assert report["failures"] == 0
+    assert report["end_to_end_latency_ms"]["matched"] == 30
+    assert report["slo"]["status"] == "PASS"
+
+
+def test_stream_fixture_records_the_decode_error(tmp_path: Path) -> None:
+    fixture_path = tmp_path / "telemetry.jsonl"
+    fixture_path.write_text(
+        json.dumps({"session_id": "s-1", "device_id": "pump-01", "sequence": 1})
+        + '\n{"session_id": "s-1", "device_id": "pump-01", "sequence": 2,\n',
+        encoding="utf-8",
+    )
+    recorder = ReplayRecorder()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    telemetry_pb2_grpc.add_TelemetryIngestionServicer_to_server(_TopicStandIn(recorder), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    try:
+        with pytest.raises(ValueError, match="Invalid JSON"):
+            stream_fixture(fixture_path=fixture_path, target=f"127.0.0.1:{port}", api_key="demo-key", recorder=recorder)
+    finally:
+        server.stop(grace=None)
+
+    report = recorder.report()
+    assert report["failures"] == 1
+    assert report["streams"][0]["accepted"] is False
+    assert report["streams"][0]["error"] == "Invalid JSON on line 2"
+    # No tap, so latency is unmeasured, but a failed stream still fails the SLO.
+    assert report["slo"]["status"] == "FAIL"
@@ -1,26 +1,58 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
+
 import numpy as np
+import pytest
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
 
 from edge_inference.config import Settings
-from edge_inference.service import app, get_model_runner, get_settings, get_telemetry_client
+from edge_inference.inference_pool import InferencePoolSaturated
+from edge_inference.prediction_cache import PredictionCache
+from edge_inference.service import (
+    _close_shadow_evaluator,
+    app,
+    get_inference_pool,
+    get_model_manager,
+    get_model_runner,
+    get_prediction_cache,
+    get_settings,
+    get_shadow_evaluator,
+    get_telemetry_publisher,
+)
 
 
 class StubRunner:
+    model_sha256 = "0" * 64
+
     def __init__(self, prediction: np.ndarray, metadata: dict):
         self._prediction = prediction
         self._metadata = metadata
+        self.calls = 0
 
     def run(self, features):
-        return self._prediction, self._metadata
+        self.calls += 1
+        return self._prediction, dict(self._metadata)
+
+    async def run_async(self, features):
+        return self.run(features)
+
+
+class StubManager:
+    def __init__(self, runner):
+        self.current = runner
+
+    @contextmanager
+    def lease(self):
+        yield self.current
 
 
 class StubTelemetry:
     def __init__(self):
         self.calls = []
 
-    def publish_prediction(self, prediction, metadata):
+    def submit(self, prediction, metadata):
         self.calls.append({"prediction": prediction, "metadata": metadata})
 
 
@@ -30,7 +62,7 @@ def test_predict_success_with_explicit_confidence() -> None:
 
     app.dependency_overrides[get_settings] = lambda: Settings(model_path="dummy")
     app.dependency_overrides[get_model_runner] = lambda: runner
-    app.dependency_overrides[get_telemetry_client] = lambda: telemetry
+    app.dependency_overrides[get_telemetry_publisher] = lambda: telemetry
 
     client = TestClient(app)
     response = client.post("/predict", json={"features": {"x": [1.0]}})
@@ -39,17 +71,35 @@ def test_predict_success_with_explicit_confidence() -> None:
     data = response.json()
     assert data["confidence"] == 0.83
     assert data["map_forecast"] == [0.7, 0.8]
+    assert data["metadata"]["model_sha256"] == runner.model_sha256
     assert len(telemetry.calls) == 1
 
     app.dependency_overrides.clear()
 
 
+def test_predict_serializes_float32_forecast_directly() -> None:
+    runner = StubRunner(np.array([[66.1, 65.7]], dtype=np.float32), {"inference_ms": 3.0, "confidence": 0.9})
+    telemetry = StubTelemetry()
+
+    app.dependency_overrides[get_settings] = lambda: Settings(model_path="dummy")
+    app.dependency_overrides[get_model_runner] = lambda: runner
+    app.dependency_overrides[get_telemetry_publisher] = lambda: telemetry
+
+    response = TestClient(app).post("/predict", json={"features": {"x": [1.0]}})
+
+    assert response.headers["content-type"] == "application/json"
+    assert response.content.startswith(b'{"map_forecast":[66.1,65.7],')
+    assert all(type(value) is float for value in telemetry.calls[0]["prediction"])
+
+    app.dependency_overrides.clear()
+
+
 def test_predict_low_confidence() -> None:
     runner = StubRunner(np.array([[0.1, 0.2]]), {"inference_ms": 5.0, "confidence": 0.2})
 
     app.dependency_overrides[get_settings] = lambda: Settings(model_path="dummy", min_confidence=0.5)
     app.dependency_overrides[get_model_runner] = lambda: runner
-    app.dependency_overrides[get_telemetry_client] = lambda: StubTelemetry()
+    app.dependency_overrides[get_telemetry_publisher] = lambda: StubTelemetry()
 
     client = TestClient(app)
     response = client.post("/predict", json={"features": {"x": [1.0]}})
@@ -66,7 +116,7 @@ def test_predict_rejects_feature_contract_mismatch() -> None:
         required_feature_names=["hr", "map"],
     )
     app.dependency_overrides[get_model_runner] = lambda: runner
-    app.dependency_overrides[get_telemetry_client] = lambda: StubTelemetry()
+    app.dependency_overrides[get_telemetry_publisher] = lambda: StubTelemetry()
 
     client = TestClient(app)
     response = client.post("/predict", json={"features": {"hr": [80.0]}})
@@ -83,7 +133,7 @@ def test_predict_rejects_missing_confidence_when_legacy_disabled() -> None:
         allow_legacy_confidence_index=False,
     )
     app.dependency_overrides[get_model_runner] = lambda: runner
-    app.dependency_overrides[get_telemetry_client] = lambda: StubTelemetry()
+    app.dependency_overrides[get_telemetry_publisher] = lambda: StubTelemetry()
 
     client = TestClient(app)
     response = client.post("/predict", json={"features": {"x": [1.0]}})
@@ -97,10 +147,249 @@ def test_predict_rejects_out_of_range_confidence() -> None:
 
     app.dependency_overrides[get_settings] = lambda: Settings(model_path="dummy")
     app.dependency_overrides[get_model_runner] = lambda: runner
-    app.dependency_overrides[get_telemetry_client] = lambda: StubTelemetry()
+    app.dependency_overrides[get_telemetry_publisher] = lambda: StubTelemetry()
 
     client = TestClient(app)
     response = client.post("/predict", json={"features": {"x": [1.0]}})
 
     assert response.status_code == 502
     app.dependency_overrides.clear()
+
+
+def test_predict_serves_repeated_window_from_cache() -> None:
+    runner = StubRunner(np.array([[0.7, 0.8]]), {"inference_ms": 12.0, "confidence": 0.83})
+    telemetry = StubTelemetry()
+    cache = PredictionCache(max_entries=8, ttl_s=60.0)
+
+    app.dependency_overrides[get_settings] = lambda: Settings(model_path="dummy")
+    app.dependency_overrides[get_model_runner] = lambda: runner
+    app.dependency_overrides[get_telemetry_publisher] = lambda: telemetry
+    app.dependency_overrides[get_prediction_cache] = lambda: cache
+
+    client = TestClient(app)
+    first = client.post("/predict", json={"features": {"x": [1.0, 2.0]}})
+    second = client.post("/predict", json={"features": {"x": [1.0, 2.0]}})
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.json()["map_forecast"] == first.json()["map_forecast"]
+    assert second.json()["metadata"]["cache_hit"] == 1.0
+    assert runner.calls == 1
+    assert len(telemetry.calls) == 2
+
+    stats = client.get("/metrics/prediction-cache").json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+    app.dependency_overrides.clear()
+
+
+def test_predict_returns_503_with_retry_after_when_pool_saturated() -> None:
+    class SaturatedPool:
+        async def run_async(self, fn, *args):
+            raise InferencePoolSaturated(retry_after_s=3)
+
+    runner = StubRunner(np.array([[0.7, 0.8]]), {"inference_ms": 12.0, "confidence": 0.83})
+
+    app.dependency_overrides[get_settings] = lambda: Settings(model_path="dummy")
+    app.dependency_overrides[get_model_runner] = lambda: runner
+    app.dependency_overrides[get_telemetry_publisher] = lambda: StubTelemetry()
+    app.dependency_overrides[get_inference_pool] = lambda: SaturatedPool()
+
+    client = TestClient(app)
+    response = client.post("/predict", json={"features": {"x": [1.0]}})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert runner.calls == 0
+
+    app.dependency_overrides.clear()
+
+
+def test_predict_rejects_degraded_result_and_publishes_it() -> None:
+    runner = StubRunner(
+        np.full((1, 2), np.nan, dtype=np.float32),
+        {"inference_ms": 150.0, "fallback_active": 1.0, "degraded": 1.0, "confidence": 0.0},
+    )
+    telemetry = StubTelemetry()
+
+    app.dependency_overrides[get_settings] = lambda: Settings(model_path="dummy", inference_retry_after_s=2)
+    app.dependency_overrides[get_model_runner] = lambda: runner
+    app.dependency_overrides[get_telemetry_publisher] = lambda: telemetry
+
+    response = TestClient(app).post("/predict", json={"features": {"x": [1.0]}})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    assert len(telemetry.calls) == 1
+    assert telemetry.calls[0]["prediction"] == []
+    assert telemetry.calls[0]["metadata"]["degraded"] == 1.0
+    assert telemetry.calls[0]["metadata"]["confidence"] == 0.0
+
+    app.dependency_overrides.clear()
+
+
+def test_stream_pushes_prediction_at_cadence_from_rolling_windows() -> None:
+    class RecordingRunner(StubRunner):
+        def run(self, features):
+            self.features = features
+            return super().run(features)
+
+    runner = RecordingRunner(np.array([[66.0]]), {"inference_ms": 3.0, "confidence": 0.9})
+    telemetry = StubTelemetry()
+
+    app.dependency_overrides[get_settings] = lambda: Settings(model_path="dummy", stream_window_size=3)
+    app.dependency_overrides[get_model_manager] = lambda: StubManager(runner)
+    app.dependency_overrides[get_telemetry_publisher] = lambda: telemetry
+
+    client = TestClient(app)
+    with client.websocket_connect("/stream/session-a") as websocket:
+        websocket.send_json({"vital": "hr", "value": 80.0})
+        assert websocket.receive_json()["type"] == "error"
+
+        samples = [{"vital": "map", "value": v, "timestamp_ms": i * 1000} for i, v in enumerate([60.0, 62.0, 64.0, 66.0])]
+        websocket.send_json({"samples": samples})
+        message = websocket.receive_json()
+
+    assert message["type"] == "prediction"
+    assert message["map_forecast"] == [66.0]
+    assert message["features"]["map"]["slope"] == 2.0
+    assert runner.features == {"map": [62.0, 64.0, 66.0]}
+    assert telemetry.calls[0]["metadata"]["session_id"] == "session-a"
+    assert client.get("/metrics/stream").json()["active_sessions"] == 0
+
+    app.dependency_overrides.clear()
+
+
+def test_stream_closes_when_rolling_features_miss_the_feature_contract() -> None:
+    app.dependency_overrides[get_settings] = lambda: Settings(
+        model_path="dummy", stream_feature_mode="rolling", required_feature_names=["map"]
+    )
+    app.dependency_overrides[get_model_manager] = lambda: None
+    app.dependency_overrides[get_telemetry_publisher] = lambda: StubTelemetry()
+
+    client = TestClient(app)
+    with client.websocket_connect("/stream/session-b") as websocket:
+        message = websocket.receive_json()
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+
+    assert message["type"] == "error"
+    assert message["reason"]["missing"] == ["map"]
+    assert "map_last" in message["reason"]["extra"]
+    assert closed.value.code == 1008
+
+    app.dependency_overrides.clear()
+
+
+def test_stream_validates_features_before_inference() -> None:
+    runner = StubRunner(np.array([[66.0]]), {"inference_ms": 3.0, "confidence": 0.9})
+
+    app.dependency_overrides[get_settings] = lambda: Settings(
+        model_path="dummy", stream_vitals=["map", "hr"], stream_window_size=3
+    )
+    app.dependency_overrides[get_model_manager] = lambda: StubManager(runner)
+    app.dependency_overrides[get_telemetry_publisher] = lambda: StubTelemetry()
+
+    client = TestClient(app)
+    with client.websocket_connect("/stream/session-c") as websocket:
+        samples = [{"vital": "map", "value": v, "timestamp_ms": i * 1000} for i, v in enumerate([60.0, 62.0, 64.0])]
+        samples += [{"vital": "hr", "value": v, "timestamp_ms": i * 1000} for i, v in enumerate([80.0, 81.0])]
+        websocket.send_json({"samples": samples})
+        message = websocket.receive_json()
+
+    assert message == {"type": "rejected", "reason": "All feature vectors must have equal length"}
+    assert runner.calls == 0
+
+    app.dependency_overrides.clear()
+
+
+def test_debug_latency_breakdown_is_gated_and_reports_stages() -> None:
+    runner = StubRunner(np.array([[0.7, 0.8]]), {"inference_ms": 12.0, "confidence": 0.83})
+
+    app.dependency_overrides[get_model_runner] = lambda: runner
+    app.dependency_overrides[get_telemetry_publisher] = lambda: StubTelemetry()
+    client = TestClient(app)
+
+    app.dependency_overrides[get_settings] = lambda: Settings(model_path="dummy")
+    assert client.get("/debug/latency").status_code == 404
+
+    app.dependency_overrides[get_settings] = lambda: Settings(model_path="dummy", debug_endpoints_enabled=True)
+    assert client.post("/debug/latency", params={"enabled": True, "reset": True}).status_code == 200
+    try:
+        assert client.post("/predict", json={"features": {"x": [1.0]}}).status_code == 200
+        stages = client.get("/debug/latency").json()["stages"]
+    finally:
+        client.post("/debug/latency", params={"enabled": False, "reset": True})
+
+    assert {"total", "handler", "framework", "validate_features", "postprocess"} <= set(stages)
+    assert stages["total"]["count"] == 1
+
+    app.dependency_overrides.clear()
+
+
+def test_stage_timing_middleware_profiles_with_the_overridden_settings() -> None:
+    runner = StubRunner(np.array([[0.7, 0.8]]), {"inference_ms": 12.0, "confidence": 0.83})
+    settings = Settings(model_path="dummy", debug_endpoints_enabled=True, profiling_enabled=True, profiling_window=8)
+
+    app.dependency_overrides[get_settings] = lambda: settings
+    app.dependency_overrides[get_model_runner] = lambda: runner
+    app.dependency_overrides[get_telemetry_publisher] = lambda: StubTelemetry()
+    client = TestClient(app)
+    try:
+        assert client.post("/predict", json={"features": {"x": [1.0]}}).status_code == 200
+        stages = client.get("/debug/latency").json()["stages"]
+    finally:
+        client.post("/debug/latency", params={"enabled": False, "reset": True})
+
+    assert stages["total"]["count"] == 1
+    assert stages["total"]["window"] == 1
+
+    app.dependency_overrides.clear()
+
+
+def test_shadow_runner_has_its_own_ort_profile_and_closes_with_the_app(tmp_path, monkeypatch) -> None:
+    class ShadowSession:
+        def __init__(self, model_path, sess_options, providers):
+            self.intra_op_num_threads = sess_options.intra_op_num_threads
+
+        def get_inputs(self):
+            return []
+
+        def get_outputs(self):
+            return []
+
+        def run(self, output_names, inputs, run_options=None):
+            return [np.array([[66.0]], dtype=np.float32)]
+
+    monkeypatch.setattr("edge_inference.model_runner.ort.InferenceSession", ShadowSession)
+    shadow_path = tmp_path / "shadow.onnx"
+    shadow_path.write_bytes(b"shadow-model")
+    settings = Settings(model_path="dummy", shadow_model_path=shadow_path, ort_profile="gateway")
+    app.dependency_overrides[get_settings] = lambda: settings
+
+    with TestClient(app) as client:
+        evaluator = get_shadow_evaluator(settings)
+        runner = evaluator._runner
+        assert runner._ort_profile == settings.ort_profiles["single"]
+        assert runner._session.intra_op_num_threads == 1
+        assert client.get("/metrics/shadow").json()["enabled"] is True
+
+    assert not evaluator._worker.is_alive()
+    assert get_shadow_evaluator(settings) is not evaluator
+    _close_shadow_evaluator()
+
+    gateway = settings.model_copy(update={"shadow_ort_profile": "gateway"})
+    assert get_shadow_evaluator(gateway)._runner._session.intra_op_num_threads == 2
+    app.dependency_overrides.clear()
+    _close_shadow_evaluator()
+    with pytest.raises(ValueError, match="Unknown shadow ORT profile"):
+        Settings(shadow_ort_profile="missing")
+
+
+def test_response_schema_is_checked_at_startup(monkeypatch) -> None:
+    calls = []
+    monkeypatch.setattr("edge_inference.service.validate_response_schema", lambda: calls.append("checked"))
+
+    with TestClient(app):
+        assert calls == ["checked"]
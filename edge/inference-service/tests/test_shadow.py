@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pytest
+
+from edge_inference.shadow import ShadowEvaluator, StreamingDeltaStats
+
+
+class FakeShadowRunner:
+    model_sha256 = "d" * 64
+
+    def __init__(self, offset: float, delay_s: float = 0.0) -> None:
+        self._offset = offset
+        self._delay_s = delay_s
+        self.closed = False
+
+    def run(self, features):
+        time.sleep(self._delay_s)
+        window = np.asarray(features["map"], dtype=np.float32)
+        return window + self._offset, {"inference_ms": 1.0, "confidence": 0.7}
+
+    def close(self):
+        self.closed = True
+
+
+def _wait_for(predicate, timeout_s: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met before timeout")
+        time.sleep(0.005)
+
+
+def test_streaming_delta_stats_matches_numpy() -> None:
+    values = np.random.default_rng(3).normal(0.5, 2.0, size=500)
+    stats = StreamingDeltaStats(low=-20.0, high=20.0, bins=40)
+    for chunk in np.array_split(values, 7):
+        stats.update(chunk)
+
+    snapshot = stats.snapshot()
+    assert snapshot["count"] == 500
+    assert snapshot["mean"] == pytest.approx(values.mean())
+    assert snapshot["std"] == pytest.approx(values.std())
+    assert sum(snapshot["histogram"]["counts"]) == 500
+    assert abs(snapshot["p50"] - np.median(values)) <= 1.0
+
+
+def test_shadow_evaluator_tracks_map_and_confidence_deltas() -> None:
+    evaluator = ShadowEvaluator(FakeShadowRunner(offset=2.0), queue_size=8)
+
+    for value in (60.0, 65.0, 70.0):
+        assert evaluator.submit({"map": [value]}, [value], 0.8) is True
+    _wait_for(lambda: evaluator.stats()["scored"] == 3)
+
+    stats = evaluator.stats()
+    assert stats["map_delta"]["mean"] == pytest.approx(2.0)
+    assert stats["confidence_delta"]["mean"] == pytest.approx(-0.1, abs=1e-6)
+    assert stats["agreement_rate"] == 1.0
+    evaluator.close()
+
+
+def test_shadow_submit_never_blocks_when_worker_is_behind() -> None:
+    evaluator = ShadowEvaluator(FakeShadowRunner(offset=0.0, delay_s=0.2), queue_size=1)
+
+    start = time.monotonic()
+    results = [evaluator.submit({"map": [60.0]}, [60.0], 0.8) for _ in range(5)]
+    elapsed_s = time.monotonic() - start
+
+    assert elapsed_s < 0.1
+    assert results.count(False) >= 3
+    assert evaluator.stats()["dropped"] == results.count(False)
+
+
+def test_shadow_close_does_not_wait_for_a_full_queue() -> None:
+    runner = FakeShadowRunner(offset=0.0, delay_s=0.3)
+    evaluator = ShadowEvaluator(runner, queue_size=1)
+    evaluator.submit({"map": [60.0]}, [60.0], 0.8)
+    _wait_for(lambda: evaluator.stats()["queue_depth"] == 0)
+    evaluator.submit({"map": [61.0]}, [61.0], 0.8)
+
+    start = time.monotonic()
+    evaluator.close()
+
+    assert time.monotonic() - start < 0.5
+    assert evaluator.stats()["scored"] == 1
+    assert runner.closed is True
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from edge_inference.streaming import RollingWindow, StreamRegistry, StreamSession
+
+
+def test_rolling_window_matches_recomputed_features() -> None:
+    rng = np.random.default_rng(3)
+    values = rng.normal(65.0, 5.0, size=500)
+    timestamps = 1.7e9 + np.cumsum(rng.uniform(0.5, 1.5, size=500))
+    window = RollingWindow(size=9)
+
+    for index, (value, timestamp) in enumerate(zip(values, timestamps)):
+        window.append(float(value), float(timestamp))
+        expected_values = values[max(0, index - 8) : index + 1]
+        expected_times = timestamps[max(0, index - 8) : index + 1]
+        features = window.features()
+
+        np.testing.assert_allclose(window.values(), expected_values)
+        assert features["last"] == value
+        assert features["min"] == expected_values.min()
+        assert features["mean"] == pytest.approx(expected_values.mean())
+        if len(expected_values) > 1:
+            expected_slope = np.polyfit(expected_times - expected_times[0], expected_values, 1)[0]
+            assert features["slope"] == pytest.approx(expected_slope, abs=1e-6)
+
+
+def test_session_cadence_and_feature_modes() -> None:
+    session = StreamSession("s-1", ["map", "hr"], window_size=4, inference_period_s=1.0)
+    for step in range(3):
+        session.add_sample("map", 60.0 + step, float(step))
+    session.add_sample("hr", 80.0, 0.0)
+
+    assert not session.ready(min_samples=2)
+    session.add_sample("hr", 82.0, 1.0)
+    assert session.ready(min_samples=2)
+
+    assert session.inference_due(100.0)
+    assert not session.inference_due(100.5)
+    assert session.inference_due(101.0)
+
+    assert session.model_features("window") == {"map": [60.0, 61.0, 62.0], "hr": [80.0, 82.0]}
+    rolling = session.model_features("rolling")
+    assert rolling["map_slope"] == [pytest.approx(1.0)]
+    assert rolling["hr_min"] == [80.0]
+
+    with pytest.raises(ValueError, match="Unknown vital"):
+        session.add_sample("spo2", 97.0, 3.0)
+
+
+def test_registry_limits_concurrent_sessions() -> None:
+    registry = StreamRegistry(
+        max_sessions=1,
+        session_factory=lambda session_id: StreamSession(session_id, ["map"], window_size=4, inference_period_s=1.0),
+    )
+
+    assert registry.open("a") is not None
+    assert registry.open("a") is None
+    assert registry.open("b") is None
+    registry.close("a")
+    assert registry.open("b") is not None
+    assert registry.stats()["rejected_sessions"] == 2
@@ -1,27 +1,40 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
 
+import httpx
 import pytest
+import respx
 
-from edge_inference.telemetry_client import TelemetryClient
+from edge_inference.telemetry_client import TelemetryClient, TelemetryRejected
 
 
-def test_publish_prediction_http_transport(monkeypatch) -> None:
-    calls = {}
+@respx.mock
+def test_publish_prediction_http_transport() -> None:
+    route = respx.post("http://localhost:8081/telemetry").mock(return_value=httpx.Response(202))
 
-    class FakeResponse:
-        def raise_for_status(self) -> None:
-            return None
+    client = TelemetryClient(
+        transport="http",
+        endpoint="http://localhost:8081/telemetry",
+        grpc_target="localhost:50051",
+        api_key="token",
+        default_session_id="demo-session",
+        default_device_id="pump-01",
+        http_batch_format="single",
+    )
 
-    def fake_post(url, json, headers, timeout):
-        calls["url"] = url
-        calls["json"] = json
-        calls["headers"] = headers
-        calls["timeout"] = timeout
-        return FakeResponse()
+    client.publish_prediction([67.0], {"confidence": 0.8, "inference_ms": 10.0})
 
-    monkeypatch.setattr("edge_inference.telemetry_client.httpx.post", fake_post)
+    request = route.calls.last.request
+    assert json.loads(request.content)["prediction"] == [67.0]
+    assert request.headers["Authorization"] == "Bearer token"
+
+
+@respx.mock
+def test_publish_predictions_http_defaults_to_one_post_per_record() -> None:
+    single = respx.post("http://localhost:8081/telemetry").mock(return_value=httpx.Response(202))
+    bulk = respx.post("http://localhost:8081/telemetry/bulk").mock(return_value=httpx.Response(202))
 
     client = TelemetryClient(
         transport="http",
@@ -32,11 +45,70 @@ def test_publish_prediction_http_transport(monkeypatch) -> None:
         default_device_id="pump-01",
     )
 
-    client.publish_prediction([67.0], {"confidence": 0.8, "inference_ms": 10.0})
+    client.publish_predictions(
+        [
+            {"prediction": [64.0], "metadata": {"confidence": 0.8}},
+            {"prediction": [65.0], "metadata": {"confidence": 0.7}},
+        ]
+    )
+
+    assert single.call_count == 2
+    assert bulk.call_count == 0
+    client.close()
+
+
+@respx.mock
+def test_publish_predictions_http_bulk_ndjson_reuses_pooled_client() -> None:
+    route = respx.post("http://localhost:8081/telemetry/bulk").mock(return_value=httpx.Response(202))
+
+    client = TelemetryClient(
+        transport="http",
+        endpoint="http://localhost:8081/telemetry",
+        grpc_target="localhost:50051",
+        api_key="token",
+        default_session_id="demo-session",
+        default_device_id="pump-01",
+        http_batch_format="ndjson",
+    )
 
-    assert calls["url"] == "http://localhost:8081/telemetry"
-    assert calls["json"]["prediction"] == [67.0]
-    assert calls["headers"]["Authorization"] == "Bearer token"
+    client.publish_predictions(
+        [
+            {"prediction": [64.0], "metadata": {"confidence": 0.8}},
+            {"prediction": [65.0], "metadata": {"confidence": 0.7}},
+        ]
+    )
+    pool = client._pooled_http_client()
+    client.publish_predictions([{"prediction": [66.0], "metadata": {"confidence": 0.9}}])
+
+    assert client._pooled_http_client() is pool
+    assert route.call_count == 2
+    first = route.calls[0].request
+    assert first.headers["Content-Type"] == "application/x-ndjson"
+    assert first.headers["Authorization"] == "Bearer token"
+    lines = first.content.decode("utf-8").splitlines()
+    assert [json.loads(line)["prediction"] for line in lines] == [[64.0], [65.0]]
+    client.close()
+
+
+@pytest.mark.parametrize(("status", "error"), [(503, httpx.HTTPStatusError), (422, TelemetryRejected)])
+@respx.mock
+def test_publish_predictions_http_bulk_json_raises_on_rejection(status: int, error: type) -> None:
+    route = respx.post("http://localhost:8081/telemetry/bulk").mock(return_value=httpx.Response(status))
+
+    client = TelemetryClient(
+        transport="http",
+        endpoint="http://localhost:8081/telemetry",
+        grpc_target="localhost:50051",
+        api_key="token",
+        default_session_id="demo-session",
+        default_device_id="pump-01",
+        http_batch_format="json",
+    )
+
+    with pytest.raises(error):
+        client.publish_predictions([{"prediction": [64.0], "metadata": {"confidence": 0.8}}])
+
+    assert json.loads(route.calls.last.request.content) == [{"prediction": [64.0], "metadata": {"confidence": 0.8}}]
 
 
 def test_publish_prediction_grpc_transport(monkeypatch) -> None:
@@ -84,6 +156,8 @@ def test_publish_prediction_grpc_transport(monkeypatch) -> None:
     assert event.device_id == "pump-07"
     assert event.predictions["confidence"] == 0.86
     assert captured["metadata"] == (("x-api-key", "device-key"), ("x-device-id", "pump-07"))
+    assert "closed" not in captured
+    client.close()
     assert captured["closed"] is True
 
 
@@ -147,6 +221,7 @@ def test_publish_prediction_grpc_transport_with_tls(monkeypatch, tmp_path: Path)
     assert captured["root_certificates"] == b"ca"
     assert captured["certificate_chain"] == b"cert"
     assert captured["private_key"] == b"key"
+    client.close()
     assert captured["closed"] is True
 
 
@@ -163,3 +238,52 @@ def test_publish_prediction_grpc_tls_requires_ca() -> None:
 
     with pytest.raises(RuntimeError, match="no CA certificate"):
         client.publish_prediction([64.2], {"confidence": 0.86})
+
+
+def test_publish_predictions_grpc_streams_batch_per_device(monkeypatch) -> None:
+    streams = []
+    channels = []
+
+    class FakeAck:
+        accepted = True
+
+    class FakeChannel:
+        def close(self) -> None:
+            channels.append("closed")
+
+    class FakeStub:
+        def StreamTelemetry(self, iterator, metadata, timeout):
+            streams.append({"events": list(iterator), "metadata": metadata})
+            return FakeAck()
+
+    def open_channel(target):
+        channels.append("opened")
+        return FakeChannel()
+
+    monkeypatch.setattr("edge_inference.telemetry_client.grpc.insecure_channel", open_channel)
+    monkeypatch.setattr("edge_inference.telemetry_client.telemetry_pb2_grpc.TelemetryIngestionStub", lambda channel: FakeStub())
+
+    client = TelemetryClient(
+        transport="grpc",
+        endpoint="http://unused",
+        grpc_target="localhost:50051",
+        api_key="device-key",
+        default_session_id="demo-session",
+        default_device_id="pump-07",
+    )
+
+    client.publish_predictions(
+        [
+            {"prediction": [64.0], "metadata": {"confidence": 0.8}},
+            {"prediction": [65.0], "metadata": {"confidence": 0.8}},
+            {"prediction": [66.0], "metadata": {"confidence": 0.8, "device_id": "pump-08"}},
+        ]
+    )
+    client.publish_predictions([{"prediction": [67.0], "metadata": {"confidence": 0.8}}])
+
+    assert channels == ["opened"]
+    client.close()
+    assert channels == ["opened", "closed"]
+    assert [len(stream["events"]) for stream in streams] == [2, 1, 1]
+    assert streams[1]["metadata"] == (("x-api-key", "device-key"), ("x-device-id", "pump-08"))
+    assert [event.sequence for event in streams[0]["events"]] == [1, 2]
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from edge_inference.telemetry_publisher import TelemetryPublisher
+
+
+def test_publisher_batches_records_in_submission_order() -> None:
+    batches = []
+    publisher = TelemetryPublisher(batches.append, max_queue=16, batch_size=3, flush_interval_s=0.05)
+
+    for value in range(7):
+        publisher.submit([float(value)], {"confidence": 0.8})
+
+    assert publisher.flush(timeout_s=2.0) is True
+    published = [record["prediction"][0] for batch in batches for record in batch]
+    assert published == [float(value) for value in range(7)]
+    assert max(len(batch) for batch in batches) <= 3
+    assert publisher.stats()["published"] == 7
+    publisher.close()
+
+
+def test_submit_does_not_wait_for_slow_sink_and_drops_oldest() -> None:
+    release = threading.Event()
+    batches = []
+
+    def slow_sink(batch):
+        release.wait(2.0)
+        batches.append(batch)
+
+    publisher = TelemetryPublisher(slow_sink, max_queue=2, batch_size=1, flush_interval_s=0.01)
+    publisher.submit([0.0], {})
+    time.sleep(0.05)
+
+    start = time.monotonic()
+    for value in (1.0, 2.0, 3.0):
+        publisher.submit([value], {})
+    elapsed_s = time.monotonic() - start
+
+    stats = publisher.stats()
+    assert elapsed_s < 0.05
+    assert stats["queue_depth"] == 2
+    assert stats["dropped"] == 1
+
+    release.set()
+    assert publisher.flush(timeout_s=2.0) is True
+    assert [batch[0]["prediction"][0] for batch in batches] == [0.0, 2.0, 3.0]
+    publisher.close()
+
+
+def test_sink_failures_are_counted_and_publisher_keeps_running() -> None:
+    calls = []
+
+    def flaky_sink(batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise RuntimeError("backend unavailable")
+
+    publisher = TelemetryPublisher(flaky_sink, max_queue=8, batch_size=1, flush_interval_s=0.01)
+    publisher.submit([1.0], {})
+    publisher.flush(timeout_s=2.0)
+    publisher.submit([2.0], {})
+    publisher.flush(timeout_s=2.0)
+
+    stats = publisher.stats()
+    assert stats["failed_batches"] == 1
+    assert stats["published"] == 1
+    assert stats["last_error"] == "backend unavailable"
+    publisher.close()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+from edge_inference.telemetry_client import TelemetryRejected
+from edge_inference.telemetry_spool import SpoolForwarder, TelemetrySpool
+
+
+def _records(*values: float) -> list:
+    return [{"prediction": [value], "metadata": {"confidence": 0.8}} for value in values]
+
+
+def _wait_for(predicate, timeout_s: float = 3.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met before timeout")
+        time.sleep(0.01)
+
+
+def test_spool_survives_reopen_and_keeps_sequence(tmp_path: Path) -> None:
+    path = tmp_path / "spool.db"
+    spool = TelemetrySpool(path, max_bytes=1_000_000)
+    spool.append_many(_records(60.0, 61.0))
+    spool.ack(spool.peek(1)[0][0])
+    spool.close()
+
+    reopened = TelemetrySpool(path, max_bytes=1_000_000)
+    reopened.append_many(_records(62.0))
+    batch = reopened.peek(10)
+
+    assert reopened.depth == 2
+    assert [record["prediction"][0] for _, record in batch] == [61.0, 62.0]
+    assert [record["metadata"]["sequence"] for _, record in batch] == [2, 3]
+    reopened.close()
+
+
+def test_spool_evicts_oldest_when_over_budget(tmp_path: Path) -> None:
+    spool = TelemetrySpool(tmp_path / "spool.db", max_bytes=200)
+    for value in range(10):
+        spool.append_many(_records(float(value)))
+
+    remaining = [record["prediction"][0] for _, record in spool.peek(100)]
+    assert spool.size_bytes <= 200
+    assert spool.evicted == 10 - len(remaining)
+    assert remaining == sorted(remaining)
+    assert remaining[-1] == 9.0
+    spool.close()
+
+
+def test_forwarder_retries_in_order_after_outage(tmp_path: Path) -> None:
+    delivered = []
+    backend_up = threading.Event()
+
+    def sink(batch):
+        if not backend_up.is_set():
+            raise ConnectionError("uplink down")
+        delivered.extend(record["prediction"][0] for record in batch)
+
+    forwarder = SpoolForwarder(
+        TelemetrySpool(tmp_path / "spool.db", max_bytes=1_000_000),
+        sink,
+        batch_size=2,
+        rate_limit_per_s=1000.0,
+        backoff_initial_s=0.01,
+        backoff_max_s=0.05,
+        idle_poll_s=0.01,
+    )
+    forwarder.append_many(_records(1.0, 2.0, 3.0))
+    _wait_for(lambda: forwarder.stats()["failures"] >= 1)
+    assert forwarder.stats()["connected"] is False
+
+    backend_up.set()
+    _wait_for(lambda: forwarder.stats()["spool_depth"] == 0)
+
+    assert delivered == [1.0, 2.0, 3.0]
+    assert forwarder.stats()["connected"] is True
+    forwarder.close()
+
+
+def test_forwarder_drops_rejected_record_and_delivers_the_rest(tmp_path: Path) -> None:
+    delivered = []
+
+    def sink(batch):
+        if any(record["prediction"][0] == 2.0 for record in batch):
+            raise TelemetryRejected("HTTP 422")
+        delivered.extend(record["prediction"][0] for record in batch)
+
+    forwarder = SpoolForwarder(
+        TelemetrySpool(tmp_path / "spool.db", max_bytes=1_000_000),
+        sink,
+        batch_size=3,
+        rate_limit_per_s=1000.0,
+        idle_poll_s=0.01,
+    )
+    forwarder.append_many(_records(1.0, 2.0, 3.0, 4.0))
+    _wait_for(lambda: forwarder.stats()["spool_depth"] == 0)
+
+    stats = forwarder.stats()
+    assert delivered == [1.0, 3.0, 4.0]
+    assert stats["rejected"] == 1
+    assert stats["failures"] == 0
+    assert stats["connected"] is True
+    forwarder.close()
+
+
+def test_forwarder_rate_limits_backlog(tmp_path: Path) -> None:
+    delivered = []
+    forwarder = SpoolForwarder(
+        TelemetrySpool(tmp_path / "spool.db", max_bytes=1_000_000),
+        lambda batch: delivered.extend(batch),
+        batch_size=5,
+        rate_limit_per_s=50.0,
+        idle_poll_s=0.01,
+    )
+    start = time.monotonic()
+    forwarder.append_many(_records(*[float(value) for value in range(15)]))
+    _wait_for(lambda: len(delivered) == 15)
+
+    # The first 5 records use the initial bucket; the remaining 10 need >= 0.2 s at 50/s.
+    assert time.monotonic() - start >= 0.18
+    forwarder.close()
@@ -0,0 +1,84 @@
+"""Compare feature building: whole-frame float64 ffill/bfill versus the session-aware float32 engine.
+
+Run from the training pipeline directory:
+
+    python benchmarks/feature_building.py --sessions 20000 --steps 100 --missing 0.1
+
+The legacy path reproduces what ``build_features`` did before: select the feature columns, forward- and
+back-fill across the whole frame, then convert to float32 for XGBoost. Peak memory is the tracemalloc
+peak of each path, which includes NumPy and pandas buffers; the input frame is allocated beforehand.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dataset_loader import feature_columns  # noqa: E402
+from feature_engineering import build_feature_matrix  # noqa: E402
+from synthetic_data import generate_training_dataframe  # noqa: E402
+
+FEATURE_CONFIG = {
+    "vital_signs": ["map", "heart_rate", "spo2"],
+    "labs": ["lactate", "creatinine"],
+    "demographics": ["age", "weight_kg"],
+}
+
+
+def _legacy(df: pd.DataFrame) -> np.ndarray:
+    X = df[feature_columns(FEATURE_CONFIG)].ffill().bfill()
+    return X.to_numpy(dtype=np.float32)
+
+
+def _session_aware(df: pd.DataFrame) -> np.ndarray:
+    X, _ = build_feature_matrix(df, FEATURE_CONFIG)
+    return X.to_numpy(dtype=np.float32)
+
+
+def _measure(name: str, build: Callable[[pd.DataFrame], np.ndarray], df: pd.DataFrame) -> Dict[str, Any]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    matrix = build(df)
+    elapsed_s = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "strategy": name,
+        "rows": matrix.shape[0],
+        "seconds": round(elapsed_s, 3),
+        "peak_mb": round(peak / 2**20, 1),
+        "result_mb": round(matrix.nbytes / 2**20, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--missing", type=float, default=0.1, help="Fraction of feature values blanked")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    df = generate_training_dataframe(
+        num_sessions=args.sessions, steps_per_session=args.steps, seed=args.seed, compat=False
+    )
+    rng = np.random.default_rng(args.seed)
+    for name in feature_columns(FEATURE_CONFIG):
+        df.loc[rng.random(len(df)) < args.missing, name] = np.nan
+
+    for name, build in (("legacy_frame_fill", _legacy), ("session_float32", _session_aware)):
+        print(json.dumps(_measure(name, build, df)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Column-projected training data loading into float32 arrays."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from dataset_manifest import dataset_shard_paths
+
+LABEL_COLUMN = "hypotension_label"
+SESSION_COLUMN = "session_id"
+
+
+def feature_columns(feature_config: dict) -> list[str]:
+    return feature_config["vital_signs"] + feature_config.get("labs", []) + feature_config.get("demographics", [])
+
+
+def required_columns(feature_config: dict) -> list[str]:
+    """Columns ``build_features`` needs: configured features plus the label."""
+    return feature_columns(feature_config) + [LABEL_COLUMN]
+
+
+# Read when the dataset has them: ``session_id`` scopes gap filling, and datasets without it fill as one session.
+OPTIONAL_COLUMNS = (SESSION_COLUMN,)
+
+
+def _check_required(columns: Sequence[str], available: Sequence[str]) -> None:
+    missing = [name for name in columns if name not in available]
+    if missing:
+        raise KeyError(f"Dataset is missing required columns: {', '.join(missing)}")
+
+
+def _with_optional(columns: Sequence[str], optional_columns: Sequence[str], available: Sequence[str]) -> list[str]:
+    return list(columns) + [name for name in optional_columns if name in available and name not in columns]
+
+
+def _float32_frame(matrix: np.ndarray, numeric: list[str], other: dict[str, pd.Series]) -> pd.DataFrame:
+    # Numeric columns lead, in requested order, as one float32 block that the frame wraps without copying.
+    frame = pd.DataFrame(matrix, columns=numeric, copy=False)
+    for name, values in other.items():
+        frame[name] = values
+    return frame
+
+
+def _load_parquet(paths: list[Path], columns: Sequence[str], optional_columns: Sequence[str]) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    files = [pq.ParquetFile(path, memory_map=True) for path in paths]
+    schema = files[0].schema_arrow
+    _check_required(columns, schema.names)
+    columns = _with_optional(columns, optional_columns, schema.names)
+    numeric = [
+        name
+        for name in columns
+        if pa.types.is_integer(schema.field(name).type)
+        or pa.types.is_floating(schema.field(name).type)
+        or pa.types.is_boolean(schema.field(name).type)
+    ]
+    other = [name for name in columns if name not in numeric]
+
+    # Fortran order: each column is filled contiguously, one row group at a time.
+    total_rows = sum(parquet_file.metadata.num_rows for parquet_file in files)
+    matrix = np.empty((len(numeric), total_rows), dtype=np.float32).T
+    other_chunks: dict[str, list] = {name: [] for name in other}
+    offset = 0
+    for parquet_file in files:
+        for row_group in range(parquet_file.num_row_groups):
+            table = parquet_file.read_row_group(row_group, columns=list(columns))
+            rows = table.num_rows
+            for position, name in enumerate(numeric):
+                matrix[offset : offset + rows, position] = table.column(name).to_numpy()
+            for name in other:
+                other_chunks[name].extend(table.column(name).chunks)
+            offset += rows
+    return _float32_frame(
+        matrix,
+        numeric,
+        {
+            # Dictionary-encoded, so repeated identifiers such as session ids load as a categorical.
+            name: pa.chunked_array(chunks, type=schema.field(name).type).dictionary_encode().to_pandas()
+            for name, chunks in other_chunks.items()
+        },
+    )
+
+
+def _load_csv(path: Path, columns: Sequence[str], optional_columns: Sequence[str]) -> pd.DataFrame:
+    header = pd.read_csv(path, nrows=0).columns.tolist()
+    _check_required(columns, header)
+    columns = _with_optional(columns, optional_columns, header)
+    # Column types come from a sample, so the full read parses numeric columns straight into float32.
+    sample = pd.read_csv(path, usecols=lambda name: name in columns, nrows=1024)
+    numeric = [name for name in columns if pd.api.types.is_numeric_dtype(sample[name])]
+    other = [name for name in columns if name not in numeric]
+    df = pd.read_csv(
+        path,
+        usecols=lambda name: name in columns,
+        dtype={**{name: np.float32 for name in numeric}, **{name: "category" for name in other}},
+    )
+    matrix = np.empty((len(numeric), len(df)), dtype=np.float32).T
+    for position, name in enumerate(numeric):
+        matrix[:, position] = df.pop(name).to_numpy()
+    return _float32_frame(matrix, numeric, {name: df[name] for name in other})
+
+
+def load_dataset(
+    dataset_path: Path,
+    columns: Sequence[str] | None = None,
+    optional_columns: Sequence[str] = (),
+) -> pd.DataFrame:
+    """Load a Parquet file, sharded Parquet dataset directory or CSV.
+
+    With ``columns``, only those columns are read. Numeric ones are converted straight to one float32 block
+    and come first, in the requested order, followed by any non-numeric columns. Parquet is memory-mapped
+    and read a row group at a time into a preallocated array, so peak memory is the projected float32
+    matrix plus one row group. CSV numeric columns are parsed as float32. ``optional_columns`` are added
+    when the dataset schema or header has them and silently skipped otherwise; a missing entry of
+    ``columns`` raises ``KeyError``. Without ``columns`` the whole dataset is read with its stored dtypes.
+    """
+    if dataset_path.is_dir():
+        paths = dataset_shard_paths(dataset_path)
+        if columns is None:
+            import pyarrow.parquet as pq
+
+            return pq.read_table([str(path) for path in paths]).to_pandas()
+        return _load_parquet(paths, columns, optional_columns)
+    if dataset_path.suffix == ".parquet":
+        return pd.read_parquet(dataset_path) if columns is None else _load_parquet([dataset_path], columns, optional_columns)
+    if dataset_path.suffix == ".csv":
+        return pd.read_csv(dataset_path) if columns is None else _load_csv(dataset_path, columns, optional_columns)
+    raise ValueError(f"Unsupported dataset extension: {dataset_path.suffix}")
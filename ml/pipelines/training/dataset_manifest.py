@@ -0,0 +1,40 @@
+"""Manifest for training datasets written as a directory of Parquet shards."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+# Leading underscore: Arrow dataset discovery skips the manifest when reading the directory.
+DATASET_MANIFEST_NAME = "_dataset_manifest.json"
+DATASET_MANIFEST_VERSION = 1
+
+
+def write_dataset_manifest(dataset_dir: Path, manifest: dict[str, Any]) -> Path:
+    manifest_path = dataset_dir / DATASET_MANIFEST_NAME
+    manifest_path.write_text(
+        json.dumps({"manifest_version": DATASET_MANIFEST_VERSION, **manifest}, indent=2),
+        encoding="utf-8",
+    )
+    return manifest_path
+
+
+def load_dataset_manifest(dataset_dir: Path) -> dict[str, Any]:
+    manifest_path = dataset_dir / DATASET_MANIFEST_NAME
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"Dataset directory {dataset_dir} has no {DATASET_MANIFEST_NAME}")
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if manifest.get("manifest_version") != DATASET_MANIFEST_VERSION:
+        raise ValueError(f"Unsupported dataset manifest version: {manifest.get('manifest_version')}")
+    return manifest
+
+
+def dataset_shard_paths(dataset_dir: Path) -> list[Path]:
+    """Shard files in manifest order, so row order does not depend on directory listing."""
+    manifest = load_dataset_manifest(dataset_dir)
+    paths = [dataset_dir / shard["path"] for shard in manifest["shards"]]
+    missing = [str(path) for path in paths if not path.exists()]
+    if missing:
+        raise FileNotFoundError(f"Dataset shards listed in the manifest are missing: {', '.join(missing)}")
+    return paths
@@ -0,0 +1,78 @@
+"""Session-aware feature matrix construction in float32."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from dataset_loader import LABEL_COLUMN, SESSION_COLUMN, feature_columns
+
+
+def _session_layout(session_ids: pd.Series | None, rows: int) -> tuple[np.ndarray | None, np.ndarray]:
+    """Row order that makes sessions contiguous (``None`` when they already are) and session start flags."""
+    if session_ids is None:
+        starts = np.zeros(rows, dtype=bool)
+        starts[:1] = True
+        return None, starts
+    codes, _ = pd.factorize(session_ids, sort=False)
+    # Codes follow first appearance, so contiguous sessions give non-decreasing codes.
+    order = None if np.all(codes[1:] >= codes[:-1]) else np.argsort(codes, kind="stable")
+    ordered = codes if order is None else codes[order]
+    starts = np.empty(rows, dtype=bool)
+    starts[:1] = True
+    np.not_equal(ordered[1:], ordered[:-1], out=starts[1:])
+    return order, starts
+
+
+def fill_within_sessions(values: np.ndarray, order: np.ndarray | None, starts: np.ndarray) -> None:
+    """Forward- then back-fill NaNs in place, never crossing a session boundary.
+
+    ``order`` lists row indices session by session (``None`` for identity) and ``starts`` flags the first
+    row of each session in that order. Each gap is matched to its nearest observed neighbours with a binary
+    search, so the work and temporaries scale with the number of gaps rather than copies of the matrix.
+    Sessions with no observed value for a column keep NaN.
+    """
+    rows = values.shape[0]
+    session = np.cumsum(starts) - 1
+    first = np.flatnonzero(starts)
+    last = np.append(first[1:], rows) - 1
+    for column in range(values.shape[1]):
+        series = values[:, column] if order is None else values[order, column]
+        missing = np.isnan(series)
+        gaps = np.flatnonzero(missing)
+        if not gaps.size:
+            continue
+        observed = np.flatnonzero(~missing)
+        if not observed.size:
+            continue
+        after = np.searchsorted(observed, gaps)
+        previous = observed[np.maximum(after - 1, 0)]
+        following = observed[np.minimum(after, observed.size - 1)]
+        gap_session = session[gaps]
+        source = np.where(
+            (after > 0) & (previous >= first[gap_session]),
+            previous,
+            np.where((after < observed.size) & (following <= last[gap_session]), following, -1),
+        )
+        fill = source >= 0
+        series[gaps[fill]] = series[source[fill]]
+        if order is not None:
+            values[order, column] = series
+
+
+def build_feature_matrix(df: pd.DataFrame, feature_config: dict) -> tuple[pd.DataFrame, pd.Series]:
+    """Features as one float32 matrix with gaps filled within each session, plus the label.
+
+    The configured columns are copied once into a float32 array and filled in place; the returned frame
+    wraps that array. Without a ``session_id`` column the whole frame is treated as one session.
+    """
+    columns = feature_columns(feature_config)
+    values = np.empty((len(columns), len(df)), dtype=np.float32).T
+    for position, name in enumerate(columns):
+        values[:, position] = df[name].to_numpy()
+    session_ids = df[SESSION_COLUMN] if SESSION_COLUMN in df.columns else None
+    order, starts = _session_layout(session_ids, len(df))
+    if len(df):
+        fill_within_sessions(values, order, starts)
+    X = pd.DataFrame(values, columns=columns, index=df.index, copy=False)
+    return X, df[LABEL_COLUMN]
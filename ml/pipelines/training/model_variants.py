@@ -0,0 +1,131 @@
+"""Offline-optimized and quantized ONNX variants for edge deployment."""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+VARIANT_NAMES = ("base", "optimized", "int8", "fp16")
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while True:
+            chunk = handle.read(1024 * 1024)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _build_optimized(source_path: Path, output_path: Path) -> None:
+    import onnxruntime as ort
+
+    so = ort.SessionOptions()
+    # Extended optimizations stay portable across CPU hosts; layout (ALL) rewrites are hardware specific.
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    so.optimized_model_filepath = str(output_path)
+    ort.InferenceSession(str(source_path), so, providers=["CPUExecutionProvider"])
+
+
+def _build_int8(source_path: Path, output_path: Path) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(str(source_path), str(output_path), weight_type=QuantType.QInt8)
+
+
+def _build_fp16(source_path: Path, output_path: Path) -> None:
+    import onnx
+    from onnxruntime.transformers.float16 import convert_float_to_float16
+
+    model = onnx.load(str(source_path))
+    onnx.save(convert_float_to_float16(model, keep_io_types=True), str(output_path))
+
+
+_BUILDERS: dict[str, Callable[[Path, Path], None]] = {
+    "optimized": _build_optimized,
+    "int8": _build_int8,
+    "fp16": _build_fp16,
+}
+
+
+def measure_variant(model_path: Path, *, pre_optimized: bool, runs: int = 50) -> dict[str, float]:
+    """Measure session load time and single-row latency on the build host."""
+    import onnxruntime as ort
+
+    so = ort.SessionOptions()
+    so.intra_op_num_threads = 1
+    so.inter_op_num_threads = 1
+    if pre_optimized:
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+
+    start = time.perf_counter()
+    session = ort.InferenceSession(str(model_path), so, providers=["CPUExecutionProvider"])
+    load_ms = (time.perf_counter() - start) * 1000
+
+    rng = np.random.default_rng(0)
+    inputs = {}
+    for spec in session.get_inputs():
+        shape = [dim if isinstance(dim, int) and dim > 0 else 1 for dim in spec.shape]
+        inputs[spec.name] = rng.normal(size=shape).astype(np.float32)
+    session.run(None, inputs)
+
+    latencies_ms = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        session.run(None, inputs)
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+    return {
+        "load_ms": round(load_ms, 3),
+        "latency_ms_p50": round(float(np.percentile(latencies_ms, 50)), 4),
+        "latency_ms_p95": round(float(np.percentile(latencies_ms, 95)), 4),
+    }
+
+
+def build_model_variants(
+    *,
+    model_path: Path,
+    output_dir: Path,
+    variants: tuple[str, ...] = VARIANT_NAMES,
+    benchmark_runs: int = 50,
+) -> dict[str, dict[str, Any]]:
+    """Build each requested variant next to ``model_path`` and record size, hash and timings.
+
+    Variants the model's operators do not support are recorded with an error instead of
+    failing the export, so the base binary is always deployable.
+    """
+    results: dict[str, dict[str, Any]] = {}
+    for name in variants:
+        if name == "base":
+            variant_path = model_path
+        else:
+            variant_path = output_dir / f"{model_path.stem}.{name}.onnx"
+            try:
+                _BUILDERS[name](model_path, variant_path)
+            except Exception as exc:  # noqa: BLE001
+                results[name] = {"status": "unavailable", "error": str(exc)}
+                continue
+
+        pre_optimized = name == "optimized"
+        entry: dict[str, Any] = {
+            "status": "ok",
+            "path": variant_path.name,
+            "sha256": _sha256_file(variant_path),
+            "size_bytes": variant_path.stat().st_size,
+            "pre_optimized": pre_optimized,
+        }
+        try:
+            entry.update(measure_variant(variant_path, pre_optimized=pre_optimized, runs=benchmark_runs))
+        except Exception as exc:  # noqa: BLE001
+            if name == "base":
+                raise
+            variant_path.unlink(missing_ok=True)
+            results[name] = {"status": "unavailable", "error": f"variant failed to load: {exc}"}
+            continue
+        results[name] = entry
+    return results
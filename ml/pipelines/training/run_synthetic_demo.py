@@ -8,7 +8,13 @@ from pathlib import Path
 
 import yaml
 
-from synthetic_data import build_telemetry_fixture, generate_training_dataframe, write_training_dataset
+from synthetic_data import (
+    build_telemetry_fixture,
+    generate_training_dataframe,
+    plan_training_shards,
+    write_sharded_training_dataset,
+    write_training_dataset,
+)
 
 
 def _load_config(path: Path) -> dict:
@@ -29,7 +35,10 @@ def main() -> None:
     parser.add_argument("--sessions", type=int, default=60)
     parser.add_argument("--steps", type=int, default=24)
     parser.add_argument("--seed", type=int, default=42)
-    parser.add_argument("--dataset-format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--dataset-format", choices=["csv", "parquet", "parquet-dataset"], default="csv")
+    parser.add_argument("--sessions-per-shard", type=int, default=1000)
+    parser.add_argument("--workers", type=int, help="Shard generation processes (default: CPU count)")
+    parser.add_argument("--fixture-format", choices=["jsonl", "binpb"], default="jsonl")
     parser.add_argument("--run-training", action="store_true")
     parser.add_argument("--register-model", action="store_true")
     parser.add_argument("--registry-api-url", type=str, default="http://localhost:8000")
@@ -46,16 +55,36 @@ def main() -> None:
     config_dir = output_dir / "configs"
     fixture_dir = output_dir / "fixtures"
 
-    dataset_path = data_dir / f"synthetic_icustays.{args.dataset_format}"
-    fixture_path = fixture_dir / "telemetry_stream.jsonl"
+    if args.dataset_format == "parquet-dataset":
+        dataset_path = data_dir / "synthetic_icustays"
+    else:
+        dataset_path = data_dir / f"synthetic_icustays.{args.dataset_format}"
+    fixture_path = fixture_dir / f"telemetry_stream.{args.fixture_format}"
     derived_config_path = config_dir / "synthetic-baseline.yaml"
 
-    df = generate_training_dataframe(
-        num_sessions=args.sessions,
-        steps_per_session=args.steps,
-        seed=args.seed,
-    )
-    write_training_dataset(df, dataset_path)
+    if args.dataset_format == "parquet-dataset":
+        write_sharded_training_dataset(
+            dataset_path,
+            num_sessions=args.sessions,
+            steps_per_session=args.steps,
+            seed=args.seed,
+            sessions_per_shard=args.sessions_per_shard,
+            workers=args.workers,
+        )
+        # The fixture replays the first shard, regenerated from its seed rather than read back.
+        first_shard = plan_training_shards(
+            num_sessions=args.sessions, sessions_per_shard=args.sessions_per_shard, seed=args.seed
+        )[0]
+        df = generate_training_dataframe(
+            num_sessions=first_shard["sessions"], steps_per_session=args.steps, seed=first_shard["seed"]
+        )
+    else:
+        df = generate_training_dataframe(
+            num_sessions=args.sessions,
+            steps_per_session=args.steps,
+            seed=args.seed,
+        )
+        write_training_dataset(df, dataset_path)
     build_telemetry_fixture(df, fixture_path)
 
     config = _load_config(args.base_config)
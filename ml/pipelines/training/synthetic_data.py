@@ -2,61 +2,122 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import struct
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, Iterable
 
 import numpy as np
 import pandas as pd
 
+from dataset_manifest import write_dataset_manifest
+
+# Length-delimited protobuf fixture format read by edge_inference.replay_fixture.
+BINARY_FIXTURE_SUFFIX = ".binpb"
+
+
+TRAINING_COLUMNS = [
+    "session_id",
+    "device_id",
+    "step",
+    "map",
+    "heart_rate",
+    "spo2",
+    "lactate",
+    "creatinine",
+    "age",
+    "weight_kg",
+    "hypotension_label",
+]
+# Standard-normal draws per session (baseline MAP, age, weight) and per step (six noise terms).
+SESSION_VARIATES = 3
+STEP_VARIATES = 6
+
+
+def _draw_block(
+    rng: np.random.Generator, num_sessions: int, steps_per_session: int, compat: bool
+) -> tuple[np.ndarray, np.ndarray]:
+    """Standard normals shaped ``(sessions, 3)`` and ``(6, sessions, steps)``.
+
+    In compat mode the draws are consumed in the exact order of the original per-scalar loop: per session
+    the three session variates, then six per step. ``rng.normal(loc, scale)`` is ``loc + scale * z`` on the
+    same stream, so the output is bit-identical. Otherwise each noise term is drawn as one contiguous block.
+    """
+    if compat:
+        z = rng.standard_normal((num_sessions, SESSION_VARIATES + STEP_VARIATES * steps_per_session))
+        step_z = z[:, SESSION_VARIATES:].reshape(num_sessions, steps_per_session, STEP_VARIATES)
+        return z[:, :SESSION_VARIATES], np.moveaxis(step_z, -1, 0)
+    session_z = rng.standard_normal((num_sessions, SESSION_VARIATES))
+    return session_z, rng.standard_normal((STEP_VARIATES, num_sessions, steps_per_session))
+
+
+def _generate_block(
+    rng: np.random.Generator, first_session: int, num_sessions: int, steps_per_session: int, compat: bool
+) -> pd.DataFrame:
+    session_z, step_z = _draw_block(rng, num_sessions, steps_per_session, compat)
+    shift_z, heart_rate_z, spo2_z, lactate_z, creatinine_z, risk_z = step_z
+
+    baseline_map = (72.0 + 6.0 * session_z[:, 0])[:, None]
+    age = np.clip(64.0 + 12.0 * session_z[:, 1], 18.0, 95.0)
+    weight_kg = np.clip(78.0 + 15.0 * session_z[:, 2], 40.0, 160.0)
+
+    map_value = np.clip(baseline_map + (0.0 + 5.0 * shift_z), 45.0, 110.0)
+    heart_rate = np.clip(92.0 - (map_value - 65.0) * 0.8 + (0.0 + 6.0 * heart_rate_z), 45.0, 180.0)
+    spo2 = np.clip(97.0 - np.maximum(0.0, 62.0 - map_value) * 0.2 + (0.0 + 1.0 * spo2_z), 80.0, 100.0)
+    lactate = np.clip(1.6 + np.maximum(0.0, 65.0 - map_value) * 0.07 + (0.0 + 0.15 * lactate_z), 0.4, 8.0)
+    creatinine = np.clip(0.9 + (0.0 + 0.2 * creatinine_z), 0.4, 3.0)
+    risk_score = (
+        0.08 * (65.0 - map_value)
+        + 0.02 * (heart_rate - 85.0)
+        + 0.3 * (lactate - 1.8)
+        + (0.0 + 0.25 * risk_z)
+    )
+
+    session_index = np.arange(first_session, first_session + num_sessions)
+    session_ids = np.array([f"demo-session-{index:03d}" for index in session_index], dtype=object)
+    device_ids = np.array([f"pump-{index % 8:02d}" for index in session_index], dtype=object)
+    return pd.DataFrame(
+        {
+            "session_id": np.repeat(session_ids, steps_per_session),
+            "device_id": np.repeat(device_ids, steps_per_session),
+            "step": np.tile(np.arange(steps_per_session, dtype=np.int64), num_sessions),
+            "map": map_value.ravel(),
+            "heart_rate": heart_rate.ravel(),
+            "spo2": spo2.ravel(),
+            "lactate": lactate.ravel(),
+            "creatinine": creatinine.ravel(),
+            "age": np.repeat(age, steps_per_session),
+            "weight_kg": np.repeat(weight_kg, steps_per_session),
+            "hypotension_label": (risk_score > 0.0).astype(np.int64).ravel(),
+        }
+    )
+
 
 def generate_training_dataframe(
     *,
     num_sessions: int = 50,
     steps_per_session: int = 24,
     seed: int = 42,
+    compat: bool = True,
+    block_sessions: int = 4096,
+    first_session: int = 0,
 ) -> pd.DataFrame:
-    rng = np.random.default_rng(seed)
-    rows: list[dict] = []
-
-    for session_index in range(num_sessions):
-        session_id = f"demo-session-{session_index:03d}"
-        device_id = f"pump-{session_index % 8:02d}"
-        baseline_map = rng.normal(72.0, 6.0)
-        age = float(np.clip(rng.normal(64.0, 12.0), 18.0, 95.0))
-        weight_kg = float(np.clip(rng.normal(78.0, 15.0), 40.0, 160.0))
-
-        for step in range(steps_per_session):
-            hypotension_shift = rng.normal(0.0, 5.0)
-            map_value = float(np.clip(baseline_map + hypotension_shift, 45.0, 110.0))
-            heart_rate = float(np.clip(92.0 - (map_value - 65.0) * 0.8 + rng.normal(0.0, 6.0), 45.0, 180.0))
-            spo2 = float(np.clip(97.0 - max(0.0, 62.0 - map_value) * 0.2 + rng.normal(0.0, 1.0), 80.0, 100.0))
-            lactate = float(np.clip(1.6 + max(0.0, 65.0 - map_value) * 0.07 + rng.normal(0.0, 0.15), 0.4, 8.0))
-            creatinine = float(np.clip(0.9 + rng.normal(0.0, 0.2), 0.4, 3.0))
-            risk_score = (
-                0.08 * (65.0 - map_value)
-                + 0.02 * (heart_rate - 85.0)
-                + 0.3 * (lactate - 1.8)
-                + rng.normal(0.0, 0.25)
-            )
-            hypotension_label = int(risk_score > 0.0)
-
-            rows.append(
-                {
-                    "session_id": session_id,
-                    "device_id": device_id,
-                    "step": step,
-                    "map": map_value,
-                    "heart_rate": heart_rate,
-                    "spo2": spo2,
-                    "lactate": lactate,
-                    "creatinine": creatinine,
-                    "age": age,
-                    "weight_kg": weight_kg,
-                    "hypotension_label": hypotension_label,
-                }
-            )
+    """Synthetic ICU sessions, generated with array operations over blocks of ``block_sessions`` sessions.
 
-    return pd.DataFrame(rows)
+    ``compat=True`` reproduces the original per-scalar generator exactly for a given seed. ``compat=False``
+    draws each noise term as a contiguous block: the distribution is the same but the values differ.
+    ``first_session`` offsets session and device numbering, so independently seeded shards do not collide.
+    """
+    rng = np.random.default_rng(seed)
+    frames = [
+        _generate_block(rng, first_session + start, min(block_sessions, num_sessions - start), steps_per_session, compat)
+        for start in range(0, num_sessions, block_sessions)
+    ]
+    if not frames:
+        return pd.DataFrame(columns=TRAINING_COLUMNS)
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
 
 
 def write_training_dataset(df: pd.DataFrame, output_path: Path) -> None:
@@ -70,34 +131,277 @@ def write_training_dataset(df: pd.DataFrame, output_path: Path) -> None:
     raise ValueError(f"Unsupported output extension: {output_path.suffix}")
 
 
-def build_telemetry_fixture(df: pd.DataFrame, output_path: Path) -> None:
+def plan_training_shards(*, num_sessions: int, sessions_per_shard: int, seed: int) -> list[dict[str, Any]]:
+    """Deterministic shard layout: each shard gets a contiguous session range and its own spawned seed.
+
+    Shard contents depend only on ``seed`` and ``sessions_per_shard``, not on how many workers generate them.
+    """
+    if sessions_per_shard <= 0:
+        raise ValueError("sessions_per_shard must be positive")
+    starts = range(0, num_sessions, sessions_per_shard)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    return [
+        {
+            "index": index,
+            "path": f"part-{index:05d}.parquet",
+            "first_session": start,
+            "sessions": min(sessions_per_shard, num_sessions - start),
+            "seed": int(shard_seed.generate_state(1, dtype=np.uint64)[0]),
+        }
+        for index, (start, shard_seed) in enumerate(zip(starts, seeds))
+    ]
+
+
+def _write_training_shard(dataset_dir: Path, shard: dict[str, Any], steps_per_session: int) -> dict[str, Any]:
+    df = generate_training_dataframe(
+        num_sessions=shard["sessions"],
+        steps_per_session=steps_per_session,
+        seed=shard["seed"],
+        first_session=shard["first_session"],
+    )
+    shard_path = dataset_dir / shard["path"]
+    temp_path = shard_path.with_name(f".{shard_path.name}.tmp")
+    df.to_parquet(temp_path, index=False)
+    temp_path.replace(shard_path)
+    digest = hashlib.sha256(shard_path.read_bytes()).hexdigest()
+    return {**shard, "rows": len(df), "sha256": digest}
+
+
+def write_sharded_training_dataset(
+    dataset_dir: Path,
+    *,
+    num_sessions: int,
+    steps_per_session: int = 24,
+    seed: int = 42,
+    sessions_per_shard: int = 1000,
+    workers: int | None = None,
+) -> dict[str, Any]:
+    """Generate sessions shard by shard in a process pool and write a Parquet dataset directory.
+
+    Only one shard per worker is in memory at a time. The manifest lists shards in session order with row
+    counts and sha256 digests, and is written last, so a directory without one is an incomplete run.
+    """
+    shards = plan_training_shards(num_sessions=num_sessions, sessions_per_shard=sessions_per_shard, seed=seed)
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    if workers == 1 or len(shards) <= 1:
+        written = [_write_training_shard(dataset_dir, shard, steps_per_session) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            written = list(
+                pool.map(
+                    _write_training_shard,
+                    [dataset_dir] * len(shards),
+                    shards,
+                    [steps_per_session] * len(shards),
+                )
+            )
+    manifest = {
+        "format": "parquet",
+        "columns": TRAINING_COLUMNS,
+        "seed": seed,
+        "num_sessions": num_sessions,
+        "steps_per_session": steps_per_session,
+        "sessions_per_shard": sessions_per_shard,
+        "rows": sum(shard["rows"] for shard in written),
+        "shards": written,
+    }
+    write_dataset_manifest(dataset_dir, manifest)
+    return manifest
+
+
+# One JSONL replay event. Filled with ``repr`` of Python floats and ints, which is what ``json.dumps`` emits for
+# finite values, so records are byte-identical to serializing the nested event dict.
+_FIXTURE_JSON_TEMPLATE = (
+    '{{"session_id": {}, "device_id": {}, "sequence": {}, "vitals": ['
+    '{{"name": "map", "value": {!r}, "timestamp_ms": {}}}, '
+    '{{"name": "heart_rate", "value": {!r}, "timestamp_ms": {}}}, '
+    '{{"name": "spo2", "value": {!r}, "timestamp_ms": {}}}], '
+    '"pump_status": {{"rate_mcg_per_kg_min": {!r}, "fallback_active": {}, "alarm_triggered": {}}}, '
+    '"predictions": {{"hypotension_risk": {!r}, "confidence": {!r}}}}}\n'
+).format
+_JSON_BOOLEANS = {True: "true", False: "false"}
+FIXTURE_CHUNK_ROWS = 65_536
+
+
+def _fixture_columns(chunk: pd.DataFrame, sequence: np.ndarray) -> dict[str, list]:
+    """Derived replay fields for a chunk, computed as arrays and returned as Python lists for formatting."""
+    map_value = chunk["map"].to_numpy(dtype=np.float64)
+    confidence = np.clip(0.6 + np.abs(65.0 - map_value) * 0.01, 0.55, 0.98)
+    return {
+        "session_id": chunk["session_id"].tolist(),
+        "device_id": chunk["device_id"].tolist(),
+        "sequence": sequence.tolist(),
+        "map": map_value.tolist(),
+        "heart_rate": chunk["heart_rate"].to_numpy(dtype=np.float64).tolist(),
+        "spo2": chunk["spo2"].to_numpy(dtype=np.float64).tolist(),
+        "timestamp_ms": (chunk["step"].to_numpy() * 60_000).astype(np.int64).tolist(),
+        "rate": np.clip(0.06 + (65.0 - map_value) * 0.003, 0.02, 0.9).tolist(),
+        "fallback_active": (confidence < 0.7).tolist(),
+        "alarm_triggered": (map_value < 55.0).tolist(),
+        "hypotension_risk": chunk["hypotension_label"].to_numpy(dtype=np.float64).tolist(),
+        "confidence": confidence.tolist(),
+    }
+
+
+def _fixture_rows(columns: dict[str, list]):
+    return zip(
+        columns["session_id"],
+        columns["device_id"],
+        columns["sequence"],
+        columns["map"],
+        columns["heart_rate"],
+        columns["spo2"],
+        columns["timestamp_ms"],
+        columns["rate"],
+        columns["fallback_active"],
+        columns["alarm_triggered"],
+        columns["hypotension_risk"],
+        columns["confidence"],
+    )
+
+
+def _json_chunk(columns: dict[str, list], quoted: dict[str, str]) -> bytes:
+    for identifier in set(columns["session_id"]).union(columns["device_id"]).difference(quoted):
+        quoted[identifier] = json.dumps(identifier)
+    return "".join(
+        [
+            _FIXTURE_JSON_TEMPLATE(
+                quoted[session_id],
+                quoted[device_id],
+                sequence,
+                map_value,
+                timestamp_ms,
+                heart_rate,
+                timestamp_ms,
+                spo2,
+                timestamp_ms,
+                rate,
+                _JSON_BOOLEANS[fallback_active],
+                _JSON_BOOLEANS[alarm_triggered],
+                risk,
+                confidence,
+            )
+            for (
+                session_id,
+                device_id,
+                sequence,
+                map_value,
+                heart_rate,
+                spo2,
+                timestamp_ms,
+                rate,
+                fallback_active,
+                alarm_triggered,
+                risk,
+                confidence,
+            ) in _fixture_rows(columns)
+        ]
+    ).encode("utf-8")
+
+
+# Hand-rolled proto3 wire encoding of infusion.telemetry.TelemetryEnvelope, so the training pipeline
+# does not depend on the ingestion service's generated code. Default values are omitted, as proto3 does.
+def _varint(value: int) -> bytes:
+    value &= (1 << 64) - 1
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _length_delimited(field: int, payload: bytes) -> bytes:
+    return _varint(field << 3 | 2) + _varint(len(payload)) + payload
+
+
+def _string(field: int, value: str) -> bytes:
+    return _length_delimited(field, value.encode("utf-8")) if value else b""
+
+
+def _double(field: int, value: float) -> bytes:
+    return _varint(field << 3 | 1) + struct.pack("<d", value) if value else b""
+
+
+def _int(field: int, value: int) -> bytes:
+    return _varint(field << 3) + _varint(int(value)) if value else b""
+
+
+def _binary_chunk(columns: dict[str, list]) -> bytes:
+    """Length-delimited ``TelemetryEnvelope`` records for a chunk."""
+    framed_records = []
+    for (
+        session_id,
+        device_id,
+        sequence,
+        map_value,
+        heart_rate,
+        spo2,
+        timestamp_ms,
+        rate,
+        fallback_active,
+        alarm_triggered,
+        risk,
+        confidence,
+    ) in _fixture_rows(columns):
+        timestamp = _int(3, timestamp_ms)
+        record = b"".join(
+            [
+                _string(1, session_id),
+                _string(2, device_id),
+                _length_delimited(3, _string(1, "map") + _double(2, map_value) + timestamp),
+                _length_delimited(3, _string(1, "heart_rate") + _double(2, heart_rate) + timestamp),
+                _length_delimited(3, _string(1, "spo2") + _double(2, spo2) + timestamp),
+                _length_delimited(
+                    4, _double(1, rate) + _int(2, fallback_active) + _int(3, alarm_triggered)
+                ),
+                _length_delimited(5, _string(1, "hypotension_risk") + _double(2, risk)),
+                _length_delimited(5, _string(1, "confidence") + _double(2, confidence)),
+                _int(6, sequence),
+            ]
+        )
+        framed_records.append(_varint(len(record)) + record)
+    return b"".join(framed_records)
+
+
+def _sequenced_frames(frames, seen: dict[str, int]):
+    """Sort each frame by session and step and number events per session, continuing across frames."""
+    for frame in frames:
+        frame = frame.sort_values(["session_id", "step"]).reset_index(drop=True)
+        sequence = frame.groupby("session_id", sort=False).cumcount().to_numpy(dtype=np.int64) + 1
+        if seen:
+            sequence += frame["session_id"].map(seen).fillna(0).to_numpy(dtype=np.int64)
+        last = pd.Series(sequence, index=frame["session_id"]).groupby(level=0, sort=False).max()
+        seen.update(zip(last.index.tolist(), last.tolist()))
+        yield frame, sequence
+
+
+def build_telemetry_fixture(
+    data: pd.DataFrame | Iterable[pd.DataFrame],
+    output_path: Path,
+    *,
+    chunk_rows: int = FIXTURE_CHUNK_ROWS,
+) -> None:
+    """Write replay events as JSONL, or as length-delimited protobuf when the suffix is ``.binpb``.
+
+    ``data`` is one DataFrame or an iterable of them, such as dataset shards read one at a time. Each frame
+    is sorted by session and step; sequence numbers continue across frames for sessions that span them,
+    which must then arrive in step order.
+    Events are derived and serialized ``chunk_rows`` at a time, so memory is bounded by the largest frame.
+    """
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    sorted_df = df.sort_values(["session_id", "step"]).reset_index(drop=True)
-    sequence_by_session: dict[str, int] = {}
-
-    with output_path.open("w", encoding="utf-8") as handle:
-        for row in sorted_df.itertuples(index=False):
-            sequence = sequence_by_session.get(row.session_id, 0) + 1
-            sequence_by_session[row.session_id] = sequence
-
-            confidence = float(np.clip(0.6 + abs(65.0 - row.map) * 0.01, 0.55, 0.98))
-            event = {
-                "session_id": row.session_id,
-                "device_id": row.device_id,
-                "sequence": sequence,
-                "vitals": [
-                    {"name": "map", "value": row.map, "timestamp_ms": int(row.step * 60_000)},
-                    {"name": "heart_rate", "value": row.heart_rate, "timestamp_ms": int(row.step * 60_000)},
-                    {"name": "spo2", "value": row.spo2, "timestamp_ms": int(row.step * 60_000)},
-                ],
-                "pump_status": {
-                    "rate_mcg_per_kg_min": float(np.clip(0.06 + (65.0 - row.map) * 0.003, 0.02, 0.9)),
-                    "fallback_active": confidence < 0.7,
-                    "alarm_triggered": row.map < 55.0,
-                },
-                "predictions": {
-                    "hypotension_risk": float(row.hypotension_label),
-                    "confidence": confidence,
-                },
-            }
-            handle.write(json.dumps(event) + "\n")
+    frames = [data] if isinstance(data, pd.DataFrame) else data
+    binary = output_path.suffix == BINARY_FIXTURE_SUFFIX
+    quoted: dict[str, str] = {}
+
+    with output_path.open("wb") as handle:
+        for frame, sequence in _sequenced_frames(frames, {}):
+            for start in range(0, len(frame), chunk_rows):
+                columns = _fixture_columns(
+                    frame.iloc[start : start + chunk_rows], sequence[start : start + chunk_rows]
+                )
+                if binary:
+                    payload = _binary_chunk(columns)
+                else:
+                    payload = _json_chunk(columns, quoted)
+                handle.write(payload)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from dataset_loader import OPTIONAL_COLUMNS, load_dataset, required_columns
+from feature_engineering import build_feature_matrix
+from synthetic_data import generate_training_dataframe, write_sharded_training_dataset, write_training_dataset
+
+FEATURE_CONFIG = {"vital_signs": ["map", "heart_rate"], "labs": ["lactate"], "demographics": ["age"]}
+
+
+def test_required_columns_are_features_then_label() -> None:
+    assert required_columns(FEATURE_CONFIG) == ["map", "heart_rate", "lactate", "age", "hypotension_label"]
+
+
+def test_csv_loading_projects_columns_into_one_float32_block(tmp_path: Path) -> None:
+    df = generate_training_dataframe(num_sessions=3, steps_per_session=4, seed=2)
+    write_training_dataset(df, tmp_path / "data.csv")
+    columns = ["session_id"] + required_columns(FEATURE_CONFIG)
+
+    loaded = load_dataset(tmp_path / "data.csv", columns=columns)
+
+    numeric = columns[1:]
+    assert loaded.columns.tolist() == numeric + ["session_id"]
+    assert loaded["session_id"].tolist() == df["session_id"].tolist()
+    assert loaded["session_id"].dtype == "category"
+    assert (loaded[numeric].dtypes == np.float32).all()
+    np.testing.assert_array_equal(loaded["map"].to_numpy(), df["map"].to_numpy(dtype=np.float32))
+
+    numeric_only = load_dataset(tmp_path / "data.csv", columns=numeric)
+    assert np.shares_memory(numeric_only.to_numpy(dtype=np.float32), numeric_only["map"].to_numpy())
+
+
+def test_parquet_loading_reads_shards_and_row_groups(tmp_path: Path) -> None:
+    pytest.importorskip("pyarrow.parquet")
+    df = generate_training_dataframe(num_sessions=2, steps_per_session=5, seed=2)
+    df.to_parquet(tmp_path / "data.parquet", index=False, row_group_size=3)
+    write_sharded_training_dataset(tmp_path / "sharded", num_sessions=5, steps_per_session=4, seed=2, sessions_per_shard=2)
+
+    single = load_dataset(
+        tmp_path / "data.parquet", columns=required_columns(FEATURE_CONFIG), optional_columns=OPTIONAL_COLUMNS
+    )
+    sharded = load_dataset(tmp_path / "sharded", columns=["session_id", "map", "hypotension_label"])
+
+    np.testing.assert_array_equal(single["lactate"].to_numpy(), df["lactate"].to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(single["hypotension_label"].to_numpy(), df["hypotension_label"].to_numpy())
+    assert single["age"].dtype == np.float32
+    assert single["session_id"].dtype == "category"
+    assert len(sharded) == 20
+    assert sharded["session_id"].unique().tolist() == [f"demo-session-{index:03d}" for index in range(5)]
+    with pytest.raises(KeyError, match="missing required columns"):
+        load_dataset(tmp_path / "data.parquet", columns=["map", "not_a_column"])
+
+    df.drop(columns=["session_id"]).to_parquet(tmp_path / "sessionless.parquet", index=False)
+    sessionless = load_dataset(
+        tmp_path / "sessionless.parquet", columns=required_columns(FEATURE_CONFIG), optional_columns=OPTIONAL_COLUMNS
+    )
+    assert sessionless.columns.tolist() == required_columns(FEATURE_CONFIG)
+
+
+def _sessionless_csv(tmp_path: Path) -> Path:
+    df = generate_training_dataframe(num_sessions=6, steps_per_session=10, seed=2).drop(columns=["session_id"])
+    df.loc[[0, 13, 27], "map"] = np.nan
+    path = tmp_path / "sessionless.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_dataset_without_session_id_loads_and_fills_as_one_session(tmp_path: Path) -> None:
+    path = _sessionless_csv(tmp_path)
+
+    loaded = load_dataset(path, columns=required_columns(FEATURE_CONFIG), optional_columns=OPTIONAL_COLUMNS)
+    X, y = build_feature_matrix(loaded, FEATURE_CONFIG)
+
+    assert loaded.columns.tolist() == required_columns(FEATURE_CONFIG)
+    assert not X.isna().any().any()
+    assert X.loc[13, "map"] == X.loc[12, "map"]
+    assert len(y) == 60
+    with pytest.raises(KeyError, match="session_id"):
+        load_dataset(path, columns=["map", "session_id"])
+
+
+def test_training_on_a_dataset_without_session_id(tmp_path: Path) -> None:
+    for module in ("mlflow", "sklearn", "xgboost"):
+        pytest.importorskip(module)
+    import train
+
+    path = _sessionless_csv(tmp_path)
+    dataset = load_dataset(path, columns=required_columns(FEATURE_CONFIG), optional_columns=OPTIONAL_COLUMNS)
+    X, y = train.build_features(dataset, FEATURE_CONFIG)
+    model = train.train_xgboost(X, y, {"n_estimators": 5})
+
+    assert model.predict_proba(X.to_numpy(dtype=np.float32)).shape == (60, 2)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import build_feature_matrix
+
+FEATURE_CONFIG = {"vital_signs": ["map", "heart_rate"], "labs": [], "demographics": []}
+
+
+def test_gaps_are_filled_within_sessions_only() -> None:
+    df = pd.DataFrame(
+        {
+            "session_id": ["a", "a", "a", "b", "b", "c", "c"],
+            "map": [np.nan, 70.0, np.nan, np.nan, 60.0, np.nan, np.nan],
+            "heart_rate": [80.0, np.nan, 90.0, 100.0, np.nan, 75.0, np.nan],
+            "hypotension_label": [0, 0, 1, 1, 1, 0, 0],
+        }
+    )
+
+    X, y = build_feature_matrix(df, FEATURE_CONFIG)
+
+    assert X.dtypes.eq(np.float32).all()
+    np.testing.assert_array_equal(X["map"].to_numpy(), [70.0, 70.0, 70.0, 60.0, 60.0, np.nan, np.nan])
+    np.testing.assert_array_equal(X["heart_rate"].to_numpy(), [80.0, 80.0, 90.0, 100.0, 100.0, 75.0, 75.0])
+    assert y.tolist() == [0, 0, 1, 1, 1, 0, 0]
+    assert np.shares_memory(X.to_numpy(dtype=np.float32), X["map"].to_numpy())
+
+
+def test_interleaved_sessions_match_a_groupby_fill() -> None:
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame(
+        {
+            "session_id": rng.choice(["s1", "s2", "s3", "s4"], size=200),
+            "map": rng.normal(70.0, 5.0, size=200),
+            "heart_rate": rng.normal(90.0, 8.0, size=200),
+            "hypotension_label": rng.integers(0, 2, size=200),
+        }
+    )
+    df.loc[rng.random(200) < 0.4, "map"] = np.nan
+    df.loc[rng.random(200) < 0.4, "heart_rate"] = np.nan
+    features = ["map", "heart_rate"]
+    grouped = df[features].astype(np.float32).groupby(df["session_id"])
+    expected = grouped.ffill().groupby(df["session_id"]).bfill()
+
+    X, _ = build_feature_matrix(df, FEATURE_CONFIG)
+
+    pd.testing.assert_frame_equal(X, expected)
+
+
+def test_frame_without_sessions_is_filled_as_one_session() -> None:
+    df = pd.DataFrame({"map": [np.nan, 65.0, np.nan], "heart_rate": [1.0, 2.0, 3.0], "hypotension_label": [0, 1, 0]})
+
+    X, _ = build_feature_matrix(df, FEATURE_CONFIG)
+
+    np.testing.assert_array_equal(X["map"].to_numpy(), [65.0, 65.0, 65.0])
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper
+
+from model_variants import build_model_variants
+
+
+def _write_linear_model(path: Path, feature_count: int = 7) -> None:
+    weights = np.random.default_rng(0).normal(size=(feature_count, 2)).astype(np.float32)
+    graph = helper.make_graph(
+        [helper.make_node("MatMul", ["input", "weights"], ["scores"])],
+        "linear",
+        [helper.make_tensor_value_info("input", TensorProto.FLOAT, [None, feature_count])],
+        [helper.make_tensor_value_info("scores", TensorProto.FLOAT, [None, 2])],
+        initializer=[helper.make_tensor("weights", TensorProto.FLOAT, weights.shape, weights.reshape(-1).tolist())],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 15)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+
+
+def test_build_model_variants_records_hash_and_timings(tmp_path: Path) -> None:
+    model_path = tmp_path / "map_predictor.onnx"
+    _write_linear_model(model_path)
+
+    variants = build_model_variants(model_path=model_path, output_dir=tmp_path, benchmark_runs=5)
+
+    assert set(variants) == {"base", "optimized", "int8", "fp16"}
+    assert variants["base"]["path"] == "map_predictor.onnx"
+    assert variants["optimized"]["pre_optimized"] is True
+    for name, entry in variants.items():
+        if entry["status"] != "ok":
+            continue
+        assert (tmp_path / entry["path"]).exists()
+        assert len(entry["sha256"]) == 64
+        assert entry["load_ms"] >= 0.0
+        assert entry["latency_ms_p95"] >= entry["latency_ms_p50"]
+    assert variants["optimized"]["status"] == "ok"
+    assert variants["int8"]["status"] == "ok"
@@ -3,9 +3,18 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import pytest
 
-from synthetic_data import build_telemetry_fixture, generate_training_dataframe, write_training_dataset
+from dataset_manifest import DATASET_MANIFEST_NAME, dataset_shard_paths, load_dataset_manifest
+from synthetic_data import (
+    build_telemetry_fixture,
+    generate_training_dataframe,
+    plan_training_shards,
+    write_sharded_training_dataset,
+    write_training_dataset,
+)
 
 
 def test_generate_training_dataframe_has_required_columns() -> None:
@@ -31,6 +40,93 @@ def test_generate_training_dataframe_has_required_columns() -> None:
     assert df["hypotension_label"].nunique() == 2
 
 
+def _reference_training_rows(num_sessions: int, steps_per_session: int, seed: int) -> pd.DataFrame:
+    # The original per-scalar generator; compat mode must reproduce it exactly.
+    rng = np.random.default_rng(seed)
+    rows = []
+    for session_index in range(num_sessions):
+        baseline_map = rng.normal(72.0, 6.0)
+        age = float(np.clip(rng.normal(64.0, 12.0), 18.0, 95.0))
+        weight_kg = float(np.clip(rng.normal(78.0, 15.0), 40.0, 160.0))
+        for step in range(steps_per_session):
+            map_value = float(np.clip(baseline_map + rng.normal(0.0, 5.0), 45.0, 110.0))
+            heart_rate = float(np.clip(92.0 - (map_value - 65.0) * 0.8 + rng.normal(0.0, 6.0), 45.0, 180.0))
+            spo2 = float(np.clip(97.0 - max(0.0, 62.0 - map_value) * 0.2 + rng.normal(0.0, 1.0), 80.0, 100.0))
+            lactate = float(np.clip(1.6 + max(0.0, 65.0 - map_value) * 0.07 + rng.normal(0.0, 0.15), 0.4, 8.0))
+            creatinine = float(np.clip(0.9 + rng.normal(0.0, 0.2), 0.4, 3.0))
+            risk_score = (
+                0.08 * (65.0 - map_value)
+                + 0.02 * (heart_rate - 85.0)
+                + 0.3 * (lactate - 1.8)
+                + rng.normal(0.0, 0.25)
+            )
+            rows.append(
+                {
+                    "session_id": f"demo-session-{session_index:03d}",
+                    "device_id": f"pump-{session_index % 8:02d}",
+                    "step": step,
+                    "map": map_value,
+                    "heart_rate": heart_rate,
+                    "spo2": spo2,
+                    "lactate": lactate,
+                    "creatinine": creatinine,
+                    "age": age,
+                    "weight_kg": weight_kg,
+                    "hypotension_label": int(risk_score > 0.0),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def test_compat_generation_matches_the_per_row_generator_across_blocks() -> None:
+    expected = _reference_training_rows(num_sessions=11, steps_per_session=7, seed=5)
+
+    df = generate_training_dataframe(num_sessions=11, steps_per_session=7, seed=5, block_sessions=4)
+
+    pd.testing.assert_frame_equal(df, expected, check_exact=True)
+
+
+def test_fast_generation_keeps_shape_and_distribution() -> None:
+    df = generate_training_dataframe(num_sessions=200, steps_per_session=24, seed=5, compat=False)
+    compat = generate_training_dataframe(num_sessions=200, steps_per_session=24, seed=5)
+
+    assert list(df.columns) == list(compat.columns)
+    assert df.dtypes.equals(compat.dtypes)
+    assert not np.array_equal(df["map"].to_numpy(), compat["map"].to_numpy())
+    assert abs(df["map"].mean() - compat["map"].mean()) < 1.0
+    assert df.groupby("session_id")["age"].nunique().eq(1).all()
+
+
+def test_plan_training_shards_is_contiguous_and_seeded_per_shard() -> None:
+    shards = plan_training_shards(num_sessions=25, sessions_per_shard=10, seed=3)
+
+    assert [(shard["first_session"], shard["sessions"]) for shard in shards] == [(0, 10), (10, 10), (20, 5)]
+    assert [shard["path"] for shard in shards] == ["part-00000.parquet", "part-00001.parquet", "part-00002.parquet"]
+    assert len({shard["seed"] for shard in shards}) == 3
+    assert shards == plan_training_shards(num_sessions=25, sessions_per_shard=10, seed=3)
+    assert shards[0]["seed"] != plan_training_shards(num_sessions=25, sessions_per_shard=10, seed=4)[0]["seed"]
+
+
+def test_sharded_dataset_is_independent_of_worker_count(tmp_path: Path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    serial = write_sharded_training_dataset(
+        tmp_path / "serial", num_sessions=7, steps_per_session=4, seed=9, sessions_per_shard=3, workers=1
+    )
+    pooled = write_sharded_training_dataset(
+        tmp_path / "pooled", num_sessions=7, steps_per_session=4, seed=9, sessions_per_shard=3, workers=2
+    )
+
+    assert [shard["sha256"] for shard in serial["shards"]] == [shard["sha256"] for shard in pooled["shards"]]
+    assert load_dataset_manifest(tmp_path / "pooled")["rows"] == 28
+    assert (tmp_path / "pooled" / DATASET_MANIFEST_NAME).exists()
+
+    df = pq.read_table([str(path) for path in dataset_shard_paths(tmp_path / "pooled")]).to_pandas()
+    assert len(df) == 28
+    assert df["session_id"].unique().tolist() == [f"demo-session-{index:03d}" for index in range(7)]
+    assert df.groupby("session_id")["step"].count().eq(4).all()
+
+
 def test_write_dataset_and_build_telemetry_fixture(tmp_path: Path) -> None:
     df = generate_training_dataframe(num_sessions=2, steps_per_session=3, seed=11)
     dataset_path = tmp_path / "synthetic.csv"
@@ -49,3 +145,61 @@ def test_write_dataset_and_build_telemetry_fixture(tmp_path: Path) -> None:
     assert {"session_id", "device_id", "sequence", "vitals", "pump_status", "predictions"}.issubset(event.keys())
     assert isinstance(event["vitals"], list)
     assert "confidence" in event["predictions"]
+
+
+def test_telemetry_fixture_from_frames_continues_sequences_in_chunks(tmp_path: Path) -> None:
+    df = generate_training_dataframe(num_sessions=3, steps_per_session=4, seed=11)
+    build_telemetry_fixture(df, tmp_path / "whole.jsonl")
+    # The second session spans both frames; the shuffled frames are re-sorted before numbering.
+    frames = [df.iloc[:6].sample(frac=1.0, random_state=0), df.iloc[6:].sample(frac=1.0, random_state=0)]
+
+    build_telemetry_fixture(frames, tmp_path / "frames.jsonl", chunk_rows=5)
+
+    whole = [json.loads(line) for line in (tmp_path / "whole.jsonl").read_text(encoding="utf-8").splitlines()]
+    chunked = [json.loads(line) for line in (tmp_path / "frames.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert chunked == whole
+    assert [event["sequence"] for event in whole] == [1, 2, 3, 4] * 3
+
+
+def _read_delimited(data: bytes) -> list[bytes]:
+    records, position = [], 0
+    while position < len(data):
+        length, shift = 0, 0
+        while True:
+            byte = data[position]
+            position += 1
+            length |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        records.append(data[position : position + length])
+        position += length
+    return records
+
+
+def test_build_binary_telemetry_fixture_matches_jsonl(tmp_path: Path) -> None:
+    # Decoded with the service's generated message when the edge package is available.
+    telemetry_pb2 = pytest.importorskip("edge_inference.ingestion_proto.telemetry_pb2")
+    df = generate_training_dataframe(num_sessions=2, steps_per_session=3, seed=11)
+    build_telemetry_fixture(df, tmp_path / "telemetry.jsonl")
+    build_telemetry_fixture(df, tmp_path / "telemetry.binpb")
+
+    envelopes = [
+        telemetry_pb2.TelemetryEnvelope.FromString(record)
+        for record in _read_delimited((tmp_path / "telemetry.binpb").read_bytes())
+    ]
+    events = [json.loads(line) for line in (tmp_path / "telemetry.jsonl").read_text(encoding="utf-8").splitlines()]
+
+    assert not (tmp_path / "telemetry.binpb.offsets").exists()
+    assert len(envelopes) == len(events)
+    for envelope, event in zip(envelopes, events):
+        assert envelope.session_id == event["session_id"]
+        assert envelope.device_id == event["device_id"]
+        assert envelope.sequence == event["sequence"]
+        assert [(v.name, v.value, v.timestamp_ms) for v in envelope.vitals] == [
+            (v["name"], v["value"], v["timestamp_ms"]) for v in event["vitals"]
+        ]
+        assert envelope.pump_status.rate_mcg_per_kg_min == event["pump_status"]["rate_mcg_per_kg_min"]
+        assert envelope.pump_status.fallback_active == event["pump_status"]["fallback_active"]
+        assert envelope.pump_status.alarm_triggered == event["pump_status"]["alarm_triggered"]
+        assert dict(envelope.predictions) == event["predictions"]
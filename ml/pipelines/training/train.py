@@ -21,25 +21,19 @@ from sklearn.metrics import average_precision_score, roc_auc_score
 from sklearn.model_selection import train_test_split
 from xgboost import XGBClassifier
 
+from dataset_loader import OPTIONAL_COLUMNS, load_dataset, required_columns
+from feature_engineering import build_feature_matrix
+from model_variants import VARIANT_NAMES, build_model_variants
+
 
 def load_config(path: Path) -> dict:
     with path.open() as fh:
         return yaml.safe_load(fh)
 
 
-def load_dataset(dataset_path: Path) -> pd.DataFrame:
-    if dataset_path.suffix == ".parquet":
-        return pd.read_parquet(dataset_path)
-    if dataset_path.suffix == ".csv":
-        return pd.read_csv(dataset_path)
-    raise ValueError(f"Unsupported dataset extension: {dataset_path.suffix}")
-
-
 def build_features(df: pd.DataFrame, feature_config: dict) -> tuple[pd.DataFrame, pd.Series]:
-    feature_columns = feature_config["vital_signs"] + feature_config.get("labs", []) + feature_config.get("demographics", [])
-    X = df[feature_columns].fillna(method="ffill").fillna(method="bfill")
-    y = df["hypotension_label"]
-    return X, y
+    # Gaps are filled within each session only, so values never leak between patients.
+    return build_feature_matrix(df, feature_config)
 
 
 def train_xgboost(X_train: pd.DataFrame, y_train: pd.Series, params: dict) -> XGBClassifier:
@@ -92,6 +86,7 @@ def build_deploy_artifact_bundle(
     metrics: dict[str, Any],
     config: dict[str, Any],
     artifact_root: Path,
+    model_variants: tuple[str, ...] = VARIANT_NAMES,
 ) -> dict[str, Any]:
     deploy_dir = artifact_root / "deploy"
     deploy_dir.mkdir(parents=True, exist_ok=True)
@@ -102,6 +97,8 @@ def build_deploy_artifact_bundle(
         output_path=deploy_dir / "map_predictor.onnx",
     )
 
+    variants = build_model_variants(model_path=model_path, output_dir=deploy_dir, variants=model_variants)
+
     acceptance = {
         "metrics": metrics,
         "thresholds": config.get("metrics", {}),
@@ -132,6 +129,7 @@ def build_deploy_artifact_bundle(
             "sha256": sha256_file(model_path),
             "size_bytes": model_path.stat().st_size,
         },
+        "model_variants": variants,
         "acceptance_summary": acceptance_path.name,
         "feature_contract": feature_contract_path.name,
         "inference_config": {
@@ -147,6 +145,7 @@ def build_deploy_artifact_bundle(
         "manifest_path": str(manifest_path),
         "model_binary_path": str(model_path),
         "model_sha256": manifest["model_binary"]["sha256"],
+        "model_variants": sorted(name for name, entry in variants.items() if entry["status"] == "ok"),
     }
 
 
@@ -210,6 +209,7 @@ def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", type=Path, required=True)
     parser.add_argument("--skip-export", action="store_true")
+    parser.add_argument("--model-variants", default=",".join(VARIANT_NAMES))
     parser.add_argument("--register-model", action="store_true")
     parser.add_argument("--registry-api-url", default="http://localhost:8000")
     parser.add_argument("--registry-id", default="map-predictor")
@@ -223,8 +223,16 @@ def main() -> None:
     if args.register_model and args.skip_export:
         raise RuntimeError("--register-model requires deploy export. Remove --skip-export.")
 
+    model_variants = tuple(name.strip() for name in args.model_variants.split(",") if name.strip())
+    unknown_variants = sorted(set(model_variants) - set(VARIANT_NAMES))
+    if unknown_variants or "base" not in model_variants:
+        raise RuntimeError(f"--model-variants must include base and only use {', '.join(VARIANT_NAMES)}")
+
     config = load_config(args.config)
-    dataset = load_dataset(Path(config["dataset_path"]))
+    # Only the feature, label and (when present) session columns are read, straight into float32.
+    dataset = load_dataset(
+        Path(config["dataset_path"]), columns=required_columns(config["features"]), optional_columns=OPTIONAL_COLUMNS
+    )
     X, y = build_features(dataset, config["features"])
     dataset_path = Path(config["dataset_path"])
     feature_names = [str(col) for col in X.columns]
@@ -255,12 +263,15 @@ def main() -> None:
                 metrics=metrics,
                 config=config,
                 artifact_root=artifact_dir,
+                model_variants=model_variants,
             )
             deploy_summary_path = artifact_dir / "deploy_bundle.json"
             deploy_summary_path.write_text(json.dumps(deploy_bundle, indent=2), encoding="utf-8")
             mlflow.log_artifact(deploy_summary_path)
             mlflow.log_artifact(Path(deploy_bundle["manifest_path"]))
             mlflow.log_artifact(Path(deploy_bundle["model_binary_path"]))
+            for variant_path in Path(deploy_bundle["deploy_dir"]).glob("map_predictor.*.onnx"):
+                mlflow.log_artifact(variant_path)
             print(f"Deploy-ready artifact generated: {deploy_bundle['deploy_dir']}")
 
             if args.register_model:
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import argparse
+import json
 from datetime import datetime
 from pathlib import Path
 
@@ -16,7 +18,22 @@ TEMPLATE = {
 }
 
 
-def generate_report(output_path: Path, summary: str, executed_by: str, requirements: list[str], test_cases: list[dict]) -> None:
+def generate_report(
+    output_path: Path,
+    summary: str,
+    executed_by: str,
+    requirements: list[str],
+    test_cases: list[dict],
+    replay_reports: dict[str, Path] | None = None,
+) -> None:
+    """Write the evidence package; each replay report becomes a test case keyed by its test id."""
+    requirements = list(requirements)
+    test_cases = list(test_cases)
+    for test_id, report_path in (replay_reports or {}).items():
+        case = replay_test_case(report_path, test_id)
+        test_cases.append(case)
+        if case["requirement"] not in requirements:
+            requirements.append(case["requirement"])
     data = TEMPLATE.copy()
     data.update(
         {
@@ -31,11 +48,55 @@ def generate_report(output_path: Path, summary: str, executed_by: str, requireme
         yaml.safe_dump(data, handle)
 
 
-if __name__ == "__main__":
+def replay_test_case(report_path: Path, test_id: str) -> dict:
+    """Test case entry from a replay report written by ``edge_inference.replay_fixture --report``."""
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    slo = report["slo"]
+    latency = report.get("end_to_end_latency_ms") or {}
+    return {
+        "id": test_id,
+        "status": slo["status"],
+        "requirement": slo["requirement"],
+        "evidence": str(report_path),
+        "metrics": {
+            "envelopes": report["totals"]["envelopes"],
+            "envelopes_per_s": report["totals"]["envelopes_per_s"],
+            "stream_failures": report["failures"],
+            "e2e_p50_ms": latency.get("p50_ms"),
+            "e2e_p99_ms": latency.get("p99_ms"),
+            "threshold_ms": slo["threshold_ms"],
+        },
+    }
+
+
+def _replay_report_arg(value: str) -> tuple[str, Path]:
+    test_id, separator, path = value.partition("=")
+    if not separator or not test_id or not path:
+        raise argparse.ArgumentTypeError(f"expected TEST_ID=PATH, got '{value}'")
+    return test_id, Path(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", type=Path, default=Path("validation_report.yaml"))
+    parser.add_argument(
+        "--replay-report",
+        type=_replay_report_arg,
+        action="append",
+        default=[],
+        metavar="TEST_ID=PATH",
+        help="Replay report written by edge_inference.replay_fixture --report; may be repeated",
+    )
+    args = parser.parse_args()
     generate_report(
-        Path("validation_report.yaml"),
+        args.output,
         summary="Placeholder system test run",
         executed_by="qa.engineer@example.org",
         requirements=["URS-FUNC-001", "URS-SAFE-004"],
         test_cases=[{"id": "ST-001", "status": "PASS"}],
+        replay_reports=dict(args.replay_report),
     )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import yaml
+
+import generate_report
+
+REPLAY_REPORT = {
+    "totals": {"envelopes": 30, "envelopes_per_s": 1500.0},
+    "failures": 0,
+    "end_to_end_latency_ms": {"p50_ms": 4.0, "p99_ms": 12.5},
+    "slo": {"requirement": "SRS-DATA-004", "threshold_ms": 1000.0, "status": "PASS"},
+}
+
+
+def test_main_adds_replay_reports_as_test_cases(tmp_path: Path, monkeypatch) -> None:
+    report_path = tmp_path / "replay.json"
+    report_path.write_text(json.dumps(REPLAY_REPORT), encoding="utf-8")
+    output_path = tmp_path / "validation_report.yaml"
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["generate_report.py", "--output", str(output_path), "--replay-report", f"ST-REPLAY-001={report_path}"],
+    )
+
+    generate_report.main()
+
+    report = yaml.safe_load(output_path.read_text(encoding="utf-8"))
+    assert report["requirements"] == ["URS-FUNC-001", "URS-SAFE-004", "SRS-DATA-004"]
+    assert [case["id"] for case in report["test_cases"]] == ["ST-001", "ST-REPLAY-001"]
+    replay_case = report["test_cases"][1]
+    assert replay_case["status"] == "PASS"
+    assert replay_case["evidence"] == str(report_path)
+    assert replay_case["metrics"]["envelopes"] == 30
+    assert replay_case["metrics"]["e2e_p99_ms"] == 12.5